@@ -1,31 +1,176 @@
-from dash import Dash, html, dcc, Input, Output
+from dash import Dash, html, dcc, dash_table, ctx, Input, Output, State
+from dash.dash_table import FormatTemplate
 from helpers import steam_api_helper
-import pandas as pd
+from helpers.job_manager import JobManager
+from helpers.metrics import instrument_dash, timed_callback
+from helpers.mysql_helper import MySQLHelper
+from helpers.result_pages import ResultPages
+from helpers.serving_layer import ServingLayer
+import os
+from datetime import datetime, timezone
 
-steam_api_helper = steam_api_helper.APIHelper()
+# Searches run as background jobs on a thread pool in each server process, so slow ones
+# don't tie up request threads. Dash cancels a browser's still-running job when it starts
+# a newer one for the same callback, so a new query drops the previous search's result.
+jobs = JobManager()
+# Full result lists stay server-side; the browser only gets a key and one page at a time
+result_pages = ResultPages(jobs.cache)
+
+
+def api():
+    # One helper per server process, shared by its job threads: sessions, rate limiter and
+    # response cache stay warm across searches, and nothing is shared across the fork
+    return jobs.per_process("steam_api_helper", steam_api_helper.APIHelper)
+
+
+# Answer game and achievement searches from MySQL when the stored rows are fresh
+# (DASH_DB_FIRST=false to always call Steam)
+DB_FIRST = os.getenv("DASH_DB_FIRST", "true").lower() == "true"
+
+
+def connect_db():
+    db = MySQLHelper(pool_size=2)
+    db.connect()
+    return db
+
+
+def build_serving_layer():
+    # Until the database is reachable every call falls through to Steam; the serving layer
+    # keeps retrying the connection, so a worker that started before MySQL catches up
+    return ServingLayer(api(), jobs.per_process("serving_db", connect_db))
+
+
+def serving():
+    if not DB_FIRST:
+        return api()
+    return jobs.per_process("serving_layer", build_serving_layer)
 
 
 def fetch_game_data(game_name):
-    return steam_api_helper.searchSteamApps(game_name)
+    return jobs.single_flight(
+        "searchSteamApps", game_name, lambda: serving().searchSteamApps(game_name)
+    )
 
 
 def fetch_user_data(user_name):
-    return steam_api_helper.searchSteamDisplayNames(user_name)
+    return jobs.single_flight(
+        "searchSteamDisplayNames",
+        user_name,
+        lambda: api().searchSteamDisplayNames(user_name),
+    )
 
 
 def fetch_game_news(game_name):
-    return steam_api_helper.getGameNews(game_name)
+    return jobs.single_flight("getGameNews", game_name, lambda: api().getGameNews(game_name))
 
 
 def fetch_achievement_data(game_name):
-    return steam_api_helper.getGameAchievementData(game_name)
+    return jobs.single_flight(
+        "getGameAchievementData",
+        game_name,
+        lambda: serving().getGameAchievementData(game_name),
+    )
 
 
-# Initialize the Dash app
-external_stylesheets = [
-    "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css"
+# Rebuild or diff-refresh the local app index once it's older than this
+APP_INDEX_MAX_AGE = float(os.getenv("DASH_APP_INDEX_MAX_AGE_HOURS", "24")) * 60 * 60
+
+
+def refresh_app_index():
+    # One server process downloads the app list; the others then load its new generation
+    jobs.run_exclusive("app-index", lambda: api().loadAppIndex(max_age=APP_INDEX_MAX_AGE))
+
+
+def title_suggestions(term, limit=10):
+    """
+    Title matches from the local app index. Until the index has been built (in the
+    background, see refresh_app_index) the suggestions come from storesearch instead.
+    """
+    helper = api()
+    if helper.app_index is None:
+        # refresh=False: only load an index that's already on disk
+        helper.loadAppIndex(refresh=False)
+    if helper.app_index is None or helper.app_index.is_stale(APP_INDEX_MAX_AGE):
+        refresh_app_index()
+    if helper.app_index is None:
+        try:
+            return [item["name"] for item in helper.searchSteamApps(term)[:limit]]
+        except (OSError, ValueError, KeyError):
+            # Network or payload error: no suggestions rather than a failed callback
+            return []
+    return [app["name"] for app in helper.searchLocalApps(term, limit=limit)]
+
+
+# Suggest game titles while typing (DASH_TYPEAHEAD=false to disable). Build the index ahead
+# of time with `python ingest.py index`; otherwise the first suggestion request builds it.
+TYPEAHEAD = os.getenv("DASH_TYPEAHEAD", "true").lower() == "true"
+TYPEAHEAD_MIN_LENGTH = 2
+
+# Shown only while a section's job is running
+PROGRESS_HIDDEN = {"display": "none"}
+PROGRESS_VISIBLE = {"display": "block", "width": "60%", "margin-top": "10px"}
+
+
+# Result tables
+TABLE_HIDDEN = {"display": "none"}
+TABLE_VISIBLE = {"display": "block", "margin-top": "10px"}
+RESULTS_PAGE_SIZE = 25
+
+GAME_COLUMNS = [
+    {"name": "", "id": "image", "presentation": "markdown"},
+    {"name": "Name", "id": "name"},
+    {"name": "ID", "id": "id", "type": "numeric"},
+    {"name": "Price", "id": "price", "type": "numeric", "format": FormatTemplate.money(2)},
+    {"name": "Currency", "id": "currency"},
+    {"name": "Metascore", "id": "metascore", "type": "numeric"},
+    {"name": "Platforms", "id": "platforms"},
+    {"name": "Controller Support", "id": "controller_support"},
+]
+NEWS_COLUMNS = [
+    {"name": "Title", "id": "title", "presentation": "markdown"},
+    {"name": "Published", "id": "date", "type": "datetime"},
+]
+ACHIEVEMENT_COLUMNS = [
+    {"name": "Achievement", "id": "name"},
+    {"name": "Percent Unlocked", "id": "percent", "type": "numeric"},
 ]
-app = Dash(__name__, external_stylesheets=external_stylesheets)
+
+
+def result_table(table_id, columns):
+    return dash_table.DataTable(
+        id=table_id,
+        columns=columns,
+        page_current=0,
+        page_size=RESULTS_PAGE_SIZE,
+        # "custom": paging, sorting and filtering all run in register_result_table's callback
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="multi",
+        filter_action="custom",
+        filter_query="",
+        markdown_options={"link_target": "_blank"},
+        style_cell={"textAlign": "left", "padding": "5px"},
+        css=[{"selector": ".dash-cell img", "rule": "width: 120px; height: auto;"}],
+    )
+
+
+# Initialize the Dash app
+# The Docker image downloads Bootstrap into assets/, which Dash serves itself; the CDN
+# is only a fallback for local runs without it
+BOOTSTRAP_URL = "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css"
+LOCAL_BOOTSTRAP = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "assets", "bootstrap.min.css"
+)
+external_stylesheets = [] if os.path.exists(LOCAL_BOOTSTRAP) else [BOOTSTRAP_URL]
+app = Dash(
+    __name__,
+    external_stylesheets=external_stylesheets,
+    background_callback_manager=jobs.callback_manager,
+    # gzip/brotli callback responses and assets (Flask-Compress)
+    compress=True,
+)
+# Prometheus metrics for Steam, MySQL and every callback at /metrics
+instrument_dash(app)
 
 # App layout
 app.layout = html.Div(
@@ -45,9 +190,25 @@ app.layout = html.Div(
                             type="text",
                             placeholder="Enter game name...",
                             style={"width": "60%", "margin-right": "10px"},
+                            n_submit=0,
+                            # Value updates only drive local suggestions; searches run on submit
+                            debounce=0.3 if TYPEAHEAD else True,
+                            list="game-suggestions",
                         ),
+                        html.Datalist(id="game-suggestions"),
                         html.Button("Search", id="game-search-button", n_clicks=0),
-                        html.Div(id="game-result", style={"margin-top": "10px"}),
+                        html.Progress(id="game-progress", style=PROGRESS_HIDDEN),
+                        html.Div(
+                            "Enter a game name and click search.",
+                            id="game-result",
+                            style={"margin-top": "10px"},
+                        ),
+                        dcc.Store(id="game-results"),
+                        html.Div(
+                            result_table("game-table", GAME_COLUMNS),
+                            id="game-table-container",
+                            style=TABLE_HIDDEN,
+                        ),
                     ],
                     style={"margin-bottom": "20px"},
                 ),
@@ -62,9 +223,24 @@ app.layout = html.Div(
                             type="text",
                             placeholder="Enter game name...",
                             style={"width": "60%", "margin-right": "10px"},
+                            n_submit=0,
+                            debounce=0.3 if TYPEAHEAD else True,
+                            list="game-news-suggestions",
                         ),
+                        html.Datalist(id="game-news-suggestions"),
                         html.Button("Search News", id="game-news-button", n_clicks=0),
-                        html.Div(id="game-news-result", style={"margin-top": "10px"}),
+                        html.Progress(id="game-news-progress", style=PROGRESS_HIDDEN),
+                        html.Div(
+                            "Enter game details and click search.",
+                            id="game-news-result",
+                            style={"margin-top": "10px"},
+                        ),
+                        dcc.Store(id="game-news-results"),
+                        html.Div(
+                            result_table("game-news-table", NEWS_COLUMNS),
+                            id="game-news-table-container",
+                            style=TABLE_HIDDEN,
+                        ),
                     ],
                     style={"margin-bottom": "20px"},
                 ),
@@ -80,11 +256,26 @@ app.layout = html.Div(
                             type="text",
                             placeholder="Enter game name...",
                             style={"width": "60%", "margin-right": "10px"},
+                            n_submit=0,
+                            debounce=0.3 if TYPEAHEAD else True,
+                            list="achievement-suggestions",
                         ),
+                        html.Datalist(id="achievement-suggestions"),
                         html.Button(
                             "Search Achievements", id="achievement-button", n_clicks=0
                         ),
-                        html.Div(id="achievement-result", style={"margin-top": "10px"}),
+                        html.Progress(id="achievement-progress", style=PROGRESS_HIDDEN),
+                        html.Div(
+                            "Enter game details and click search.",
+                            id="achievement-result",
+                            style={"margin-top": "10px"},
+                        ),
+                        dcc.Store(id="achievement-results"),
+                        html.Div(
+                            result_table("achievement-table", ACHIEVEMENT_COLUMNS),
+                            id="achievement-table-container",
+                            style=TABLE_HIDDEN,
+                        ),
                     ],
                     style={"margin-bottom": "20px"},
                 ),
@@ -99,11 +290,18 @@ app.layout = html.Div(
                             type="text",
                             placeholder="Enter username...",
                             style={"width": "60%", "margin-right": "10px"},
+                            n_submit=0,
+                            debounce=True,
                         ),
                         html.Button(
                             "Search Users", id="user-search-button", n_clicks=0
                         ),
-                        html.Div(id="user-result", style={"margin-top": "10px"}),
+                        html.Progress(id="user-progress", style=PROGRESS_HIDDEN),
+                        html.Div(
+                            "Enter a username and click search.",
+                            id="user-result",
+                            style={"margin-top": "10px"},
+                        ),
                     ],
                     style={"margin-bottom": "20px"},
                 ),
@@ -124,80 +322,69 @@ app.layout = html.Div(
 
 # Callback for game search
 @app.callback(
+    Output("game-results", "data"),
     Output("game-result", "children"),
     Input("game-search-button", "n_clicks"),
-    Input("game-search-bar", "value"),
+    Input("game-search-bar", "n_submit"),
+    State("game-search-bar", "value"),
+    background=True,
+    progress=[Output("game-progress", "value"), Output("game-progress", "max")],
+    running=[(Output("game-progress", "style"), PROGRESS_VISIBLE, PROGRESS_HIDDEN)],
+    cancel=[Input("game-search-bar", "value")],
+    prevent_initial_call=True,
 )
-def search_game(n_clicks, game_name):
-    if n_clicks > 0 and game_name:
+@timed_callback("search_game")
+def search_game(set_progress, n_clicks, n_submit, game_name):
+    if game_name:
+        set_progress((0, 2))
         games_data = fetch_game_data(game_name)
+        set_progress((1, 2))
         if isinstance(games_data, list) and games_data:  # Ensure it's a non-empty list
-            return [
-                html.Div(
-                    [
-                        # Game Image
-                        html.Img(
-                            src=game.get("tiny_image", ""),
-                            style={
-                                "width": "150px",
-                                "height": "auto",
-                                "margin-right": "10px",
-                                "border-radius": "5px",
-                            },
-                        ),
-                        html.Div(
-                            [
-                                # Game Name
-                                html.H4(game.get("name", "Unknown Name")),
-                                # Game ID
-                                html.P(f"ID: {game.get('id', 'N/A')}"),
-                                # Price
-                                html.P(
-                                    f"Price: ${game['price']['final'] / 100:.2f} "
-                                    f"{game['price'].get('currency', 'N/A')}"
-                                    if "price" in game and game["price"]
-                                    else "Price: Not available"
-                                ),
-                                # Metascore
-                                html.P(f"Metascore: {game.get('metascore', 'N/A')}"),
-                                # Platforms
-                                html.P(
-                                    f"Platforms: {', '.join([k.capitalize() for k, v in game.get('platforms', {}).items() if v]) or 'None'}"
-                                ),
-                                # Controller Support
-                                html.P(
-                                    f"Controller Support: {game.get('controller_support', 'None')}"
-                                ),
-                            ],
-                        ),
-                    ],
-                    style={
-                        "display": "flex",
-                        "flex-direction": "row",
-                        "align-items": "center",
-                        "border": "1px solid #ddd",
-                        "padding": "10px",
-                        "margin": "10px",
-                        "border-radius": "5px",
-                        "box-shadow": "2px 2px 5px rgba(0, 0, 0, 0.1)",
-                    },
-                )
+            rows = [
+                {
+                    "image": f"![]({game['tiny_image']})" if game.get("tiny_image") else "",
+                    "name": game.get("name", "Unknown Name"),
+                    "id": game.get("id"),
+                    # Price in dollars, from the smallest currency unit
+                    "price": game["price"]["final"] / 100
+                    if "price" in game and game["price"]
+                    else None,
+                    "currency": (game.get("price") or {}).get("currency"),
+                    "metascore": int(game["metascore"])
+                    if str(game.get("metascore", "")).isdigit()
+                    else None,
+                    "platforms": ", ".join(
+                        k.capitalize() for k, v in game.get("platforms", {}).items() if v
+                    )
+                    or "None",
+                    "controller_support": game.get("controller_support") or "None",
+                }
                 for game in games_data
             ]
+            return result_pages.store(rows), f"{len(rows)} games found."
         else:
-            return "No results found or invalid response."
-    return "Enter a game name and click search."
+            return None, "No results found or invalid response."
+    return None, "Enter a game name and click search."
 
 
 # Callback for user search
 @app.callback(
     Output("user-result", "children"),
     Input("user-search-button", "n_clicks"),
-    Input("user-search-bar", "value"),
+    Input("user-search-bar", "n_submit"),
+    State("user-search-bar", "value"),
+    background=True,
+    progress=[Output("user-progress", "value"), Output("user-progress", "max")],
+    running=[(Output("user-progress", "style"), PROGRESS_VISIBLE, PROGRESS_HIDDEN)],
+    cancel=[Input("user-search-bar", "value")],
+    prevent_initial_call=True,
 )
-def search_user(n_clicks, user_name):
-    if n_clicks > 0 and user_name:
+@timed_callback("search_user")
+def search_user(set_progress, n_clicks, n_submit, user_name):
+    if user_name:
+        set_progress((0, 2))
         user_data = fetch_user_data(user_name)
+        set_progress((1, 2))
         if isinstance(user_data, list) and user_data:
             return [
                 html.Div(
@@ -223,79 +410,119 @@ def search_user(n_clicks, user_name):
     return "Enter a username and click search."
 
 
-# Callback for game news search
 # Callback for game news search
 @app.callback(
+    Output("game-news-results", "data"),
     Output("game-news-result", "children"),
     Input("game-news-button", "n_clicks"),
-    Input("game-news-search-bar", "value"),
+    Input("game-news-search-bar", "n_submit"),
+    State("game-news-search-bar", "value"),
+    background=True,
+    progress=[Output("game-news-progress", "value"), Output("game-news-progress", "max")],
+    running=[(Output("game-news-progress", "style"), PROGRESS_VISIBLE, PROGRESS_HIDDEN)],
+    cancel=[Input("game-news-search-bar", "value")],
+    prevent_initial_call=True,
 )
-def search_game_news(n_clicks, game_name):
-    if n_clicks > 0 and game_name:
+@timed_callback("search_game_news")
+def search_game_news(set_progress, n_clicks, n_submit, game_name):
+    if game_name:
+        set_progress((0, 2))
         news_data = fetch_game_news(game_name)
+        set_progress((1, 2))
         if isinstance(news_data, dict) and "news" in news_data:
-            return [
-                html.Div(
-                    [
-                        # News Title
-                        html.H4(item["title"], style={"margin-bottom": "5px"}),
-                        # Link to Full Article
-                        html.A(
-                            "Read More",
-                            href=item["url"],
-                            target="_blank",
-                            style={"color": "blue", "text-decoration": "underline"},
-                        ),
-                        # Date
-                        html.P(
-                            f"Published on: {pd.to_datetime(item['date'], unit='s').strftime('%Y-%m-%d')}",
-                            style={"font-style": "italic", "margin-top": "5px"},
-                        ),
-                    ],
-                    style={
-                        "border": "1px solid #ddd",
-                        "padding": "10px",
-                        "margin": "10px",
-                        "border-radius": "5px",
-                        "box-shadow": "2px 2px 5px rgba(0, 0, 0, 0.1)",
-                    },
-                )
+            rows = [
+                {
+                    # Markdown link to the full article
+                    "title": f"[{item['title']}]({item['url']})",
+                    "date": datetime.fromtimestamp(item["date"], timezone.utc).strftime("%Y-%m-%d"),
+                }
                 for item in news_data["news"]
             ]
+            return result_pages.store(rows), f"{len(rows)} news items for '{game_name}'."
         else:
-            return f"No news found for '{game_name}'."
-    return "Enter game details and click search."
+            return None, f"No news found for '{game_name}'."
+    return None, "Enter game details and click search."
 
 
 # Callback for achievement data search
 @app.callback(
+    Output("achievement-results", "data"),
     Output("achievement-result", "children"),
     Input("achievement-button", "n_clicks"),
-    Input("achievement-search-bar", "value"),
+    Input("achievement-search-bar", "n_submit"),
+    State("achievement-search-bar", "value"),
+    background=True,
+    progress=[Output("achievement-progress", "value"), Output("achievement-progress", "max")],
+    running=[(Output("achievement-progress", "style"), PROGRESS_VISIBLE, PROGRESS_HIDDEN)],
+    cancel=[Input("achievement-search-bar", "value")],
+    prevent_initial_call=True,
 )
-def search_achievements(n_clicks, game_name):
-    if n_clicks > 0 and game_name:
+@timed_callback("search_achievements")
+def search_achievements(set_progress, n_clicks, n_submit, game_name):
+    if game_name:
+        set_progress((0, 2))
         achievement_data = fetch_achievement_data(game_name)
+        set_progress((1, 2))
         if isinstance(achievement_data, dict) and "achievements" in achievement_data:
-            return [
-                html.Div(
-                    [
-                        html.H4(achievement["name"]),
-                        html.P(f"Percent Unlocked: {achievement['percent']}%"),
-                    ],
-                    style={
-                        "border": "1px solid #ddd",
-                        "padding": "10px",
-                        "margin": "10px",
-                    },
-                )
+            rows = [
+                {"name": achievement["name"], "percent": round(float(achievement["percent"]), 2)}
                 for achievement in achievement_data["achievements"]
             ]
+            return result_pages.store(rows), f"{len(rows)} achievements for '{game_name}'."
         else:
-            return f"No achievements found for '{game_name}'."
-    return "Enter game details and click search."
+            return None, f"No achievements found for '{game_name}'."
+    return None, "Enter game details and click search."
+
+
+# Result tables only ever receive the visible page, filtered and sorted server-side
+def register_result_table(prefix):
+    @app.callback(
+        Output(f"{prefix}-table", "data"),
+        Output(f"{prefix}-table", "page_count"),
+        Output(f"{prefix}-table", "page_current"),
+        Output(f"{prefix}-table-container", "style"),
+        Input(f"{prefix}-results", "data"),
+        Input(f"{prefix}-table", "page_current"),
+        Input(f"{prefix}-table", "page_size"),
+        Input(f"{prefix}-table", "sort_by"),
+        Input(f"{prefix}-table", "filter_query"),
+    )
+    @timed_callback(f"{prefix}-page")
+    def show_page(results_key, page_current, page_size, sort_by, filter_query):
+        if not results_key:
+            return [], 1, 0, TABLE_HIDDEN
+        if ctx.triggered_id in (f"{prefix}-results", None):
+            # A new search starts back on the first page
+            page_current = 0
+        rows, page_count = result_pages.page(
+            results_key, page_current, page_size, sort_by, filter_query
+        )
+        return rows, page_count, min(page_current or 0, page_count - 1), TABLE_VISIBLE
+
+
+for prefix in ("game", "game-news", "achievement"):
+    register_result_table(prefix)
+
+
+# Typeahead for the game title inputs, served from the local app index when it exists
+def register_title_typeahead(prefix):
+    @app.callback(
+        Output(f"{prefix}-suggestions", "children"),
+        Input(f"{prefix}-search-bar", "value"),
+        prevent_initial_call=True,
+    )
+    @timed_callback(f"{prefix}-typeahead")
+    def suggest_titles(term):
+        if not term or len(term) < TYPEAHEAD_MIN_LENGTH:
+            return []
+        return [html.Option(value=name) for name in title_suggestions(term)]
+
+
+if TYPEAHEAD:
+    for prefix in ("game", "game-news", "achievement"):
+        register_title_typeahead(prefix)
 
 
-# Run the app
+# Run the development server; production runs wsgi:server under gunicorn (see gunicorn.conf.py)
 if __name__ == "__main__":
     app.run_server(debug=True, host="0.0.0.0", port=8050)
@@ -0,0 +1,7 @@
+"""
+Benchmark harness: a local fake Steam server, helper micro-benchmarks and a
+dashboard load generator, all reporting machine-readable JSON.
+
+    cd project && python -m benchmarks.run --suite all --out data/bench/run.json
+    python -m benchmarks.compare data/bench/base.json data/bench/run.json
+"""
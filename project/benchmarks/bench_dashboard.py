@@ -0,0 +1,117 @@
+"""
+Concurrent load generator for the dashboard callbacks.
+
+Imports app.py with Steam pointed at the fake server and drives the search
+and result-table callbacks from a thread pool, the way the Dash server's job
+processes and request threads call them. The Dash HTTP round-trip and
+background-job scheduling are not included; this measures the callback work.
+"""
+
+import importlib
+import os
+import random
+import tempfile
+
+from .bench_helpers import UNLIMITED
+from .fake_steam import FIRST_APP_ID, app_name
+from .timing import measure_concurrent
+
+
+def _no_progress(progress):
+    pass
+
+
+def load_app(base_url, db_first=False, job_cache_dir=None):
+    """
+    Import app.py for the load test. STEAM_API_BASE and friends must already
+    point at the fake server when the helpers are first imported (benchmarks.run
+    sets them before importing anything), since the base URLs are read then.
+    """
+    from helpers import steam_responses
+    from helpers.rate_limiter import shared_rate_limiter
+
+    if steam_responses.STEAM_API_BASE != base_url:
+        raise RuntimeError(
+            f"Steam base URL is {steam_responses.STEAM_API_BASE}, not the fake server at {base_url}"
+        )
+    os.environ.update(
+        {
+            "DASH_DB_FIRST": "true" if db_first else "false",
+            "DASH_TYPEAHEAD": "false",
+            "DASH_JOB_CACHE_DIR": job_cache_dir or tempfile.mkdtemp(prefix="bench-jobs-"),
+        }
+    )
+    # The fake server has no quotas; lift the shared limiter's so it isn't what gets measured
+    limiter = shared_rate_limiter()
+    limiter.family_limits = {family: UNLIMITED for family in limiter.family_limits}
+    limiter.key_limit = UNLIMITED
+    return importlib.import_module("app")
+
+
+def bench_dashboard(base_url, requests=500, concurrency=16, titles=200, db_first=False):
+    """
+    Each scenario issues `requests` callback calls spread over `titles` distinct
+    games, so repeated titles exercise the shared result caches the way popular
+    searches do in production.
+    """
+    app = load_app(base_url, db_first=db_first)
+    rng = random.Random(0)
+    title_for = [app_name(FIRST_APP_ID + rng.randrange(titles)) for _ in range(requests)]
+    extra = {"titles": titles, "db_first": db_first}
+
+    def search_then_page(search):
+        def run(i):
+            key, message = search(_no_progress, 1, None, title_for[i])
+            if key is None:
+                raise LookupError(message)
+            app.result_pages.page(key, 0, app.RESULTS_PAGE_SIZE, [], "")
+
+        return run
+
+    results = [
+        measure_concurrent(
+            "dashboard.search_game",
+            search_then_page(app.search_game),
+            requests,
+            concurrency,
+            **extra,
+        ),
+        measure_concurrent(
+            "dashboard.search_game_news",
+            search_then_page(app.search_game_news),
+            requests,
+            concurrency,
+            **extra,
+        ),
+        measure_concurrent(
+            "dashboard.search_achievements",
+            search_then_page(app.search_achievements),
+            requests,
+            concurrency,
+            **extra,
+        ),
+        measure_concurrent(
+            "dashboard.search_user",
+            lambda i: app.search_user(_no_progress, 1, None, f"player {i % titles}"),
+            requests,
+            concurrency,
+            is_error=lambda children: isinstance(children, str),
+            **extra,
+        ),
+    ]
+
+    # Paging, sorting and filtering one large stored result, as the table callback does
+    key, _ = app.search_achievements(_no_progress, 1, None, app_name(FIRST_APP_ID))
+    sorts = ([], [{"column_id": "percent", "direction": "asc"}])
+    filters = ("", "{percent} ge 50", "{name} contains 1")
+    results.append(
+        measure_concurrent(
+            "dashboard.result_page",
+            lambda i: app.result_pages.page(
+                key, i % 40, app.RESULTS_PAGE_SIZE, sorts[i % 2], filters[i % 3]
+            ),
+            requests,
+            concurrency,
+        )
+    )
+    return results
@@ -0,0 +1,244 @@
+"""
+Micro-benchmarks for APIHelper (against the fake Steam server) and for
+MySQLHelper reads and bulk writes (against the configured MySQL database).
+"""
+
+import itertools
+import os
+import tempfile
+
+from helpers.mysql_helper import MySQLHelper
+from helpers.rate_limiter import RateLimiter
+from helpers.response_cache import ResponseCache
+from helpers.steam_api_helper import APIHelper
+
+from .fake_steam import FIRST_APP_ID, FIRST_STEAM_ID, app_name
+from .timing import measure
+
+# Large enough that the client-side rate limiter never waits during a benchmark
+UNLIMITED = (1e9, 1e9)
+
+BENCH_TABLE = "BenchUserOwnedGames"
+
+
+def _is_error(value):
+    # APIHelper reports failures as strings instead of raising
+    return isinstance(value, str)
+
+
+def benchmark_helper(base_url, cache=False):
+    return APIHelper(
+        api_base=base_url,
+        store_base=base_url,
+        community_base=base_url,
+        max_retries=0,
+        rate_limiter=RateLimiter(
+            family_limits={"webapi": UNLIMITED, "store": UNLIMITED, "community": UNLIMITED},
+            key_limit=UNLIMITED,
+        ),
+        cache=cache,
+    )
+
+
+def bench_api(base_url, iterations=50, apps=2000):
+    """
+    Time every APIHelper method against the fake server, each call for a different
+    app or user; the cached variants repeat one request through a ResponseCache.
+    """
+    helper = benchmark_helper(base_url)
+    app_ids = itertools.cycle(range(FIRST_APP_ID, FIRST_APP_ID + apps))
+    steam_ids = itertools.cycle(range(FIRST_STEAM_ID, FIRST_STEAM_ID + 10_000))
+    options = {"iterations": iterations, "is_error": _is_error}
+
+    results = [
+        measure("api.getAllSteamApps", helper.getAllSteamApps, **{**options, "iterations": 5}),
+        measure(
+            "api.searchSteamApps",
+            lambda: helper.searchSteamApps(app_name(next(app_ids))),
+            **options,
+        ),
+        # Memoized in app_id_cache after the first lookup of each title
+        measure(
+            "api.resolveAppID",
+            lambda: helper.resolveAppID(app_name(next(app_ids))),
+            **options,
+        ),
+        measure(
+            "api.getGamePlayerCount",
+            lambda: helper.getGamePlayerCount(app_id=next(app_ids)),
+            **options,
+        ),
+        measure(
+            "api.getGameAchievementData",
+            lambda: helper.getGameAchievementData(app_id=next(app_ids)),
+            **options,
+        ),
+        measure("api.getGameNews", lambda: helper.getGameNews(app_id=next(app_ids)), **options),
+        measure("api.getAppDetails", lambda: helper.getAppDetails(next(app_ids)), **options),
+        measure(
+            "api.getUserOwnedGames",
+            lambda: helper.getUserOwnedGames(next(steam_ids)),
+            **options,
+        ),
+        measure(
+            "api.getUserStatsForApp",
+            lambda: helper.getUserStatsForApp(next(steam_ids), next(app_ids)),
+            **options,
+        ),
+        measure(
+            "api.getSteamIDFromVanity",
+            lambda: helper.getSteamIDFromVanity(f"vanity{next(steam_ids)}"),
+            **options,
+        ),
+        # A 1,000-user cohort: 10 GetPlayerSummaries calls, and 500 distinct vanities
+        measure(
+            "api.getPlayerSummaries.1000",
+            lambda: helper.getPlayerSummaries([next(steam_ids) for _ in range(1000)]),
+            iterations=max(1, iterations // 10),
+            is_error=lambda summaries: not summaries,
+        ),
+        measure(
+            "api.resolveSteamIDs.1000",
+            lambda: helper.resolveSteamIDs(
+                [f"https://steamcommunity.com/id/vanity{next(steam_ids)}" for _ in range(500)]
+                + [str(next(steam_ids)) for _ in range(500)]
+            ),
+            iterations=max(1, iterations // 10),
+        ),
+        measure(
+            "api.searchSteamDisplayNamesAjax",
+            lambda: helper.searchSteamDisplayNamesAjax(f"player{next(steam_ids)}"),
+            **options,
+        ),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = os.path.join(directory, "app_index")
+        results.append(
+            measure(
+                "api.loadAppIndex.build",
+                lambda: helper.loadAppIndex(path=index_path, refresh=True),
+                iterations=1,
+                warmup=0,
+            )
+        )
+        results.append(
+            measure(
+                "api.searchLocalApps",
+                lambda: helper.searchLocalApps(f"game {next(app_ids)}"),
+                iterations=iterations * 10,
+            )
+        )
+
+        cached = benchmark_helper(
+            base_url, cache=ResponseCache(path=os.path.join(directory, "responses.sqlite3"))
+        )
+        results.append(
+            measure(
+                "api.getGameAchievementData.cached",
+                lambda: cached.getGameAchievementData(app_id=FIRST_APP_ID),
+                **options,
+            )
+        )
+        results.append(
+            measure(
+                "api.getUserOwnedGames.cached",
+                lambda: cached.getUserOwnedGames(FIRST_STEAM_ID),
+                **options,
+            )
+        )
+        cached.close()
+
+    helper.close()
+    return results
+
+
+def _owned_rows(first_user, users, games_per_user):
+    return [
+        {
+            "user_id": first_user + u,
+            "app_id": FIRST_APP_ID + g,
+            "playtime_forever": (u * g) % 50_000,
+            "playtime_2weeks": g % 3 * 60,
+        }
+        for u in range(users)
+        for g in range(games_per_user)
+    ]
+
+
+def bench_db(iterations=5, rows=10_000, batch_size=1000):
+    """
+    Bulk writes and reads on a scratch copy of UserOwnedGames in the configured
+    database. Returns [] when MySQL isn't reachable.
+    """
+    db = MySQLHelper(pool_size=4)
+    db.connect()
+    if not db.is_connected:
+        print("Skipping database benchmarks: could not connect to MySQL.")
+        return []
+
+    users = max(1, rows // 100)
+    # Every write iteration targets a fresh key range, so inserts never collide
+    ranges = itertools.count(FIRST_STEAM_ID, users)
+    options = {"iterations": iterations, "warmup": 1, "is_error": lambda written: written is None}
+    extra = {"rows": rows, "batch_size": batch_size}
+
+    db.execute_query(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    db.execute_query(f"CREATE TABLE {BENCH_TABLE} LIKE UserOwnedGames")
+    try:
+        results = [
+            measure(
+                "db.bulk_insert",
+                lambda: db.bulk_insert(
+                    BENCH_TABLE, _owned_rows(next(ranges), users, 100), batch_size=batch_size
+                ),
+                **options,
+                **extra,
+            ),
+            measure(
+                "db.load_data_infile",
+                lambda: db.load_data_infile(BENCH_TABLE, _owned_rows(next(ranges), users, 100)),
+                **options,
+                **extra,
+            ),
+        ]
+        # Upserts rewrite rows that already exist
+        existing = _owned_rows(FIRST_STEAM_ID, users, 100)
+        results.append(
+            measure(
+                "db.upsert.update",
+                lambda: db.upsert(
+                    BENCH_TABLE,
+                    existing,
+                    update_columns=["playtime_forever", "playtime_2weeks"],
+                    batch_size=batch_size,
+                ),
+                **options,
+                **extra,
+            )
+        )
+
+        user_ids = itertools.cycle(range(FIRST_STEAM_ID, FIRST_STEAM_ID + users))
+        results.append(
+            measure(
+                "db.execute_query.library",
+                lambda: db.execute_query(
+                    f"SELECT app_id, playtime_forever FROM {BENCH_TABLE} WHERE user_id = %s",
+                    (next(user_ids),),
+                ),
+                iterations=iterations * 100,
+                is_error=lambda found: found is None,
+            )
+        )
+        results.append(
+            measure(
+                "db.query_dataframe.scan",
+                lambda: db.query_dataframe(f"SELECT * FROM {BENCH_TABLE} LIMIT %s", (rows,)),
+                **options,
+                **extra,
+            )
+        )
+    finally:
+        db.execute_query(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        db.close()
+    return results
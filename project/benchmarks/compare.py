@@ -0,0 +1,82 @@
+"""
+Compare two benchmark reports and flag regressions.
+
+    cd project && python -m benchmarks.compare data/bench/base.json data/bench/run.json --threshold 0.1
+
+Exits 1 when any benchmark's p50 or p95 grew, or its throughput fell, by more
+than the threshold (a fraction of the baseline), or when it started failing.
+"""
+
+import argparse
+import json
+import sys
+
+LATENCY_METRICS = ("p50_ms", "p95_ms")
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return {result["name"]: result for result in json.load(f)["results"]}
+
+
+def _change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    [(name, metric, before, after, relative change, regressed)] for every
+    metric present in both reports.
+    """
+    rows = []
+    for name, after in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for metric in LATENCY_METRICS:
+            change = _change(before.get(metric), after.get(metric))
+            if change is not None:
+                rows.append((name, metric, before[metric], after[metric], change, change > threshold))
+        change = _change(before.get("throughput_per_s"), after.get("throughput_per_s"))
+        if change is not None:
+            rows.append(
+                (
+                    name,
+                    "throughput_per_s",
+                    before["throughput_per_s"],
+                    after["throughput_per_s"],
+                    change,
+                    change < -threshold,
+                )
+            )
+        if after.get("errors", 0) > before.get("errors", 0):
+            rows.append((name, "errors", before.get("errors", 0), after["errors"], None, True))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    baseline, current = _load(args.baseline), _load(args.current)
+    rows = compare(baseline, current, args.threshold)
+    regressions = 0
+    for name, metric, before, after, change, regressed in rows:
+        regressions += regressed
+        delta = "" if change is None else f"{change:+.1%}"
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<40} {metric:<17} {before:>12.3f} {after:>12.3f} {delta:>9} {flag}")
+    for name in sorted(set(baseline) - set(current)):
+        print(f"{name:<40} missing from {args.current}")
+
+    print(f"{regressions} regression(s) over {args.threshold:.0%}.")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
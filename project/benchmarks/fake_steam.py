@@ -0,0 +1,384 @@
+"""
+Local stand-in for the Steam Web API, storefront and community search.
+
+Serves every endpoint APIHelper calls from one base URL, with deterministic
+synthetic payloads and configurable latency, error rate and payload sizes, so
+benchmarks measure our code rather than Steam. Point a helper at it with
+APIHelper(api_base=url, store_base=url, community_base=url), or the whole
+dashboard with STEAM_API_BASE / STEAM_STORE_BASE / STEAM_COMMUNITY_BASE.
+
+    python -m benchmarks.fake_steam --port 8765 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from helpers.community_search import RESULTS_PER_PAGE, SEARCH_AJAX_PATH
+from helpers.steam_responses import (
+    ACHIEVEMENT_PERCENTAGES_PATH,
+    APP_DETAILS_PATH,
+    APP_LIST_PATH,
+    NEWS_PATH,
+    OWNED_GAMES_PATH,
+    PLAYER_COUNT_PATH,
+    PLAYER_SUMMARIES_PATH,
+    RESOLVE_VANITY_PATH,
+    STORE_SEARCH_PATH,
+    USER_STATS_PATH,
+)
+
+FIRST_APP_ID = 10
+FIRST_STEAM_ID = 76561197960265728
+SEARCH_LIMIT = 10
+
+
+@dataclass
+class FakeSteamConfig:
+    apps: int = 2000
+    achievements: int = 1000  # per game
+    owned_games: int = 5000  # per user
+    user_stats: int = 50  # stats and achievements per user and game
+    news_items: int = 20
+    news_bytes: int = 2000  # contents length per news item
+    profiles: int = 200  # community search matches per query
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # plus up to this many seconds, uniformly
+    error_rate: float = 0.0  # fraction of requests answered with error_status
+    error_status: int = 503
+    seed: int = 0
+
+
+def app_name(app_id):
+    return f"Fake Game {app_id}"
+
+
+class FakeSteam:
+    """
+    Payload generation, independent of HTTP so it can also be called directly.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.app_ids = range(FIRST_APP_ID, FIRST_APP_ID + config.apps)
+        # Encoded payloads are memoized so the server spends its time sleeping, not serializing
+        self.payload = lru_cache(maxsize=4096)(self._payload)
+
+    def _rng(self, *parts):
+        # String seeds hash the same in every process, unlike hash()
+        return random.Random(repr((self.config.seed, *parts)))
+
+    def _payload(self, path, key):
+        return json.dumps(self.build(path, key)).encode("utf-8")
+
+    def build(self, path, key):
+        config = self.config
+        if path == APP_LIST_PATH:
+            return {"applist": {"apps": [{"appid": a, "name": app_name(a)} for a in self.app_ids]}}
+
+        if path == STORE_SEARCH_PATH:
+            term = key.lower()
+            items = [
+                self._store_item(a)
+                for a in self.app_ids
+                if term in app_name(a).lower()
+            ][:SEARCH_LIMIT]
+            return {"total": len(items), "items": items}
+
+        if path == PLAYER_COUNT_PATH:
+            count = self._rng("players", key).randint(0, 100_000)
+            return {"response": {"player_count": count, "result": 1}}
+
+        if path == ACHIEVEMENT_PERCENTAGES_PATH:
+            rng = self._rng("achievements", key)
+            achievements = [
+                {"name": f"ACH_{key}_{i}", "percent": round(rng.uniform(0.1, 99.9), 1)}
+                for i in range(config.achievements)
+            ]
+            achievements.sort(key=lambda a: a["percent"], reverse=True)
+            return {"achievementpercentages": {"achievements": achievements}}
+
+        if path == NEWS_PATH:
+            return {
+                "appnews": {
+                    "appid": int(key),
+                    "newsitems": [
+                        {
+                            "gid": f"{key}{i}",
+                            "title": f"{app_name(key)} update {i}",
+                            "url": f"https://example.com/news/{key}/{i}",
+                            "contents": "x" * config.news_bytes,
+                            "date": 1_700_000_000 - i * 86_400,
+                        }
+                        for i in range(config.news_items)
+                    ],
+                }
+            }
+
+        if path == USER_STATS_PATH:
+            steam_id, app_id = key
+            rng = self._rng("stats", steam_id, app_id)
+            return {
+                "playerstats": {
+                    "steamID": steam_id,
+                    "gameName": app_name(app_id),
+                    "stats": [
+                        {"name": f"stat_{i}", "value": rng.randint(0, 10_000)}
+                        for i in range(config.user_stats)
+                    ],
+                    "achievements": [
+                        {"name": f"ACH_{app_id}_{i}", "achieved": rng.randint(0, 1)}
+                        for i in range(config.user_stats)
+                    ],
+                }
+            }
+
+        if path == OWNED_GAMES_PATH:
+            rng = self._rng("owned", key)
+            app_ids = rng.sample(self.app_ids, min(config.owned_games, config.apps))
+            games = [
+                {
+                    "appid": a,
+                    "name": app_name(a),
+                    "playtime_forever": rng.randint(0, 50_000),
+                    "playtime_2weeks": rng.choice((0, 0, 0, rng.randint(1, 2_000))),
+                }
+                for a in app_ids
+            ]
+            return {"response": {"game_count": len(games), "games": games}}
+
+        if path == RESOLVE_VANITY_PATH:
+            steam_id = FIRST_STEAM_ID + self._rng("vanity", key).randint(0, 10**9)
+            return {"response": {"steamid": str(steam_id), "success": 1}}
+
+        if path == PLAYER_SUMMARIES_PATH:
+            return {
+                "response": {
+                    "players": [
+                        {
+                            "steamid": steam_id,
+                            "personaname": f"player {steam_id[-6:]}",
+                            "profileurl": f"https://steamcommunity.com/profiles/{steam_id}/",
+                            "avatar": f"https://example.com/avatars/{steam_id}.jpg",
+                            "communityvisibilitystate": 3,
+                        }
+                        for steam_id in key.split(",")
+                        if steam_id
+                    ]
+                }
+            }
+
+        if path == APP_DETAILS_PATH:
+            item = self._store_item(int(key))
+            data = {
+                "type": "game",
+                "name": item["name"],
+                "steam_appid": item["id"],
+                "is_free": False,
+                "header_image": item["tiny_image"],
+                "price_overview": {
+                    "currency": "USD",
+                    "initial": item["price"]["initial"],
+                    "final": item["price"]["final"],
+                },
+                "platforms": item["platforms"],
+                "metacritic": {"score": int(item["metascore"] or 0)},
+                "controller_support": item["controller_support"],
+            }
+            return {key: {"success": True, "data": data}}
+
+        if path == SEARCH_AJAX_PATH:
+            text, page = key
+            first = (page - 1) * RESULTS_PER_PAGE
+            rows = "".join(
+                '<div class="search_row"><a class="searchPersonaName"'
+                f' href="https://steamcommunity.com/profiles/{FIRST_STEAM_ID + i}">{text} {i}</a></div>'
+                for i in range(first, min(first + RESULTS_PER_PAGE, config.profiles))
+            )
+            return {"success": 1, "html": rows, "search_result_count": config.profiles}
+
+        return None
+
+    def _store_item(self, app_id):
+        rng = self._rng("store", app_id)
+        price = rng.choice((0, 499, 999, 1999, 2999, 5999))
+        return {
+            "type": "app",
+            "name": app_name(app_id),
+            "id": app_id,
+            "tiny_image": f"https://example.com/apps/{app_id}/capsule.jpg",
+            "metascore": str(rng.randint(40, 99)) if rng.random() < 0.5 else "",
+            "platforms": {"windows": True, "mac": rng.random() < 0.4, "linux": rng.random() < 0.3},
+            "streamingvideo": False,
+            "controller_support": rng.choice((None, "partial", "full")),
+            "price": {"currency": "USD", "initial": price, "final": price},
+        }
+
+    def request_key(self, path, query):
+        """The part of a request's query string that its payload depends on."""
+
+        def first(name, default=""):
+            return query.get(name, [default])[0]
+
+        if path == STORE_SEARCH_PATH:
+            return first("term")
+        if path in (PLAYER_COUNT_PATH, NEWS_PATH):
+            return first("appid")
+        if path == ACHIEVEMENT_PERCENTAGES_PATH:
+            return first("gameid")
+        if path == USER_STATS_PATH:
+            return first("steamid"), first("appid")
+        if path == OWNED_GAMES_PATH:
+            return first("steamid")
+        if path == RESOLVE_VANITY_PATH:
+            return first("vanityurl")
+        if path == PLAYER_SUMMARIES_PATH:
+            return first("steamids")
+        if path == APP_DETAILS_PATH:
+            return first("appids")
+        if path == SEARCH_AJAX_PATH:
+            return first("text"), int(first("page", "1"))
+        return ""
+
+
+def make_handler(steam):
+    config = steam.config
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like Steam
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            rng = random.Random()
+            delay = config.latency + (rng.uniform(0, config.jitter) if config.jitter else 0)
+            if delay:
+                time.sleep(delay)
+
+            if config.error_rate and rng.random() < config.error_rate:
+                self._send(config.error_status, b'{"error": "injected"}')
+                return
+            if url.path == "/":
+                # Community home page: only needed for its sessionid cookie
+                self._send(200, b"<html></html>", "text/html", {"Set-Cookie": "sessionid=fake; Path=/"})
+                return
+            key = steam.request_key(url.path, parse_qs(url.query))
+            try:
+                body = steam.payload(url.path, key)
+            except (ValueError, TypeError):
+                self._send(400, b'{"error": "bad request"}')
+                return
+            if body == b"null":
+                self._send(404, b'{"error": "not found"}')
+            else:
+                self._send(200, body)
+
+        def _send(self, status, body, content_type="application/json", headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class FakeSteamHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog of 5 drops connection bursts, and every dropped SYN
+    # costs the client a 1 s retransmit that would show up as upstream latency
+    request_queue_size = 1024
+
+
+def make_server(config, host="127.0.0.1", port=0):
+    return FakeSteamHTTPServer((host, port), make_handler(FakeSteam(config)))
+
+
+def _serve(config, host, port, ready):
+    server = make_server(config, host, port)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class FakeSteamServer:
+    """
+    The fake server in a child process, so its work doesn't compete with the
+    code under test for the GIL.
+
+        with FakeSteamServer(FakeSteamConfig(latency=0.05)) as server:
+            helper = APIHelper(api_base=server.url, store_base=server.url, community_base=server.url)
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or FakeSteamConfig()
+        self.host = host
+        self.port = port
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(self.config, self.host, self.port, ready), daemon=True
+        )
+        self.process.start()
+        self.port = ready.get(timeout=30)
+        return self
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def config_arguments(parser):
+    """Add a --flag for every FakeSteamConfig field."""
+    for name, default in asdict(FakeSteamConfig()).items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", dest=f"fake_{name}", type=type(default), default=default
+        )
+
+
+def config_from_args(args):
+    return FakeSteamConfig(
+        **{name: getattr(args, f"fake_{name}") for name in asdict(FakeSteamConfig())}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Steam API locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    config_arguments(parser)
+    args = parser.parse_args()
+
+    server = make_server(config_from_args(args), args.host, args.port)
+    print(f"Fake Steam listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Cold-import budget for the dashboard and the helpers every worker and ingestion job loads.
+
+Imports each target in fresh interpreters, takes the fastest of several runs, and
+fails if it exceeds its budget or drags in a module that should only load on the
+code path that needs it (selenium, bs4, pandas, ...). Also reports peak RSS and
+the slowest modules from -X importtime. tests/test_import_budget.py runs the same
+checks as part of the test suite.
+
+    cd project && python -m benchmarks.import_budget --runs 5 --out data/bench/imports.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .timing import report, write_report
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only by the paths that need them, never by a bare import
+LAZY_MODULES = ("selenium", "bs4", "lxml", "pandas", "pyarrow", "dotenv")
+# The app also connects to MySQL (which reads .env), but never scrapes or builds frames
+APP_LAZY_MODULES = ("selenium", "bs4", "lxml", "pandas", "pyarrow")
+
+# (import statement, budget in seconds, modules it must not load)
+TARGETS = (
+    ("from helpers.steam_api_helper import APIHelper", 0.35, LAZY_MODULES),
+    ("from helpers.async_steam_api_helper import AsyncAPIHelper", 0.45, LAZY_MODULES),
+    ("from helpers.ingestion import IngestionPipeline", 0.6, LAZY_MODULES),
+    ("import app", 0.8, APP_LAZY_MODULES),
+)
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": seconds,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": sorted({{name.split(".")[0] for name in sys.modules}}),
+}}))
+"""
+
+
+def _probe(statement):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(statement=statement)],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_DIR,
+    )
+    if completed.returncode != 0:
+        raise ImportError(completed.stderr.strip().splitlines()[-1])
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    slowest = []
+    for line in completed.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[1].isdigit():
+            slowest.append((int(parts[1]), parts[2]))
+    slowest.sort(reverse=True)
+    result["slowest_ms"] = {name: us / 1000 for us, name in slowest[:10]}
+    return result
+
+
+def check(statement, budget, runs=5, lazy_modules=LAZY_MODULES):
+    probes = [_probe(statement) for _ in range(runs)]
+    best = min(probes, key=lambda probe: probe["seconds"])
+    lazy_loaded = [name for name in lazy_modules if name in best["modules"]]
+
+    problems = []
+    if best["seconds"] > budget:
+        problems.append(f"took {best['seconds']:.3f}s, budget {budget:.3f}s")
+    if lazy_loaded:
+        problems.append(f"eagerly imported {', '.join(lazy_loaded)}")
+    return {
+        "name": f"import.{statement.split()[-1]}",
+        "statement": statement,
+        "iterations": runs,
+        "errors": 0,
+        "min_ms": best["seconds"] * 1000,
+        "p50_ms": sorted(probe["seconds"] for probe in probes)[runs // 2] * 1000,
+        "budget_ms": budget * 1000,
+        "max_rss_kb": best["max_rss_kb"],
+        "lazy_modules_loaded": lazy_loaded,
+        "slowest_ms": best["slowest_ms"],
+        "problems": problems,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cold-import time of the helpers.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    parser.add_argument("--out", default=None, help="also write a JSON report here")
+    args = parser.parse_args()
+
+    results = []
+    for statement, budget, lazy_modules in TARGETS:
+        try:
+            result = check(statement, budget * args.scale, args.runs, lazy_modules)
+        except ImportError as e:
+            print(f"[FAIL] {statement}: {e}")
+            results.append({"name": f"import.{statement.split()[-1]}", "problems": [str(e)]})
+            continue
+        results.append(result)
+        status = "FAIL" if result["problems"] else "ok"
+        print(
+            f"[{status:>4}] {statement}: {result['min_ms']:.1f} ms"
+            f" (budget {result['budget_ms']:.0f} ms), {result['max_rss_kb'] / 1024:.1f} MiB RSS"
+        )
+        for problem in result["problems"]:
+            print(f"         {problem}")
+
+    if args.out:
+        write_report(report("imports", results, vars(args)), args.out)
+    sys.exit(1 if any(result["problems"] for result in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Run the benchmark suites and write one JSON report.
+
+    cd project && python -m benchmarks.run --suite all --out data/bench/run.json
+    python -m benchmarks.run --suite api --latency 0.05 --error-rate 0.01 --achievements 1000
+
+Suites: api (APIHelper vs. the fake server), db (MySQLHelper vs. the MySQL
+settings in .env; skipped when unreachable), dashboard (concurrent callback load).
+"""
+
+import argparse
+import os
+import socket
+import tempfile
+
+SUITES = ("api", "db", "dashboard")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _point_helpers_at(base_url):
+    # Read when the helpers are first imported, so this must happen before any of them are
+    os.environ["STEAM_API_BASE"] = base_url
+    os.environ["STEAM_STORE_BASE"] = base_url
+    os.environ["STEAM_COMMUNITY_BASE"] = base_url
+    # Keep benchmark responses out of the real response cache and app index
+    scratch = tempfile.mkdtemp(prefix="bench-")
+    os.environ["STEAM_CACHE_PATH"] = os.path.join(scratch, "steam_cache.sqlite3")
+    os.environ["STEAM_APP_INDEX_DIR"] = os.path.join(scratch, "app_index")
+
+
+def main():
+    base_url = f"http://127.0.0.1:{_free_port()}"
+    _point_helpers_at(base_url)
+
+    from .fake_steam import FakeSteamServer, config_arguments, config_from_args
+    from .timing import report, write_report
+
+    parser = argparse.ArgumentParser(description="Run the benchmark suites.")
+    parser.add_argument("--suite", choices=SUITES + ("all",), default="all")
+    parser.add_argument(
+        "--out", default="data/bench/latest.json", help="JSON report path, or - for stdout"
+    )
+    parser.add_argument("--iterations", type=int, default=50, help="calls per API benchmark")
+    parser.add_argument("--db-iterations", type=int, default=5)
+    parser.add_argument("--db-rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500, help="calls per dashboard scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--titles", type=int, default=200, help="distinct games in the load test")
+    parser.add_argument("--db-first", action="store_true", help="load-test the MySQL read path")
+    config_arguments(parser)
+    args = parser.parse_args()
+    suites = SUITES if args.suite == "all" else (args.suite,)
+
+    fake_config = config_from_args(args)
+    results = []
+    with FakeSteamServer(fake_config, port=int(base_url.rsplit(":", 1)[1])) as server:
+        if "api" in suites:
+            from .bench_helpers import bench_api
+
+            results += bench_api(server.url, iterations=args.iterations, apps=fake_config.apps)
+        if "db" in suites:
+            from .bench_helpers import bench_db
+
+            results += bench_db(iterations=args.db_iterations, rows=args.db_rows)
+        if "dashboard" in suites:
+            from .bench_dashboard import bench_dashboard
+
+            results += bench_dashboard(
+                server.url,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                titles=min(args.titles, fake_config.apps),
+                db_first=args.db_first,
+            )
+
+    config = {key: value for key, value in vars(args).items() if key != "out"}
+    write_report(report(args.suite, results, config), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Timing loops, latency summaries and the JSON report format shared by every suite.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+REPORT_VERSION = 1
+
+
+def percentile(sorted_values, fraction):
+    """Linearly interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(name, durations, errors=0, wall_time=None, **extra):
+    """
+    One result entry: latency percentiles in milliseconds, plus throughput when
+    the wall-clock time of the whole run is known.
+    """
+    ms = sorted(d * 1000 for d in durations)
+    result = {
+        "name": name,
+        "iterations": len(ms) + errors,
+        "errors": errors,
+        "mean_ms": sum(ms) / len(ms) if ms else None,
+        "min_ms": ms[0] if ms else None,
+        "p50_ms": percentile(ms, 0.50),
+        "p95_ms": percentile(ms, 0.95),
+        "p99_ms": percentile(ms, 0.99),
+        "max_ms": ms[-1] if ms else None,
+    }
+    if wall_time:
+        # Successful calls only, so a run that fails fast does not look faster
+        result["throughput_per_s"] = len(ms) / wall_time
+    result.update(extra)
+    return result
+
+
+def _timed(fn, is_error):
+    start = time.perf_counter()
+    try:
+        value = fn()
+    except Exception:
+        return time.perf_counter() - start, True
+    return time.perf_counter() - start, bool(is_error and is_error(value))
+
+
+def measure(name, fn, iterations=50, warmup=3, is_error=None, quiet=True, **extra):
+    """
+    Time fn() sequentially. is_error(value) marks a returned value as a failure
+    (the helpers report most failures as strings rather than raising).
+    """
+    # The helpers print on every write; keep that out of the timings and the terminal
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        for _ in range(warmup):
+            _timed(fn, is_error)
+        durations, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(iterations):
+            duration, failed = _timed(fn, is_error)
+            if failed:
+                errors += 1
+            else:
+                durations.append(duration)
+        wall_time = time.perf_counter() - started
+    return summarize(name, durations, errors, wall_time, **extra)
+
+
+def measure_concurrent(name, fn, requests=500, concurrency=16, is_error=None, **extra):
+    """
+    Call fn(i) for i in range(requests) from `concurrency` threads and report
+    per-call latency and overall throughput.
+    """
+    durations, errors = [], 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        duration, failed = _timed(lambda: fn(i), is_error)
+        with lock:
+            if failed:
+                errors += 1
+            else:
+                durations.append(duration)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall_time = time.perf_counter() - started
+    return summarize(name, durations, errors, wall_time, concurrency=concurrency, **extra)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(suite, results, config=None):
+    return {
+        "version": REPORT_VERSION,
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config or {},
+        "results": results,
+    }
+
+
+def write_report(data, path=None):
+    """Write the report to path (or stdout when path is None or "-")."""
+    text = json.dumps(data, indent=2, default=str)
+    if path in (None, "-"):
+        print(text)
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"Wrote {len(data['results'])} results to {path}")
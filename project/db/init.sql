@@ -22,15 +22,15 @@ CREATE TABLE `Games` (
   `platforms_mac` TINYINT(1),
   `platforms_linux` TINYINT(1),
   `streamingvideo` TINYINT(1),
-  `controller_support` VARCHAR(255)
+  `controller_support` VARCHAR(255),
+  INDEX `idx_games_name` (`name`)
 );
 
 CREATE TABLE `Achievements` (
-  `id` INT AUTO_INCREMENT PRIMARY KEY,
   `app_id` INT NOT NULL,
-  `name` VARCHAR(255),
+  `name` VARCHAR(255) NOT NULL,
   `percent` FLOAT,
-  INDEX `idx_achievements_app_id` (`app_id`)
+  PRIMARY KEY (`app_id`, `name`)
 );
 
 CREATE TABLE `PlayerCounts` (
@@ -41,56 +41,138 @@ CREATE TABLE `PlayerCounts` (
 );
 
 CREATE TABLE `Users` (
-  `id` VARCHAR(255) PRIMARY KEY,
+  `id` BIGINT UNSIGNED PRIMARY KEY, -- SteamID64
   `display_name` VARCHAR(255),
   `profile_url` VARCHAR(2083)
 );
 
+-- The per-user tables are clustered on their natural key, so a user's rows are
+-- one primary-key range scan. Secondary indexes implicitly carry user_id, which
+-- makes the (app_id, ...) indexes covering for per-game queries.
 CREATE TABLE `UserOwnedGames` (
-  `id` INT AUTO_INCREMENT PRIMARY KEY,
-  `user_id` VARCHAR(255) NOT NULL,
+  `user_id` BIGINT UNSIGNED NOT NULL,
   `app_id` INT NOT NULL,
   `playtime_forever` INT,
   `playtime_2weeks` INT,
-  INDEX `idx_userownedgames_user_id` (`user_id`),
-  INDEX `idx_userownedgames_app_id` (`app_id`)
+  PRIMARY KEY (`user_id`, `app_id`),
+  INDEX `idx_userownedgames_app_playtime` (`app_id`, `playtime_forever`)
 );
 
 CREATE TABLE `UserGameStatistics` (
-  `id` INT AUTO_INCREMENT PRIMARY KEY,
-  `user_id` VARCHAR(255) NOT NULL,
+  `user_id` BIGINT UNSIGNED NOT NULL,
   `app_id` INT NOT NULL,
-  `stat_name` VARCHAR(255),
+  `stat_name` VARCHAR(255) NOT NULL,
   `stat_value` INT,
-  INDEX `idx_usergamestatistics_user_id` (`user_id`),
-  INDEX `idx_usergamestatistics_app_id` (`app_id`)
+  PRIMARY KEY (`user_id`, `app_id`, `stat_name`),
+  INDEX `idx_usergamestatistics_app_stat` (`app_id`, `stat_name`, `stat_value`)
 );
 
 CREATE TABLE `UserAchievementStatistics` (
-  `id` INT AUTO_INCREMENT PRIMARY KEY,
-  `user_id` VARCHAR(255) NOT NULL,
+  `user_id` BIGINT UNSIGNED NOT NULL,
   `app_id` INT NOT NULL,
-  `achievement_name` VARCHAR(255),
+  `achievement_name` VARCHAR(255) NOT NULL,
   `achieved` TINYINT(1),
-  INDEX `idx_userachievementstatistics_user_id` (`user_id`),
-  INDEX `idx_userachievementstatistics_app_id` (`app_id`)
+  PRIMARY KEY (`user_id`, `app_id`, `achievement_name`),
+  INDEX `idx_userachievementstatistics_app_achievement` (`app_id`, `achievement_name`, `achieved`)
+);
+
+CREATE TABLE `PlayerCountSamples` (
+  `app_id` INT NOT NULL,
+  `sampled_at` DATETIME NOT NULL, -- UTC, shared by every app in a sampling round
+  `player_count` INT NOT NULL,
+  PRIMARY KEY (`app_id`, `sampled_at`)
+)
+-- One partition per day (created ahead by helpers/player_count_sampler.py), so
+-- retention drops whole partitions. Partitioned tables can't have foreign keys.
+PARTITION BY RANGE (TO_DAYS(`sampled_at`)) (
+  PARTITION `p_initial` VALUES LESS THAN (TO_DAYS('2024-12-01')),
+  PARTITION `p_future` VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE `PlayerCountRollups` (
+  `app_id` INT NOT NULL,
+  `bucket` VARCHAR(2) NOT NULL, -- 5m, 1h or 1d
+  `bucket_start` DATETIME NOT NULL,
+  `min_count` INT NOT NULL,
+  `max_count` INT NOT NULL,
+  `sum_count` BIGINT NOT NULL,
+  `samples` INT NOT NULL,
+  `avg_count` FLOAT AS (`sum_count` / `samples`) STORED,
+  PRIMARY KEY (`app_id`, `bucket`, `bucket_start`),
+  INDEX `idx_playercountrollups_bucket_start` (`bucket`, `bucket_start`)
+);
+
+CREATE TABLE `GameAggregates` (
+  `app_id` INT PRIMARY KEY,
+  `owners` INT NOT NULL, -- Stored users owning the game
+  `players_2weeks` INT NOT NULL, -- Owners with playtime in the last two weeks
+  `total_playtime` BIGINT NOT NULL, -- Minutes
+  `avg_playtime` FLOAT,
+  `median_playtime` FLOAT,
+  `refreshed_at` DATETIME NOT NULL,
+  INDEX `idx_gameaggregates_owners` (`owners`)
+);
+
+CREATE TABLE `UserAggregates` (
+  `user_id` BIGINT UNSIGNED PRIMARY KEY,
+  `games_owned` INT NOT NULL,
+  `games_played` INT NOT NULL,
+  `total_playtime` BIGINT NOT NULL, -- Minutes
+  `achievements_unlocked` INT NOT NULL,
+  `achievements_tracked` INT NOT NULL,
+  `completion_ratio` FLOAT, -- NULL when no achievements are tracked
+  `refreshed_at` DATETIME NOT NULL
+);
+
+CREATE TABLE `AchievementRarity` (
+  `app_id` INT NOT NULL,
+  `name` VARCHAR(255) NOT NULL,
+  `global_percent` FLOAT, -- Steam-wide unlock percentage
+  `sample_unlocked` INT NOT NULL, -- Stored users who unlocked it
+  `sample_size` INT NOT NULL, -- Stored users with achievement data for the game
+  `sample_percent` FLOAT,
+  `refreshed_at` DATETIME NOT NULL,
+  PRIMARY KEY (`app_id`, `name`),
+  INDEX `idx_achievementrarity_global_percent` (`app_id`, `global_percent`)
+);
+
+CREATE TABLE `SyncState` (
+  `entity_type` VARCHAR(32) NOT NULL, -- app_details, app_achievements, user_owned_games, user_app_stats
+  `entity_id` VARCHAR(64) NOT NULL, -- App id, SteamID64 or "<SteamID64>:<app id>"
+  `content_hash` CHAR(40) NOT NULL, -- SHA-1 of the normalized payload
+  `fetched_at` DATETIME NOT NULL,
+  `changed_at` DATETIME NOT NULL,
+  PRIMARY KEY (`entity_type`, `entity_id`),
+  INDEX `idx_syncstate_fetched_at` (`entity_type`, `fetched_at`)
 );
 
 -- Add foreign keys
 ALTER TABLE `Achievements`
-  ADD FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+  ADD CONSTRAINT `fk_achievements_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
 
 ALTER TABLE `PlayerCounts`
   ADD FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
 
-ALTER TABLE `UserOwnedGames`
-  ADD FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+ALTER TABLE `PlayerCountRollups`
   ADD FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
 
+ALTER TABLE `UserOwnedGames`
+  ADD CONSTRAINT `fk_userownedgames_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  ADD CONSTRAINT `fk_userownedgames_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
 ALTER TABLE `UserGameStatistics`
-  ADD FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
-  ADD FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+  ADD CONSTRAINT `fk_usergamestatistics_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  ADD CONSTRAINT `fk_usergamestatistics_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
 
 ALTER TABLE `UserAchievementStatistics`
-  ADD FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
-  ADD FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+  ADD CONSTRAINT `fk_userachievementstatistics_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  ADD CONSTRAINT `fk_userachievementstatistics_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE `GameAggregates`
+  ADD CONSTRAINT `fk_gameaggregates_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE `UserAggregates`
+  ADD CONSTRAINT `fk_useraggregates_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE `AchievementRarity`
+  ADD CONSTRAINT `fk_achievementrarity_achievement` FOREIGN KEY (`app_id`, `name`) REFERENCES `Achievements` (`app_id`, `name`) ON DELETE CASCADE ON UPDATE CASCADE;
@@ -0,0 +1,16 @@
+-- Adds the SyncState table used by helpers/incremental_sync.py to an existing
+-- steamdatabase (fresh databases get it from init.sql).
+--
+--   mysql -h 127.0.0.1 -u root -p < project/db/migrations/001_sync_state.sql
+
+USE steamdatabase;
+
+CREATE TABLE IF NOT EXISTS `SyncState` (
+  `entity_type` VARCHAR(32) NOT NULL,
+  `entity_id` VARCHAR(64) NOT NULL,
+  `content_hash` CHAR(40) NOT NULL,
+  `fetched_at` DATETIME NOT NULL,
+  `changed_at` DATETIME NOT NULL,
+  PRIMARY KEY (`entity_type`, `entity_id`),
+  INDEX `idx_syncstate_fetched_at` (`entity_type`, `fetched_at`)
+);
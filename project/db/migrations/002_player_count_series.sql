@@ -0,0 +1,35 @@
+-- Adds the player-count time-series tables used by helpers/player_count_sampler.py
+-- to an existing steamdatabase (fresh databases get them from init.sql).
+--
+--   mysql -h 127.0.0.1 -u root -p < project/db/migrations/002_player_count_series.sql
+
+USE steamdatabase;
+
+CREATE TABLE IF NOT EXISTS `PlayerCountSamples` (
+  `app_id` INT NOT NULL,
+  `sampled_at` DATETIME NOT NULL, -- UTC, shared by every app in a sampling round
+  `player_count` INT NOT NULL,
+  PRIMARY KEY (`app_id`, `sampled_at`)
+)
+-- One partition per day (created ahead by helpers/player_count_sampler.py), so
+-- retention drops whole partitions. Partitioned tables can't have foreign keys.
+PARTITION BY RANGE (TO_DAYS(`sampled_at`)) (
+  PARTITION `p_initial` VALUES LESS THAN (TO_DAYS('2024-12-01')),
+  PARTITION `p_future` VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE IF NOT EXISTS `PlayerCountRollups` (
+  `app_id` INT NOT NULL,
+  `bucket` VARCHAR(2) NOT NULL, -- 5m, 1h or 1d
+  `bucket_start` DATETIME NOT NULL,
+  `min_count` INT NOT NULL,
+  `max_count` INT NOT NULL,
+  `sum_count` BIGINT NOT NULL,
+  `samples` INT NOT NULL,
+  `avg_count` FLOAT AS (`sum_count` / `samples`) STORED,
+  PRIMARY KEY (`app_id`, `bucket`, `bucket_start`),
+  INDEX `idx_playercountrollups_bucket_start` (`bucket`, `bucket_start`)
+);
+
+ALTER TABLE `PlayerCountRollups`
+  ADD FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
@@ -0,0 +1,100 @@
+-- Moves an existing steamdatabase to the natural-key schema in init.sql:
+--   * Achievements and the per-user tables drop their AUTO_INCREMENT ids and are
+--     clustered on (app_id, name) / (user_id, app_id[, name]) instead, which also
+--     makes the ingestion upserts idempotent.
+--   * SteamIDs are stored as BIGINT UNSIGNED instead of VARCHAR(255).
+--   * Covering (app_id, ...) indexes replace the single-column indexes.
+-- Duplicate rows left by earlier plain inserts are collapsed to the newest one.
+-- Check the result with: python -m pytest tests/test_query_plans.py (from project/)
+--
+--   mysql -h 127.0.0.1 -u root -p < project/db/migrations/003_natural_keys.sql
+
+USE steamdatabase;
+
+-- Foreign keys from the original init.sql carry the default generated names
+ALTER TABLE `Achievements` DROP FOREIGN KEY `Achievements_ibfk_1`;
+ALTER TABLE `UserOwnedGames`
+  DROP FOREIGN KEY `UserOwnedGames_ibfk_1`,
+  DROP FOREIGN KEY `UserOwnedGames_ibfk_2`;
+ALTER TABLE `UserGameStatistics`
+  DROP FOREIGN KEY `UserGameStatistics_ibfk_1`,
+  DROP FOREIGN KEY `UserGameStatistics_ibfk_2`;
+ALTER TABLE `UserAchievementStatistics`
+  DROP FOREIGN KEY `UserAchievementStatistics_ibfk_1`,
+  DROP FOREIGN KEY `UserAchievementStatistics_ibfk_2`;
+
+-- Rows that can't satisfy the new keys: non-numeric user ids and unnamed rows
+DELETE FROM `UserOwnedGames` WHERE `user_id` NOT REGEXP '^[0-9]+$';
+DELETE FROM `UserGameStatistics` WHERE `user_id` NOT REGEXP '^[0-9]+$' OR `stat_name` IS NULL;
+DELETE FROM `UserAchievementStatistics`
+  WHERE `user_id` NOT REGEXP '^[0-9]+$' OR `achievement_name` IS NULL;
+DELETE FROM `Users` WHERE `id` NOT REGEXP '^[0-9]+$';
+DELETE FROM `Achievements` WHERE `name` IS NULL;
+
+-- Keep the most recently inserted row of each duplicate group
+DELETE older FROM `Achievements` older
+  JOIN `Achievements` newer
+    ON newer.`app_id` = older.`app_id` AND newer.`name` = older.`name` AND newer.`id` > older.`id`;
+DELETE older FROM `UserOwnedGames` older
+  JOIN `UserOwnedGames` newer
+    ON newer.`user_id` = older.`user_id` AND newer.`app_id` = older.`app_id`
+    AND newer.`id` > older.`id`;
+DELETE older FROM `UserGameStatistics` older
+  JOIN `UserGameStatistics` newer
+    ON newer.`user_id` = older.`user_id` AND newer.`app_id` = older.`app_id`
+    AND newer.`stat_name` = older.`stat_name` AND newer.`id` > older.`id`;
+DELETE older FROM `UserAchievementStatistics` older
+  JOIN `UserAchievementStatistics` newer
+    ON newer.`user_id` = older.`user_id` AND newer.`app_id` = older.`app_id`
+    AND newer.`achievement_name` = older.`achievement_name` AND newer.`id` > older.`id`;
+
+ALTER TABLE `Games` ADD INDEX `idx_games_name` (`name`);
+
+ALTER TABLE `Users` MODIFY `id` BIGINT UNSIGNED NOT NULL;
+
+ALTER TABLE `Achievements`
+  DROP COLUMN `id`,
+  DROP INDEX `idx_achievements_app_id`,
+  MODIFY `name` VARCHAR(255) NOT NULL,
+  ADD PRIMARY KEY (`app_id`, `name`);
+
+ALTER TABLE `UserOwnedGames`
+  DROP COLUMN `id`,
+  DROP INDEX `idx_userownedgames_user_id`,
+  DROP INDEX `idx_userownedgames_app_id`,
+  MODIFY `user_id` BIGINT UNSIGNED NOT NULL,
+  ADD PRIMARY KEY (`user_id`, `app_id`),
+  ADD INDEX `idx_userownedgames_app_playtime` (`app_id`, `playtime_forever`);
+
+ALTER TABLE `UserGameStatistics`
+  DROP COLUMN `id`,
+  DROP INDEX `idx_usergamestatistics_user_id`,
+  DROP INDEX `idx_usergamestatistics_app_id`,
+  MODIFY `user_id` BIGINT UNSIGNED NOT NULL,
+  MODIFY `stat_name` VARCHAR(255) NOT NULL,
+  ADD PRIMARY KEY (`user_id`, `app_id`, `stat_name`),
+  ADD INDEX `idx_usergamestatistics_app_stat` (`app_id`, `stat_name`, `stat_value`);
+
+ALTER TABLE `UserAchievementStatistics`
+  DROP COLUMN `id`,
+  DROP INDEX `idx_userachievementstatistics_user_id`,
+  DROP INDEX `idx_userachievementstatistics_app_id`,
+  MODIFY `user_id` BIGINT UNSIGNED NOT NULL,
+  MODIFY `achievement_name` VARCHAR(255) NOT NULL,
+  ADD PRIMARY KEY (`user_id`, `app_id`, `achievement_name`),
+  ADD INDEX `idx_userachievementstatistics_app_achievement` (`app_id`, `achievement_name`, `achieved`);
+
+ALTER TABLE `Achievements`
+  ADD CONSTRAINT `fk_achievements_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE `UserOwnedGames`
+  ADD CONSTRAINT `fk_userownedgames_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  ADD CONSTRAINT `fk_userownedgames_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE `UserGameStatistics`
+  ADD CONSTRAINT `fk_usergamestatistics_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  ADD CONSTRAINT `fk_usergamestatistics_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE `UserAchievementStatistics`
+  ADD CONSTRAINT `fk_userachievementstatistics_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  ADD CONSTRAINT `fk_userachievementstatistics_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
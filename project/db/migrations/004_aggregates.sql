@@ -0,0 +1,49 @@
+-- Adds the materialized aggregate tables maintained by helpers/aggregates.py to an
+-- existing steamdatabase, then fill them with: python ingest.py aggregates
+--
+--   mysql -h 127.0.0.1 -u root -p < project/db/migrations/004_aggregates.sql
+
+USE steamdatabase;
+
+CREATE TABLE IF NOT EXISTS `GameAggregates` (
+  `app_id` INT PRIMARY KEY,
+  `owners` INT NOT NULL, -- Stored users owning the game
+  `players_2weeks` INT NOT NULL, -- Owners with playtime in the last two weeks
+  `total_playtime` BIGINT NOT NULL, -- Minutes
+  `avg_playtime` FLOAT,
+  `median_playtime` FLOAT,
+  `refreshed_at` DATETIME NOT NULL,
+  INDEX `idx_gameaggregates_owners` (`owners`)
+);
+
+CREATE TABLE IF NOT EXISTS `UserAggregates` (
+  `user_id` BIGINT UNSIGNED PRIMARY KEY,
+  `games_owned` INT NOT NULL,
+  `games_played` INT NOT NULL,
+  `total_playtime` BIGINT NOT NULL, -- Minutes
+  `achievements_unlocked` INT NOT NULL,
+  `achievements_tracked` INT NOT NULL,
+  `completion_ratio` FLOAT, -- NULL when no achievements are tracked
+  `refreshed_at` DATETIME NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS `AchievementRarity` (
+  `app_id` INT NOT NULL,
+  `name` VARCHAR(255) NOT NULL,
+  `global_percent` FLOAT, -- Steam-wide unlock percentage
+  `sample_unlocked` INT NOT NULL, -- Stored users who unlocked it
+  `sample_size` INT NOT NULL, -- Stored users with achievement data for the game
+  `sample_percent` FLOAT,
+  `refreshed_at` DATETIME NOT NULL,
+  PRIMARY KEY (`app_id`, `name`),
+  INDEX `idx_achievementrarity_global_percent` (`app_id`, `global_percent`)
+);
+
+ALTER TABLE `GameAggregates`
+  ADD CONSTRAINT `fk_gameaggregates_app` FOREIGN KEY (`app_id`) REFERENCES `Games` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE `UserAggregates`
+  ADD CONSTRAINT `fk_useraggregates_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE `AchievementRarity`
+  ADD CONSTRAINT `fk_achievementrarity_achievement` FOREIGN KEY (`app_id`, `name`) REFERENCES `Achievements` (`app_id`, `name`) ON DELETE CASCADE ON UPDATE CASCADE;
@@ -0,0 +1,64 @@
+"""
+gunicorn settings for the dashboard (wsgi:server).
+
+The app is imported once in the master (preload_app) and forked into one worker
+per core. State that must not cross a fork is rebuilt per worker: the job
+cache's SQLite connection is reopened, the Steam/MySQL helpers come from
+JobManager.per_process(), the background-job thread pool starts on first use,
+and the rate limiter resets itself at fork. What workers share lives on disk:
+the diskcache job/result store, the SQLite response cache, the mmap'd app index
+and the Prometheus metric files.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8050")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Callbacks mostly wait on Steam or MySQL, so each worker serves several at once
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+preload_app = True
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = "-"
+
+# Must be set before prometheus_client is imported, i.e. before the app is preloaded
+PROMETHEUS_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "data/prometheus")
+
+
+def on_starting(server):
+    # Counters from a previous run would otherwise be added to this one's
+    shutil.rmtree(PROMETHEUS_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_DIR, exist_ok=True)
+
+
+def post_fork(server, worker):
+    from app import TYPEAHEAD, jobs, refresh_app_index
+
+    # The master opened the cache's SQLite connection; diskcache reconnects on next use
+    jobs.cache.close()
+    if TYPEAHEAD:
+        # Build or refresh the title index before the first keystroke needs it
+        refresh_app_index()
+
+
+def worker_exit(server, worker):
+    from app import jobs
+
+    # Finish in-flight searches and pending database write-backs before the worker exits
+    jobs.close()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Workers are the only processes writing metric files (background callbacks run on
+    # their threads). A dead worker's counters stay so totals never go backwards; only
+    # its live gauges are dropped.
+    multiprocess.mark_process_dead(worker.pid)
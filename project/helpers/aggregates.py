@@ -0,0 +1,192 @@
+"""
+Materialized per-game, per-user and per-achievement aggregates.
+
+GameAggregates, UserAggregates and AchievementRarity are summary tables that
+the dashboard and notebooks read with primary-key lookups instead of scanning
+UserOwnedGames / UserAchievementStatistics. They are refreshed per key:
+hooked into the ingestion pipeline, each committed batch records the games,
+users and achievements it touched, and refresh_pending() recomputes them once
+at the end of the run (a popular game is touched by many batches, and each
+recompute scans all of its owners). refresh_all() rebuilds everything in chunks.
+"""
+
+import threading
+
+CHUNK_SIZE = 500
+
+GAME_AGGREGATES_SQL = """
+INSERT INTO GameAggregates
+  (app_id, owners, players_2weeks, total_playtime, avg_playtime, median_playtime, refreshed_at)
+SELECT t.app_id, t.owners, t.players_2weeks, t.total_playtime, t.avg_playtime,
+  m.median_playtime, UTC_TIMESTAMP()
+FROM (
+  SELECT app_id, COUNT(*) AS owners, SUM(playtime_2weeks > 0) AS players_2weeks,
+    SUM(playtime_forever) AS total_playtime, AVG(playtime_forever) AS avg_playtime
+  FROM UserOwnedGames WHERE app_id IN ({keys}) GROUP BY app_id
+) t
+JOIN (
+  -- Median: the middle row (or the mean of the two middle rows) per game
+  SELECT app_id, AVG(playtime_forever) AS median_playtime
+  FROM (
+    SELECT app_id, playtime_forever,
+      ROW_NUMBER() OVER (PARTITION BY app_id ORDER BY playtime_forever) AS position,
+      COUNT(*) OVER (PARTITION BY app_id) AS owners
+    FROM UserOwnedGames WHERE app_id IN ({keys})
+  ) ranked
+  WHERE position IN (FLOOR((owners + 1) / 2), CEIL((owners + 1) / 2))
+  GROUP BY app_id
+) m ON m.app_id = t.app_id
+ON DUPLICATE KEY UPDATE owners = VALUES(owners), players_2weeks = VALUES(players_2weeks),
+  total_playtime = VALUES(total_playtime), avg_playtime = VALUES(avg_playtime),
+  median_playtime = VALUES(median_playtime), refreshed_at = VALUES(refreshed_at)
+"""
+
+USER_AGGREGATES_SQL = """
+INSERT INTO UserAggregates
+  (user_id, games_owned, games_played, total_playtime, achievements_unlocked,
+   achievements_tracked, completion_ratio, refreshed_at)
+SELECT o.user_id, o.games_owned, o.games_played, o.total_playtime,
+  COALESCE(a.unlocked, 0), COALESCE(a.tracked, 0), a.unlocked / NULLIF(a.tracked, 0),
+  UTC_TIMESTAMP()
+FROM (
+  SELECT user_id, COUNT(*) AS games_owned, SUM(playtime_forever > 0) AS games_played,
+    SUM(playtime_forever) AS total_playtime
+  FROM UserOwnedGames WHERE user_id IN ({keys}) GROUP BY user_id
+) o
+LEFT JOIN (
+  SELECT user_id, SUM(achieved) AS unlocked, COUNT(*) AS tracked
+  FROM UserAchievementStatistics WHERE user_id IN ({keys}) GROUP BY user_id
+) a ON a.user_id = o.user_id
+ON DUPLICATE KEY UPDATE games_owned = VALUES(games_owned), games_played = VALUES(games_played),
+  total_playtime = VALUES(total_playtime), achievements_unlocked = VALUES(achievements_unlocked),
+  achievements_tracked = VALUES(achievements_tracked),
+  completion_ratio = VALUES(completion_ratio), refreshed_at = VALUES(refreshed_at)
+"""
+
+ACHIEVEMENT_RARITY_SQL = """
+INSERT INTO AchievementRarity
+  (app_id, name, global_percent, sample_unlocked, sample_size, sample_percent, refreshed_at)
+SELECT g.app_id, g.name, g.percent, COALESCE(s.unlocked, 0), COALESCE(s.sample_size, 0),
+  100 * s.unlocked / NULLIF(s.sample_size, 0), UTC_TIMESTAMP()
+FROM Achievements g
+LEFT JOIN (
+  SELECT app_id, achievement_name, SUM(achieved) AS unlocked, COUNT(*) AS sample_size
+  FROM UserAchievementStatistics WHERE app_id IN ({keys})
+  GROUP BY app_id, achievement_name
+) s ON s.app_id = g.app_id AND s.achievement_name = g.name
+WHERE g.app_id IN ({keys})
+ON DUPLICATE KEY UPDATE global_percent = VALUES(global_percent),
+  sample_unlocked = VALUES(sample_unlocked), sample_size = VALUES(sample_size),
+  sample_percent = VALUES(sample_percent), refreshed_at = VALUES(refreshed_at)
+"""
+
+
+def _chunks(keys, size=CHUNK_SIZE):
+    keys = sorted(set(keys))
+    for start in range(0, len(keys), size):
+        yield keys[start : start + size]
+
+
+class AggregateRefresher:
+    """
+    Recompute aggregate rows for specific keys.
+
+        refresher = AggregateRefresher(db)
+        pipeline.on_flush(refresher.on_flush)  # note the keys each committed batch touches
+        pipeline.ingest_users(steam_ids)
+        refresher.refresh_pending()            # recompute each of them once
+        refresher.refresh_all()                # or rebuild everything
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._pending = {"games": set(), "users": set(), "achievements": set()}
+
+    def _refresh(self, sql, keys):
+        refreshed = 0
+        for chunk in _chunks(keys):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            # Each IN list appears twice in the statement
+            self.db.execute_query(sql.format(keys=placeholders), (*chunk, *chunk))
+            refreshed += len(chunk)
+        return refreshed
+
+    def refresh_games(self, app_ids):
+        return self._refresh(GAME_AGGREGATES_SQL, [int(a) for a in app_ids])
+
+    def refresh_users(self, user_ids):
+        return self._refresh(USER_AGGREGATES_SQL, [int(u) for u in user_ids])
+
+    def refresh_achievements(self, app_ids):
+        return self._refresh(ACHIEVEMENT_RARITY_SQL, [int(a) for a in app_ids])
+
+    def on_flush(self, rows, units):
+        """
+        IngestionPipeline flush callback: remember the keys touched by a committed batch.
+        Nothing is recomputed until refresh_pending().
+        """
+        owned = rows.get("UserOwnedGames", [])
+        unlocked = rows.get("UserAchievementStatistics", [])
+        with self._lock:
+            self._pending["games"].update(r["app_id"] for r in owned)
+            self._pending["users"].update(r["user_id"] for r in owned)
+            self._pending["users"].update(r["user_id"] for r in unlocked)
+            self._pending["achievements"].update(r["app_id"] for r in rows.get("Achievements", []))
+            self._pending["achievements"].update(r["app_id"] for r in unlocked)
+
+    def refresh_pending(self):
+        """
+        Recompute every key noted by on_flush() since the last call, once each.
+        Returns the number of keys refreshed per table.
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = {name: set() for name in pending}
+        return {
+            "GameAggregates": self.refresh_games(pending["games"]),
+            "UserAggregates": self.refresh_users(pending["users"]),
+            "AchievementRarity": self.refresh_achievements(pending["achievements"]),
+        }
+
+    def refresh_all(self):
+        """
+        Rebuild every aggregate row. Returns the number of keys refreshed per table.
+        """
+        app_ids = [row["id"] for row in self.db.execute_query("SELECT id FROM Games") or []]
+        user_ids = [row["id"] for row in self.db.execute_query("SELECT id FROM Users") or []]
+        return {
+            "GameAggregates": self.refresh_games(app_ids),
+            "UserAggregates": self.refresh_users(user_ids),
+            "AchievementRarity": self.refresh_achievements(app_ids),
+        }
+
+
+""" Reads: """
+
+
+def game_aggregates(db, app_ids):
+    placeholders = ", ".join(["%s"] * len(app_ids))
+    return db.execute_query(
+        f"SELECT * FROM GameAggregates WHERE app_id IN ({placeholders})", tuple(app_ids)
+    )
+
+
+def user_aggregates(db, user_id):
+    rows = db.execute_query("SELECT * FROM UserAggregates WHERE user_id = %s", (user_id,))
+    return rows[0] if rows else None
+
+
+def rarest_achievements(db, user_id, limit=10):
+    """
+    The user's unlocked achievements with the lowest global unlock percentage.
+    """
+    return db.execute_query(
+        "SELECT u.app_id, g.name AS game_name, r.name, r.global_percent, r.sample_percent"
+        " FROM UserAchievementStatistics u"
+        " JOIN AchievementRarity r ON r.app_id = u.app_id AND r.name = u.achievement_name"
+        " JOIN Games g ON g.id = u.app_id"
+        " WHERE u.user_id = %s AND u.achieved = 1"
+        " ORDER BY r.global_percent LIMIT %s",
+        (user_id, limit),
+    )
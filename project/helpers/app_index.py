@@ -0,0 +1,383 @@
+import json
+import mmap
+import os
+import re
+import shutil
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+INDEX_VERSION = 2
+
+# Names the generation directory readers should load; replaced in one rename per build
+CURRENT_FILE = "CURRENT"
+# Generations kept on disk: the current one, plus the one before it for readers that
+# were still opening its files when the pointer moved
+KEEP_GENERATIONS = 2
+
+# Postings lists are stored for whole-word tokens and for character trigrams
+POSTING_KINDS = ("tokens", "trigrams")
+
+
+def normalize_title(title):
+    """
+    Lowercase a title and collapse punctuation/trademark symbols into single spaces.
+    """
+    return re.sub(r"[\W_]+", " ", title.lower()).strip()
+
+
+def title_trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _tokenize(normalized):
+    return set(normalized.split())
+
+
+def _load_array(path):
+    """
+    Memory-map a file of native uint32 values and expose it as a read-only view.
+    """
+    if os.path.getsize(path) == 0:
+        return array("I")
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast("I")
+
+
+def _load_bytes(path):
+    if os.path.getsize(path) == 0:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _replace_file(path, data):
+    """
+    Write data beside path and rename it into place, so readers that still have
+    the old file memory-mapped keep a valid view of it.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_array(path, values):
+    _replace_file(path, array("I", values).tobytes())
+
+
+def _current_generation(path):
+    with open(os.path.join(path, CURRENT_FILE), encoding="utf-8") as f:
+        return os.path.join(path, f.read().strip())
+
+
+def _prune_generations(path, keep=KEEP_GENERATIONS):
+    generations = sorted(name for name in os.listdir(path) if name.startswith("gen-"))
+    for name in generations[:-keep]:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+class SteamAppIndex:
+    """
+    Columnar, memory-mapped index of the full Steam app list.
+
+    On disk the index is a directory of flat files: app ids sorted ascending,
+    a packed UTF-8 name buffer with an offsets array, a permutation of rows
+    sorted by normalized name (for exact and prefix lookups) and inverted
+    postings for tokens and trigrams (for token and fuzzy lookups).
+
+    Every build or refresh writes a complete new generation directory
+    (path/gen-<n>/) and then points path/CURRENT at it, so a reader always
+    maps the columns and meta.json of a single generation.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.generation = None
+        self.meta = {}
+        self.ids = array("I")
+        self.offsets = array("I", [0])
+        self.names = b""
+        self.by_name = array("I")
+        self.postings = {}
+
+    """ Loading and Persistence: """
+
+    @classmethod
+    def load(cls, path):
+        try:
+            return cls._load_generation(path, _current_generation(path))
+        except FileNotFoundError:
+            # CURRENT moved on and the generation it named was pruned; take the new one
+            return cls._load_generation(path, _current_generation(path))
+
+    @classmethod
+    def _load_generation(cls, path, generation):
+        index = cls(path)
+        index.generation = generation
+        with open(os.path.join(generation, "meta.json")) as f:
+            index.meta = json.load(f)
+        if (
+            index.meta.get("version") != INDEX_VERSION
+            or index.meta.get("byteorder") != sys.byteorder
+        ):
+            raise ValueError(f"App index at '{path}' was built by an incompatible version")
+
+        index.ids = _load_array(os.path.join(generation, "ids.bin"))
+        index.offsets = _load_array(os.path.join(generation, "offsets.bin"))
+        index.names = _load_bytes(os.path.join(generation, "names.bin"))
+        index.by_name = _load_array(os.path.join(generation, "by_name.bin"))
+
+        for kind in POSTING_KINDS:
+            with open(os.path.join(generation, f"{kind}_keys.txt"), encoding="utf-8") as f:
+                keys = f.read().split("\n") if os.path.getsize(f.name) else []
+            index.postings[kind] = (
+                {key: i for i, key in enumerate(keys)},
+                _load_array(os.path.join(generation, f"{kind}_offsets.bin")),
+                _load_array(os.path.join(generation, f"{kind}_postings.bin")),
+            )
+        return index
+
+    @classmethod
+    def build(cls, path, apps):
+        """
+        Build a fresh index from a GetAppList payload ([{"appid", "name"}, ...]).
+        """
+        names_by_id = {int(app["appid"]): app.get("name") or "" for app in apps}
+        ids = sorted(names_by_id)
+        names = [names_by_id[app_id] for app_id in ids]
+        normalized = [normalize_title(name) for name in names]
+
+        by_name = sorted(range(len(ids)), key=normalized.__getitem__)
+        postings = {kind: {} for kind in POSTING_KINDS}
+        for row, norm in enumerate(normalized):
+            cls._add_postings(postings, row, norm)
+
+        cls._write(path, ids, names, by_name, postings)
+        return cls.load(path)
+
+    @staticmethod
+    def _add_postings(postings, row, normalized):
+        for token in _tokenize(normalized):
+            postings["tokens"].setdefault(token, []).append(row)
+        for gram in title_trigrams(normalized):
+            postings["trigrams"].setdefault(gram, []).append(row)
+
+    @staticmethod
+    def _write(path, ids, names, by_name, postings):
+        os.makedirs(path, exist_ok=True)
+        generation_name = f"gen-{time.time_ns()}"
+        generation = os.path.join(path, generation_name)
+        os.makedirs(generation)
+
+        encoded = [name.encode("utf-8") for name in names]
+        offsets = [0]
+        for name in encoded:
+            offsets.append(offsets[-1] + len(name))
+
+        _write_array(os.path.join(generation, "ids.bin"), ids)
+        _write_array(os.path.join(generation, "offsets.bin"), offsets)
+        _replace_file(os.path.join(generation, "names.bin"), b"".join(encoded))
+        _write_array(os.path.join(generation, "by_name.bin"), by_name)
+
+        for kind, lists in postings.items():
+            keys = sorted(lists)
+            key_offsets = [0]
+            flat = array("I")
+            for key in keys:
+                flat.extend(sorted(lists[key]))
+                key_offsets.append(len(flat))
+            _replace_file(
+                os.path.join(generation, f"{kind}_keys.txt"), "\n".join(keys).encode("utf-8")
+            )
+            _write_array(os.path.join(generation, f"{kind}_offsets.bin"), key_offsets)
+            _write_array(os.path.join(generation, f"{kind}_postings.bin"), flat)
+
+        meta = {
+            "version": INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "count": len(ids),
+            "built_at": time.time(),
+        }
+        _replace_file(os.path.join(generation, "meta.json"), json.dumps(meta).encode())
+
+        # The generation is complete; publishing it is a single rename of CURRENT
+        _replace_file(os.path.join(path, CURRENT_FILE), generation_name.encode("utf-8"))
+        _prune_generations(path)
+
+    def refresh(self, apps):
+        """
+        Diff-apply a new GetAppList payload and persist the result.
+
+        Rows whose id and name are unchanged keep their existing postings
+        (remapped to their new row numbers); only added and renamed apps are
+        re-tokenized. Returns the counts of added, removed and renamed apps.
+        """
+        new_names = {int(app["appid"]): app.get("name") or "" for app in apps}
+        old_ids = list(self.ids)
+        old_rows = {app_id: row for row, app_id in enumerate(old_ids)}
+
+        removed = {app_id for app_id in old_ids if app_id not in new_names}
+        renamed = {
+            app_id
+            for app_id, name in new_names.items()
+            if app_id in old_rows and self._name_at(old_rows[app_id]) != name
+        }
+        added = {app_id for app_id in new_names if app_id not in old_rows}
+        stats = {"added": len(added), "removed": len(removed), "renamed": len(renamed)}
+
+        if not (added or removed or renamed):
+            self._write_meta_timestamp()
+            return stats
+
+        ids = sorted(new_names)
+        new_rows = {app_id: row for row, app_id in enumerate(ids)}
+        names = [new_names[app_id] for app_id in ids]
+
+        # Old row number -> new row number, for rows whose postings can be reused
+        remap = {
+            row: new_rows[app_id]
+            for row, app_id in enumerate(old_ids)
+            if app_id not in removed and app_id not in renamed
+        }
+
+        postings = {kind: {} for kind in POSTING_KINDS}
+        for kind, (keys, key_offsets, flat) in self.postings.items():
+            for key, i in keys.items():
+                rows = [remap[row] for row in flat[key_offsets[i] : key_offsets[i + 1]] if row in remap]
+                if rows:
+                    postings[kind][key] = rows
+
+        fresh = sorted(new_rows[app_id] for app_id in added | renamed)
+        normalized = {row: normalize_title(names[row]) for row in fresh}
+        for row in fresh:
+            self._add_postings(postings, row, normalized[row])
+
+        # Merge the fresh rows into the surviving name ordering instead of re-sorting everything
+        by_name = [remap[row] for row in self.by_name if row in remap]
+        keys = [normalize_title(names[row]) for row in by_name]
+        for row in sorted(fresh, key=normalized.__getitem__, reverse=True):
+            at = bisect_right(keys, normalized[row])
+            keys.insert(at, normalized[row])
+            by_name.insert(at, row)
+
+        self._write(self.path, ids, names, by_name, postings)
+        refreshed = self.load(self.path)
+        self.__dict__.update(refreshed.__dict__)
+        return stats
+
+    def _write_meta_timestamp(self):
+        # Only built_at changes, so the generation's columns still match its meta.json
+        self.meta["built_at"] = time.time()
+        _replace_file(os.path.join(self.generation, "meta.json"), json.dumps(self.meta).encode())
+
+    def is_stale(self, max_age):
+        return time.time() - self.meta.get("built_at", 0) > max_age
+
+    def __len__(self):
+        return len(self.ids)
+
+    """ Lookups: """
+
+    def _name_at(self, row):
+        return bytes(self.names[self.offsets[row] : self.offsets[row + 1]]).decode("utf-8")
+
+    def _normalized_at(self, row):
+        return normalize_title(self._name_at(row))
+
+    def _row(self, row):
+        return {"id": self.ids[row], "name": self._name_at(row)}
+
+    def _posting(self, kind, key):
+        keys, key_offsets, flat = self.postings[kind]
+        i = keys.get(key)
+        if i is None:
+            return ()
+        return flat[key_offsets[i] : key_offsets[i + 1]]
+
+    def get_name(self, app_id):
+        row = bisect_left(self.ids, app_id)
+        if row < len(self.ids) and self.ids[row] == app_id:
+            return self._name_at(row)
+        return None
+
+    def find_exact(self, title):
+        """
+        Return every app whose normalized name equals the normalized title.
+        """
+        target = normalize_title(title)
+        start = bisect_left(self.by_name, target, key=self._normalized_at)
+        matches = []
+        for row in self.by_name[start:]:
+            if self._normalized_at(row) != target:
+                break
+            matches.append(self._row(row))
+        return matches
+
+    def search_prefix(self, prefix, limit=10):
+        target = normalize_title(prefix)
+        start = bisect_left(self.by_name, target, key=self._normalized_at)
+        matches = []
+        for row in self.by_name[start:]:
+            if len(matches) >= limit or not self._normalized_at(row).startswith(target):
+                break
+            matches.append(self._row(row))
+        return matches
+
+    def search_tokens(self, term, limit=10):
+        """
+        Return apps whose names contain every word of the term.
+        """
+        tokens = _tokenize(normalize_title(term))
+        if not tokens:
+            return []
+        lists = sorted((self._posting("tokens", token) for token in tokens), key=len)
+        rows = set(lists[0])
+        for rows_with_token in lists[1:]:
+            rows.intersection_update(rows_with_token)
+            if not rows:
+                return []
+        # Shorter names are the closer matches for the same set of words
+        ranked = sorted(rows, key=lambda row: self.offsets[row + 1] - self.offsets[row])
+        return [self._row(row) for row in ranked[:limit]]
+
+    def search_fuzzy(self, term, limit=10, min_score=0.3):
+        """
+        Rank apps by trigram (Dice) similarity to the term, tolerating typos.
+        """
+        grams = title_trigrams(normalize_title(term))
+        if not grams:
+            return []
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._posting("trigrams", gram))
+
+        scored = []
+        for row, common in hits.most_common(limit * 20):
+            candidate = title_trigrams(self._normalized_at(row))
+            score = 2 * common / (len(grams) + len(candidate))
+            if score >= min_score:
+                scored.append((score, row))
+        scored.sort(key=lambda pair: -pair[0])
+        return [dict(self._row(row), score=round(score, 3)) for score, row in scored[:limit]]
+
+    def search(self, term, limit=10):
+        """
+        Combined title search: exact, then prefix, then all-words, then fuzzy matches.
+        """
+        results = {}
+        for lookup in (
+            lambda: self.find_exact(term),
+            lambda: self.search_prefix(term, limit),
+            lambda: self.search_tokens(term, limit),
+            lambda: self.search_fuzzy(term, limit),
+        ):
+            for app in lookup():
+                results.setdefault(app["id"], app)
+            if len(results) >= limit:
+                break
+        return list(results.values())[:limit]
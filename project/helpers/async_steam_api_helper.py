@@ -0,0 +1,495 @@
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+
+import aiohttp
+
+from .community_search import (
+    RESULTS_PER_PAGE,
+    SEARCH_AJAX_PATH,
+    STEAM_COMMUNITY_BASE,
+    CommunitySearchError,
+    parse_search_page,
+    search_params,
+)
+from .http_helper import (
+    DEFAULT_TIMEOUTS,
+    MAX_RETRY_AFTER,
+    RETRY_STATUS_CODES,
+    THROTTLED_STATUS,
+    resolve_timeout,
+)
+from .metrics import record_steam_request
+from .rate_limiter import INTERACTIVE, shared_rate_limiter
+from .steam_responses import (
+    ACHIEVEMENT_PERCENTAGES_PATH,
+    APP_DETAILS_PATH,
+    APP_LIST_PATH,
+    NEWS_PATH,
+    OWNED_GAMES_PATH,
+    PLAYER_COUNT_PATH,
+    PLAYER_SUMMARIES_BATCH,
+    PLAYER_SUMMARIES_PATH,
+    RESOLVE_VANITY_PATH,
+    STEAM_API_BASE,
+    STEAM_STORE_BASE,
+    STORE_SEARCH_PATH,
+    USER_STATS_PATH,
+    format_achievement_percentages,
+    format_app_details,
+    format_news,
+    format_owned_games,
+    format_player_count,
+    format_player_summaries,
+    format_user_achievements,
+    format_user_game_stats,
+    format_vanity,
+    non_json_error,
+    owned_games_params,
+    parse_profile_reference,
+)
+from .steam_api_helper import retry_after_seconds, steam_api_keys
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean "the request failed", mirroring requests.exceptions.RequestException
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class AsyncResponse:
+    """Status and body of a finished request, exposing the bits of requests.Response we use."""
+
+    def __init__(self, status, url, text):
+        self.status_code = status
+        self.url = url
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise aiohttp.ClientError(f"{self.status_code} Error for url: {self.url}")
+
+
+class AsyncAPIHelper:
+    """asyncio counterpart of APIHelper with the same method surface and return shapes.
+
+    All requests share one aiohttp connection pool, and at most max_concurrency of
+    them are in flight at once. Display name searches only use the community AJAX
+    endpoint; there is no Selenium fallback, so a failed search returns an error string.
+    Use it as an async context manager:
+
+        async with AsyncAPIHelper() as api:
+            stats = await api.getUserStatsForApps(steam_id, app_ids)
+    """
+
+    def __init__(
+        self,
+        max_concurrency=20,
+        pool_size=50,
+        max_retries=3,
+        backoff_factor=0.5,
+        timeouts=None,
+        api_base=STEAM_API_BASE,
+        store_base=STEAM_STORE_BASE,
+        community_base=STEAM_COMMUNITY_BASE,
+        app_id_ttl=6 * 60 * 60,
+        rate_limiter=None,
+        priority=INTERACTIVE,
+    ):
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        self.steam_key = os.getenv("STEAM_API_KEY")
+        self.steam_keys = steam_api_keys(self.steam_key)
+
+        self.api_base = api_base.rstrip("/")
+        self.store_base = store_base.rstrip("/")
+        self.community_base = community_base.rstrip("/")
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = None
+        # The community search only checks that the sessionid param matches the cookie
+        self.community_session_id = secrets.token_hex(12)
+        self.app_id_cache = TTLCache(ttl=app_id_ttl, max_size=4096)
+        self.rate_limiter = rate_limiter or shared_rate_limiter(self.steam_keys)
+        self.priority = priority
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get(self, endpoint, url, params=None, api_key=None, cookies=None):
+        """GET through the shared pool, retrying 429/5xx and connection errors with backoff.
+        An explicit api_key is sent as given instead of the key the limiter would pick.
+        """
+        await self.start()
+        connect_timeout, read_timeout = resolve_timeout(self.timeouts, endpoint)
+        timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        # aiohttp rejects None values in the query string, requests silently drops them
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+
+        needs_key = api_key is None and "key" in params
+        if api_key is not None:
+            params["key"] = api_key
+
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff_factor * (2**attempt)
+            picked_key = await self.rate_limiter.acquire_async(endpoint, self.priority, needs_key)
+            if picked_key:
+                api_key = params["key"] = picked_key
+            try:
+                async with self.semaphore:
+                    async with self.session.get(
+                        url, params=params, cookies=cookies, timeout=timeout
+                    ) as resp:
+                        text = await resp.text()
+                        retry = resp.status in RETRY_STATUS_CODES
+                        if resp.status == THROTTLED_STATUS:
+                            delay = retry_after_seconds(resp.headers, default=delay)
+                            self.rate_limiter.backoff(endpoint, delay, api_key)
+                            # The limiter holds the next attempt until the pause is over
+                            retry, delay = delay <= MAX_RETRY_AFTER, 0
+                        if not retry or attempt == self.max_retries:
+                            record_steam_request(
+                                endpoint,
+                                resp.status,
+                                time.perf_counter() - start,
+                                resp.content_length or len(text),
+                                attempt,
+                            )
+                            return AsyncResponse(resp.status, str(resp.url), text)
+            except REQUEST_ERRORS:
+                if attempt == self.max_retries:
+                    record_steam_request(endpoint, "error", time.perf_counter() - start, 0, attempt)
+                    raise
+            await asyncio.sleep(delay)
+
+    """ Functions for general steam searching, by game and for all games:"""
+
+    async def getAllSteamApps(self):
+        response = await self._get("GetAppList", f"{self.api_base}{APP_LIST_PATH}")
+        return response.json()["applist"]["apps"]
+
+    async def searchSteamApps(self, game_title):
+        params = {"term": game_title, "l": "english", "cc": "us"}
+        response = await self._get(
+            "storesearch", f"{self.store_base}{STORE_SEARCH_PATH}", params=params
+        )
+        items = response.json()["items"]
+        if items:
+            self.app_id_cache.set(" ".join(game_title.lower().split()), items[0]["id"])
+        return items
+
+    async def resolveAppID(self, game_title):
+        if not isinstance(game_title, str) or not game_title.strip():
+            return None
+        app_id = self.app_id_cache.get(" ".join(game_title.lower().split()))
+        if app_id is not None:
+            return app_id
+        game = await self.searchSteamApps(game_title)
+        return game[0]["id"] if game else None
+
+    """ Functions to Gather data from Steam API About a Given Game: """
+
+    async def getGamePlayerCount(self, game_title=None, app_id=None):
+        if app_id is None:
+            app_id = await self.resolveAppID(game_title)
+            if not app_id:
+                return f"Game '{game_title}' not found"
+        try:
+            response = await self._get(
+                "GetNumberOfCurrentPlayers",
+                f"{self.api_base}{PLAYER_COUNT_PATH}",
+                params={"appid": app_id},
+            )
+            return format_player_count(response.json(), game_title, app_id)
+        except REQUEST_ERRORS as e:
+            return f"Error fetching player count for '{game_title}': {e}"
+
+    async def getGameAchievementData(self, game_title=None, app_id=None):
+        if app_id is None:
+            app_id = await self.resolveAppID(game_title)
+            if not app_id:
+                return f"Game '{game_title}' not found"
+        try:
+            response = await self._get(
+                "GetGlobalAchievementPercentagesForApp",
+                f"{self.api_base}{ACHIEVEMENT_PERCENTAGES_PATH}",
+                params={"gameid": app_id},
+            )
+            return format_achievement_percentages(response.json(), game_title, app_id)
+        except REQUEST_ERRORS as e:
+            return f"Error fetching achievement data for '{game_title}': {e}"
+
+    async def getGameNews(self, game_title=None, count=5, app_id=None):
+        if app_id is None:
+            app_id = await self.resolveAppID(game_title)
+            if not app_id:
+                return f"Game '{game_title}' not found"
+        try:
+            response = await self._get(
+                "GetNewsForApp",
+                f"{self.api_base}{NEWS_PATH}",
+                params={"appid": app_id, "count": count},
+            )
+            response.raise_for_status()
+            return format_news(response.json(), game_title, app_id)
+        except REQUEST_ERRORS as e:
+            return f"Error fetching news for game '{game_title}': {e}"
+
+    async def getAppDetails(self, app_id):
+        """Storefront details (name, type, price, platforms, metacritic...) for one app."""
+        try:
+            response = await self._get(
+                "appdetails",
+                f"{self.store_base}{APP_DETAILS_PATH}",
+                params={"appids": app_id, "cc": "us", "l": "english"},
+            )
+            return format_app_details(response.json(), app_id)
+        except REQUEST_ERRORS as e:
+            return f"Error fetching app details for app_id '{app_id}': {e}"
+
+    """ Functions Requiring Authentication and User Information: """
+
+    async def _getUserStatsForGame(self, user_id, app_id):
+        return await self._get(
+            "GetUserStatsForGame",
+            f"{self.api_base}{USER_STATS_PATH}",
+            params={"appid": app_id, "key": self.steam_key, "steamid": user_id},
+        )
+
+    async def getUserAchievementStats(self, user_id, app_id, game_title):
+        try:
+            response = await self._getUserStatsForGame(user_id, app_id)
+            try:
+                stats_data = response.json()
+            except ValueError:
+                return non_json_error(game_title)
+            return format_user_achievements(stats_data, game_title, app_id)
+        except REQUEST_ERRORS as e:
+            return f"Error fetching achievement data for '{game_title}': {e}"
+
+    async def getUserGameStats(self, user_id, app_id, game_title):
+        try:
+            response = await self._getUserStatsForGame(user_id, app_id)
+            try:
+                stats_data = response.json()
+            except ValueError:
+                return non_json_error(game_title)
+            return format_user_game_stats(stats_data, game_title, app_id)
+        except REQUEST_ERRORS as e:
+            return f"Error fetching stats for '{game_title}': {e}"
+
+    async def getUserOwnedGames(self, user_id, include_playtime=True):
+        try:
+            response = await self._get(
+                "GetOwnedGames",
+                f"{self.api_base}{OWNED_GAMES_PATH}",
+                params=owned_games_params(self.steam_key, user_id),
+            )
+            response.raise_for_status()
+            return format_owned_games(response.json(), user_id)
+        except REQUEST_ERRORS as e:
+            return f"Error fetching owned games for user '{user_id}': {e}"
+
+    async def getSteamIDFromVanity(self, vanity_name, api_key=None):
+        """SteamID64 for a vanity name. api_key overrides the key the rate limiter would pick."""
+        params = {"key": self.steam_key, "vanityurl": vanity_name}
+        response = await self._get(
+            "ResolveVanityURL",
+            f"{self.api_base}{RESOLVE_VANITY_PATH}",
+            params=params,
+            api_key=api_key,
+        )
+        return format_vanity(response.json(), vanity_name)
+
+    async def getPlayerSummaries(self, steam_ids):
+        """Profile summaries for many SteamID64s, 100 per request, fetched concurrently.
+        Returns {steamid: summary}; unknown ids are left out.
+        """
+        steam_ids = list(dict.fromkeys(str(steam_id) for steam_id in steam_ids))
+
+        async def fetch(chunk):
+            try:
+                response = await self._get(
+                    "GetPlayerSummaries",
+                    f"{self.api_base}{PLAYER_SUMMARIES_PATH}",
+                    params={"key": self.steam_key, "steamids": ",".join(chunk)},
+                )
+                response.raise_for_status()
+                return format_player_summaries(response.json())
+            except (*REQUEST_ERRORS, ValueError) as e:
+                logger.warning("Error fetching player summaries for %d users: %s", len(chunk), e)
+                return {}
+
+        summaries = {}
+        for chunk_summaries in await asyncio.gather(
+            *(
+                fetch(steam_ids[start : start + PLAYER_SUMMARIES_BATCH])
+                for start in range(0, len(steam_ids), PLAYER_SUMMARIES_BATCH)
+            )
+        ):
+            summaries.update(chunk_summaries)
+        return summaries
+
+    async def searchSteamDisplayNamesAjax(self, display_name, max_pages=1):
+        """Search profiles by display name via the community search AJAX endpoint.
+        Fetches up to max_pages pages of 20 results (None for every page).
+        Raises CommunitySearchError or a request error if the endpoint misbehaves.
+        """
+        url = f"{self.community_base}{SEARCH_AJAX_PATH}"
+        session_id = self.community_session_id
+
+        results = []
+        page = 1
+        while max_pages is None or page <= max_pages:
+            response = await self._get(
+                "SearchCommunityAjax",
+                url,
+                params=search_params(display_name, session_id, page),
+                cookies={"sessionid": session_id},
+            )
+            rows, total = parse_search_page(response.json())
+            results.extend(rows)
+            if not rows or page * RESULTS_PER_PAGE >= total:
+                break
+            page += 1
+        return results
+
+    async def searchSteamDisplayNames(self, display_name, max_pages=1):
+        """Search for Steam profiles by display name. Unlike APIHelper there is no browser
+        fallback, so an unusable AJAX answer comes back as an error string.
+        """
+        try:
+            results = await self.searchSteamDisplayNamesAjax(display_name, max_pages=max_pages)
+        except (*REQUEST_ERRORS, ValueError, CommunitySearchError) as e:
+            return f"Error searching for display name '{display_name}': {e}"
+
+        return (
+            results
+            if results
+            else f"No profiles found for display name '{display_name}'"
+        )
+
+    """ Functions Wrapping Other Functions for Ease of Use and Efficiency:"""
+
+    async def extractSteamID(self, steam_url):
+        kind, value = parse_profile_reference(steam_url)
+        if kind == "vanity":
+            return await self.getSteamIDFromVanity(value)
+        if kind == "steamid":
+            return value
+        return f"Invalid Steam profile URL format: '{steam_url}'"
+
+    async def resolveSteamIDs(self, references):
+        """Map profile URLs, vanity names and SteamID64s to SteamID64s. Duplicates are
+        dropped and each distinct vanity is resolved once, concurrently.
+        Returns {reference: steamid64, or an error string}.
+        """
+        parsed = {reference: parse_profile_reference(reference) for reference in references}
+        vanities = sorted({value for kind, value in parsed.values() if kind == "vanity"})
+
+        async def resolve(vanity_name):
+            try:
+                return await self.getSteamIDFromVanity(vanity_name)
+            except (*REQUEST_ERRORS, ValueError, KeyError) as e:
+                return f"Error resolving vanity URL '{vanity_name}': {e}"
+
+        resolved = dict(zip(vanities, await asyncio.gather(*map(resolve, vanities))))
+
+        results = {}
+        for reference, (kind, value) in parsed.items():
+            if kind == "steamid":
+                results[reference] = value
+            elif kind == "vanity":
+                results[reference] = resolved[value]
+            else:
+                results[reference] = f"Invalid Steam profile reference: '{reference}'"
+        return results
+
+    def isVanityURL(self, steam_url):
+        """True for a vanity profile URL, False for a SteamID64 one. No request is made,
+        so unlike the other methods this is not a coroutine.
+        """
+        kind, _ = parse_profile_reference(steam_url)
+        if kind == "vanity":
+            return True
+        if kind == "steamid":
+            return False
+        return "Invalid Steam profile URL format"
+
+    """ Batch Helpers for Concurrent Fan-Out: """
+
+    async def getUserStatsForApp(self, user_id, app_id, game_title=None):
+        """Fetch GetUserStatsForGame once and return both the stats and achievements views."""
+        try:
+            response = await self._getUserStatsForGame(user_id, app_id)
+            try:
+                stats_data = response.json()
+            except ValueError:
+                error = non_json_error(game_title)
+                return {"player_stats": error, "achievements": error}
+            return {
+                "player_stats": format_user_game_stats(stats_data, game_title, app_id),
+                "achievements": format_user_achievements(stats_data, game_title, app_id),
+            }
+        except REQUEST_ERRORS as e:
+            error = f"Error fetching stats for '{game_title}': {e}"
+            return {"player_stats": error, "achievements": error}
+
+    async def getUserStatsForApps(self, user_id, app_ids, titles=None):
+        """Fetch stats and achievements for many of a user's apps concurrently.
+        Returns {app_id: {"player_stats": ..., "achievements": ...}}.
+        """
+        titles = titles or {}
+        results = await asyncio.gather(
+            *(self.getUserStatsForApp(user_id, app_id, titles.get(app_id)) for app_id in app_ids)
+        )
+        return dict(zip(app_ids, results))
+
+    async def getUserProfileData(self, user_id):
+        """Owned games for a user plus stats/achievements for every owned game."""
+        owned = await self.getUserOwnedGames(user_id)
+        if not isinstance(owned, dict):
+            return owned
+        titles = {game["app_id"]: game["name"] for game in owned["owned_games"]}
+        owned["stats"] = await self.getUserStatsForApps(user_id, list(titles), titles)
+        return owned
+
+    async def getGamesData(self, app_ids):
+        """Player counts, global achievement percentages and news for many apps at once."""
+
+        async def one(app_id):
+            player_count, achievements, news = await asyncio.gather(
+                self.getGamePlayerCount(app_id=app_id),
+                self.getGameAchievementData(app_id=app_id),
+                self.getGameNews(app_id=app_id),
+            )
+            return {"player_count": player_count, "achievements": achievements, "news": news}
+
+        results = await asyncio.gather(*(one(app_id) for app_id in app_ids))
+        return dict(zip(app_ids, results))
@@ -0,0 +1,169 @@
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+# /usr/bin/chromedriver inside the Docker image and on WSL; /opt/homebrew/bin/chromedriver on macOS
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
+
+
+def _free_port():
+    """
+    Ask the OS for an unused TCP port so concurrent browsers never share a debugging port.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PooledBrowser:
+    def __init__(self, driver, port):
+        self.driver = driver
+        self.port = port
+        self.uses = 0
+        self.started_at = time.monotonic()
+
+
+class BrowserPool:
+    """
+    Pool of warm headless Chrome instances shared by display-name searches.
+
+    Browsers are launched lazily up to size, health-checked on checkout,
+    and recycled after max_uses searches or whenever a search errors.
+    """
+
+    def __init__(self, size=2, max_uses=50, page_timeout=15, driver_path=CHROMEDRIVER_PATH):
+        self.size = size
+        self.max_uses = max_uses
+        self.page_timeout = page_timeout
+        self.driver_path = driver_path
+
+        self._idle = []
+        self._launched = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _launch(self):
+        port = _free_port()
+
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless")
+        options.add_argument("--no-sandbox")  # Bypass the sandbox for Chrome
+        options.add_argument("--disable-dev-shm-usage")  # Prevent crashes due to shared memory issues
+        options.add_argument("--disable-gpu")  # Disable GPU acceleration (optional but often helps)
+        options.add_argument(f"--remote-debugging-port={port}")  # Unique per browser
+        options.add_argument("--disable-software-rasterizer")  # Software rasterizer for headless environments
+        options.add_argument("--disable-extensions")  # Disable extensions for stability
+        options.add_argument("--blink-settings=imagesEnabled=false")  # Avatars aren't needed
+
+        driver = webdriver.Chrome(service=Service(self.driver_path), options=options)
+        driver.set_page_load_timeout(self.page_timeout)
+        driver.set_script_timeout(self.page_timeout)
+        return PooledBrowser(driver, port)
+
+    @staticmethod
+    def _is_healthy(browser):
+        try:
+            return bool(browser.driver.window_handles)
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _quit(browser):
+        try:
+            browser.driver.quit()
+        except WebDriverException:
+            pass
+
+    def warm(self, count=None):
+        """
+        Launch browsers ahead of time so the first searches don't pay Chrome startup.
+        """
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._condition:
+                if self._closed or self._launched >= count:
+                    return
+                self._launched += 1
+            try:
+                browser = self._launch()
+            except Exception:
+                with self._condition:
+                    self._launched -= 1
+                raise
+            self._release(browser)
+
+    def _acquire(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    browser = self._idle.pop()
+                    break
+                if self._launched < self.size:
+                    self._launched += 1
+                    browser = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No browser became available in time")
+                self._condition.wait(remaining)
+
+        if browser is not None and self._is_healthy(browser):
+            return browser
+        if browser is not None:
+            self._quit(browser)
+        try:
+            return self._launch()
+        except Exception:
+            self._discard()
+            raise
+
+    def _release(self, browser):
+        with self._condition:
+            if not self._closed:
+                self._idle.append(browser)
+                self._condition.notify()
+                return
+        self._quit(browser)
+
+    def _discard(self, browser=None):
+        if browser is not None:
+            self._quit(browser)
+        with self._condition:
+            self._launched -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def browser(self, timeout=30):
+        """
+        Check out a WebDriver for the duration of the with-block.
+        """
+        browser = self._acquire(timeout)
+        try:
+            yield browser.driver
+        except Exception:
+            # Don't hand a browser in an unknown state to the next search
+            self._discard(browser)
+            raise
+        browser.uses += 1
+        if browser.uses >= self.max_uses:
+            self._discard(browser)
+        else:
+            self._release(browser)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._launched -= len(idle)
+            self._condition.notify_all()
+        for browser in idle:
+            self._quit(browser)
@@ -0,0 +1,75 @@
+"""
+Browser-free Steam community user search.
+
+The steamcommunity.com/search/users page fills itself in by calling
+/search/SearchCommunityAjax, which answers with JSON holding an HTML fragment of
+result rows (20 per page). Calling that endpoint directly gives the same rows
+without rendering the page in Chrome.
+"""
+
+import os
+
+STEAM_COMMUNITY_BASE = os.getenv("STEAM_COMMUNITY_BASE", "https://steamcommunity.com")
+SEARCH_AJAX_PATH = "/search/SearchCommunityAjax"
+RESULTS_PER_PAGE = 20
+
+
+class CommunitySearchError(Exception):
+    """The AJAX search answered, but not with a usable result page."""
+
+
+def search_params(display_name, session_id, page):
+    return {
+        "text": display_name,
+        "filter": "users",
+        "sessionid": session_id,
+        "steamid_user": "false",
+        "page": page,
+    }
+
+
+def parse_search_results(fragment):
+    """
+    Extract [{"display_name", "profile_url"}, ...] from a search result HTML fragment.
+    """
+    if not fragment or not fragment.strip():
+        return []
+
+    try:
+        # Imported on first parse; most processes never search for users
+        from lxml import html as lxml_html
+    except ImportError:  # Fall back to BeautifulSoup when lxml isn't installed
+        lxml_html = None
+
+    results = []
+    if lxml_html is not None:
+        tree = lxml_html.fromstring(fragment)
+        for link in tree.xpath(
+            '//div[contains(concat(" ", normalize-space(@class), " "), " search_row ")]'
+            '//a[contains(concat(" ", normalize-space(@class), " "), " searchPersonaName ")]'
+        ):
+            name = link.text_content().strip()
+            href = (link.get("href") or "").strip()
+            if name and href:
+                results.append({"display_name": name, "profile_url": href})
+        return results
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(fragment, "html.parser")
+    for user in soup.find_all("div", class_="search_row"):
+        link = user.find("a", class_="searchPersonaName")
+        if link and link.text and link.get("href"):
+            results.append(
+                {"display_name": link.text.strip(), "profile_url": link["href"].strip()}
+            )
+    return results
+
+
+def parse_search_page(data):
+    """
+    Validate one SearchCommunityAjax JSON page. Returns (results, total_result_count).
+    """
+    if not isinstance(data, dict) or data.get("success") != 1 or "html" not in data:
+        raise CommunitySearchError(f"Unexpected community search response: {str(data)[:200]}")
+    return parse_search_results(data["html"]), int(data.get("search_result_count", 0))
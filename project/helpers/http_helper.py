@@ -0,0 +1,82 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Transient upstream failures, retried inside the session. 429 is not among them: a
+# throttled request goes back through the rate limiter (see APIHelper._get)
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+THROTTLED_STATUS = 429
+
+# Longest we'll sleep for a Retry-After header before giving up on the request
+MAX_RETRY_AFTER = 5
+
+# (connect, read) timeouts in seconds, keyed by endpoint name
+DEFAULT_TIMEOUTS = {
+    "default": (3.05, 10),
+    "GetAppList": (3.05, 60),
+    "storesearch": (3.05, 10),
+    "GetOwnedGames": (3.05, 20),
+}
+
+
+class CappedRetry(Retry):
+    """
+    urllib3 Retry that honours Retry-After only up to max_retry_after seconds.
+    """
+
+    # urllib3 would otherwise retry any 429 carrying Retry-After, status_forcelist or not
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+    def __init__(self, *args, max_retry_after=MAX_RETRY_AFTER, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.max_retry_after)
+
+
+def create_session(
+    pool_size=10, max_retries=3, backoff_factor=0.5, max_retry_after=MAX_RETRY_AFTER
+):
+    """
+    Build a requests Session backed by a keep-alive connection pool.
+
+    Idempotent requests are retried up to max_retries times on connection
+    errors and on 5xx responses, sleeping backoff_factor * 2**n seconds
+    between attempts (or Retry-After, capped at max_retry_after seconds).
+    """
+    retry = CappedRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # Hand the last response back instead of raising
+        max_retry_after=max_retry_after,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,  # api, store and community hosts (+ a local stub)
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def resolve_timeout(timeouts, endpoint):
+    """
+    Return the (connect, read) timeout configured for an endpoint.
+    """
+    return timeouts.get(endpoint, timeouts["default"])
@@ -0,0 +1,288 @@
+"""
+Incremental (delta) refresh of data already loaded by the ingestion pipeline.
+
+Every fetched entity's payload is hashed and compared with the hash stored in
+the SyncState table. Unchanged payloads only bump fetched_at; changed ones
+are diffed against the stored rows so only rows that actually moved are
+rewritten. Per-game user stats are only requested for games the user has
+played since the last sync.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from .ingestion import (
+    WRITE_PLAN,
+    IngestionPipeline,
+    achievement_rows,
+    game_row,
+    game_stub_row,
+    owned_game_rows,
+    player_count_row,
+    user_achievement_rows,
+    user_game_stat_rows,
+)
+
+# Entity types tracked in SyncState
+APP_DETAILS = "app_details"
+APP_ACHIEVEMENTS = "app_achievements"
+USER_OWNED_GAMES = "user_owned_games"
+USER_APP_STATS = "user_app_stats"
+
+
+def content_hash(payload):
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class IncrementalSync(IngestionPipeline):
+    """
+    IngestionPipeline variant that skips unchanged payloads and rewrites only changed rows.
+
+        sync = IncrementalSync(APIHelper(priority=BULK, cache=False), db)
+        sync.sync_users(sync.stale_users(limit=5000))
+    """
+
+    write_plan = {
+        **WRITE_PLAN,
+        # Changed payloads store their new hash; unchanged ones only record the visit
+        "SyncState": ("SyncState", "upsert", ["content_hash", "fetched_at", "changed_at"]),
+        "SyncStateSeen": ("SyncState", "upsert", ["fetched_at"]),
+    }
+
+    def __init__(self, api, db, percent_epsilon=0.05, **kwargs):
+        if getattr(api, "cache", None) is not None:
+            # A cached payload hashes the same as last time and would hide real changes
+            raise ValueError("IncrementalSync needs an API helper built with cache=False")
+        # A refresh should revisit everything it's asked to, so no checkpoint file by default
+        kwargs.setdefault("checkpoint_path", None)
+        super().__init__(api, db, **kwargs)
+        self.percent_epsilon = percent_epsilon
+
+    """ Sync State: """
+
+    def _stored_hashes(self, entity_type, entity_ids=None, prefix=None):
+        if prefix is not None:
+            rows = self.db.execute_query(
+                "SELECT entity_id, content_hash FROM SyncState"
+                " WHERE entity_type = %s AND entity_id LIKE %s",
+                (entity_type, f"{prefix}%"),
+            )
+        else:
+            placeholders = ", ".join(["%s"] * len(entity_ids))
+            rows = self.db.execute_query(
+                "SELECT entity_id, content_hash FROM SyncState"
+                f" WHERE entity_type = %s AND entity_id IN ({placeholders})",
+                (entity_type, *[str(i) for i in entity_ids]),
+            )
+        return {row["entity_id"]: row["content_hash"] for row in rows or []}
+
+    def _track(self, rows, entity_type, entity_id, payload, stored_hash):
+        """
+        Record the payload's hash in rows; returns True if the payload changed.
+        """
+        digest = content_hash(payload)
+        now = _now()
+        state = {
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "content_hash": digest,
+            "fetched_at": now,
+            "changed_at": now,
+        }
+        changed = digest != stored_hash
+        rows.setdefault("SyncState" if changed else "SyncStateSeen", []).append(state)
+        self._count("changed" if changed else "unchanged")
+        return changed
+
+    def _select(self, query, params):
+        return self.db.execute_query(query, params) or []
+
+    """ Apps: """
+
+    def _fetch_app(self, executor, app_id):
+        rows = {}
+
+        details = self.api.getAppDetails(app_id)
+        if isinstance(details, dict):
+            row = game_row(app_id, details)
+            stored = self._stored_hashes(APP_DETAILS, [app_id]).get(str(app_id))
+            if self._track(rows, APP_DETAILS, app_id, row, stored):
+                rows["Games"] = [row]
+        else:
+            rows["GameStubs"] = [game_stub_row(app_id)]
+
+        achievements = self.api.getGameAchievementData(app_id=app_id)
+        if isinstance(achievements, dict):
+            fetched = achievement_rows(app_id, achievements["achievements"])
+            payload = sorted((a["name"], round(a["percent"], 2)) for a in fetched)
+            stored = self._stored_hashes(APP_ACHIEVEMENTS, [app_id]).get(str(app_id))
+            if self._track(rows, APP_ACHIEVEMENTS, app_id, payload, stored):
+                existing = {
+                    r["name"]: r["percent"]
+                    for r in self._select(
+                        "SELECT name, percent FROM Achievements WHERE app_id = %s", (app_id,)
+                    )
+                }
+                rows["Achievements"] = [
+                    a
+                    for a in fetched
+                    if a["name"] not in existing
+                    or abs(a["percent"] - existing[a["name"]]) >= self.percent_epsilon
+                ]
+
+        player_count = self.api.getGamePlayerCount(app_id=app_id)
+        if isinstance(player_count, dict):
+            rows["PlayerCounts"] = [
+                player_count_row(app_id, player_count["current_player_count"])
+            ]
+
+        self._count("apps_fetched")
+        self._emit([f"app:{app_id}"], rows)
+
+    """ Users: """
+
+    def _fetch_user(self, executor, user_id):
+        owned = self.api.getUserOwnedGames(user_id)
+        if not isinstance(owned, dict):
+            self._count("users_without_games")
+            self._emit([f"user:{user_id}:owned"], {"UserProfiles": self._profile_rows(user_id)})
+            return
+
+        rows = {"UserProfiles": self._profile_rows(user_id)}
+        fetched = owned_game_rows(user_id, owned["owned_games"])
+        payload = sorted(
+            (g["app_id"], g["playtime_forever"], g["playtime_2weeks"]) for g in fetched
+        )
+        stored = self._stored_hashes(USER_OWNED_GAMES, [user_id]).get(str(user_id))
+        self._count("users_fetched")
+        if not self._track(rows, USER_OWNED_GAMES, user_id, payload, stored):
+            # Same library and playtimes as last time, so no achievements can have moved either
+            self._emit([f"user:{user_id}:owned"], rows)
+            return
+
+        existing = {
+            r["app_id"]: (r["playtime_forever"], r["playtime_2weeks"])
+            for r in self._select(
+                "SELECT app_id, playtime_forever, playtime_2weeks FROM UserOwnedGames"
+                " WHERE user_id = %s",
+                (user_id,),
+            )
+        }
+        changed = [
+            g
+            for g in fetched
+            if existing.get(g["app_id"]) != (g["playtime_forever"], g["playtime_2weeks"])
+        ]
+        names = {g["app_id"]: g["name"] for g in owned["owned_games"]}
+        rows["Users"] = [{"id": user_id}]
+        rows["GameStubs"] = [game_stub_row(g["app_id"], names[g["app_id"]]) for g in changed]
+        rows["UserOwnedGames"] = changed
+        self._emit([f"user:{user_id}:owned"], rows)
+
+        # Stats only move for games played since the last sync (new, or playtime changed)
+        stat_hashes = self._stored_hashes(USER_APP_STATS, prefix=f"{user_id}:")
+        for game in changed:
+            if game["playtime_2weeks"] > 0 or game["app_id"] not in existing:
+                self._submit(
+                    executor,
+                    self._fetch_user_app,
+                    user_id,
+                    game["app_id"],
+                    names[game["app_id"]],
+                    stat_hashes.get(f"{user_id}:{game['app_id']}"),
+                )
+            else:
+                self._count("user_apps_skipped")
+
+    def _fetch_user_app(self, executor, user_id, app_id, game_title, stored_hash=None):
+        stats = self.api.getUserStatsForApp(user_id, app_id, game_title)
+        player_stats = stats["player_stats"] if isinstance(stats["player_stats"], dict) else {}
+        achievements = stats["achievements"] if isinstance(stats["achievements"], dict) else {}
+        stat_rows = user_game_stat_rows(user_id, app_id, player_stats.get("player_stats", []))
+        unlocked_rows = user_achievement_rows(
+            user_id, app_id, achievements.get("achievements", [])
+        )
+        self._count("user_apps_fetched")
+
+        rows = {}
+        payload = {
+            "stats": sorted((r["stat_name"], r["stat_value"]) for r in stat_rows),
+            "achievements": sorted((r["achievement_name"], r["achieved"]) for r in unlocked_rows),
+        }
+        if self._track(rows, USER_APP_STATS, f"{user_id}:{app_id}", payload, stored_hash):
+            existing_stats = {
+                r["stat_name"]: r["stat_value"]
+                for r in self._select(
+                    "SELECT stat_name, stat_value FROM UserGameStatistics"
+                    " WHERE user_id = %s AND app_id = %s",
+                    (user_id, app_id),
+                )
+            }
+            existing_achievements = {
+                r["achievement_name"]: r["achieved"]
+                for r in self._select(
+                    "SELECT achievement_name, achieved FROM UserAchievementStatistics"
+                    " WHERE user_id = %s AND app_id = %s",
+                    (user_id, app_id),
+                )
+            }
+            rows["UserGameStatistics"] = [
+                r for r in stat_rows if existing_stats.get(r["stat_name"]) != r["stat_value"]
+            ]
+            rows["UserAchievementStatistics"] = [
+                r
+                for r in unlocked_rows
+                if existing_achievements.get(r["achievement_name"]) != r["achieved"]
+            ]
+        self._emit([f"user:{user_id}:app:{app_id}"], rows)
+
+    """ Prioritization: """
+
+    def stale_apps(self, limit=1000, min_age_hours=24):
+        """
+        App ids most in need of a refresh: longest since last sync, weighted by
+        how many stored users own the game. Never-synced apps come first.
+        """
+        rows = self._select(
+            "SELECT g.id AS app_id FROM Games g"
+            " LEFT JOIN SyncState s ON s.entity_type = %s AND s.entity_id = CAST(g.id AS CHAR)"
+            " LEFT JOIN UserOwnedGames o ON o.app_id = g.id"
+            " WHERE s.fetched_at IS NULL OR s.fetched_at < UTC_TIMESTAMP() - INTERVAL %s HOUR"
+            " GROUP BY g.id, s.fetched_at"
+            " ORDER BY s.fetched_at IS NOT NULL,"
+            "  TIMESTAMPDIFF(MINUTE, s.fetched_at, UTC_TIMESTAMP()) * (1 + LN(1 + COUNT(o.user_id))) DESC"
+            " LIMIT %s",
+            (APP_ACHIEVEMENTS, min_age_hours, limit),
+        )
+        return [row["app_id"] for row in rows]
+
+    def stale_users(self, limit=1000, min_age_hours=24):
+        """
+        SteamID64s most in need of a refresh: longest since last sync, weighted
+        by recent (two-week) playtime, since active players change the most.
+        """
+        rows = self._select(
+            "SELECT u.id AS user_id FROM Users u"
+            " LEFT JOIN SyncState s ON s.entity_type = %s AND s.entity_id = CAST(u.id AS CHAR)"
+            " LEFT JOIN UserOwnedGames o ON o.user_id = u.id"
+            " WHERE s.fetched_at IS NULL OR s.fetched_at < UTC_TIMESTAMP() - INTERVAL %s HOUR"
+            " GROUP BY u.id, s.fetched_at"
+            " ORDER BY s.fetched_at IS NOT NULL,"
+            "  TIMESTAMPDIFF(MINUTE, s.fetched_at, UTC_TIMESTAMP())"
+            "  * (1 + LN(1 + COALESCE(SUM(o.playtime_2weeks), 0))) DESC"
+            " LIMIT %s",
+            (USER_OWNED_GAMES, min_age_hours, limit),
+        )
+        return [row["user_id"] for row in rows]
+
+    def sync_apps(self, app_ids):
+        return self.ingest_apps(app_ids)
+
+    def sync_users(self, steam_ids):
+        return self.ingest_users(steam_ids)
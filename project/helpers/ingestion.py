@@ -0,0 +1,522 @@
+"""
+Parallel ingestion of Steam data into the steamdatabase schema (db/init.sql).
+
+Fetching runs on a bounded thread pool; every finished unit of work is handed
+to a single writer thread through a bounded queue (so fetchers block when the
+database falls behind) and written in batched transactions. Units are
+appended to a checkpoint file only after their rows are committed, so an
+interrupted crawl resumes where it stopped. If the writer dies, fetching
+stops and the run raises IngestionError instead of blocking on the queue.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+CHECKPOINT_PATH = os.getenv("STEAM_INGEST_CHECKPOINT", "data/ingest_checkpoint.jsonl")
+
+# Seconds a fetcher waits on a full queue before checking that the writer is still alive
+QUEUE_PUT_TIMEOUT = 1.0
+
+# Row buckets in flush order (parents before children, for the foreign keys):
+# bucket -> (table, write mode, columns updated on duplicate key)
+WRITE_PLAN = {
+    "Users": ("Users", "upsert", []),
+    # Users rows with a GetPlayerSummaries profile; only these refresh the name and URL
+    "UserProfiles": ("Users", "upsert", ["display_name", "profile_url"]),
+    "Games": ("Games", "upsert", None),
+    # Placeholder Games rows so child rows satisfy their foreign key; never overwrite real rows
+    "GameStubs": ("Games", "upsert", []),
+    "Achievements": ("Achievements", "upsert", ["percent"]),
+    "PlayerCounts": ("PlayerCounts", "insert", None),
+    "UserOwnedGames": ("UserOwnedGames", "upsert", ["playtime_forever", "playtime_2weeks"]),
+    "UserGameStatistics": ("UserGameStatistics", "upsert", ["stat_value"]),
+    "UserAchievementStatistics": ("UserAchievementStatistics", "upsert", ["achieved"]),
+}
+
+# Upserts are only idempotent when each table's natural key is its primary or a unique key
+# (db/init.sql; existing databases get them from db/migrations/003_natural_keys.sql)
+NATURAL_KEYS = {
+    "Users": ("id",),
+    "Games": ("id",),
+    "Achievements": ("app_id", "name"),
+    "UserOwnedGames": ("user_id", "app_id"),
+    "UserGameStatistics": ("user_id", "app_id", "stat_name"),
+    "UserAchievementStatistics": ("user_id", "app_id", "achievement_name"),
+    "SyncState": ("entity_type", "entity_id"),
+}
+
+UNIQUE_KEYS_QUERY = """
+    SELECT TABLE_NAME AS table_name, INDEX_NAME AS index_name,
+           GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS columns
+    FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND NON_UNIQUE = 0
+    GROUP BY TABLE_NAME, INDEX_NAME
+"""
+
+
+""" Normalizers: Steam payloads -> table rows """
+
+
+def game_row(app_id, details):
+    price = details.get("price_overview") or {}
+    platforms = details.get("platforms") or {}
+    return {
+        "id": int(app_id),
+        "name": details.get("name"),
+        "type": details.get("type"),
+        "price_initial": price.get("initial", 0 if details.get("is_free") else None),
+        "price_final": price.get("final", 0 if details.get("is_free") else None),
+        "currency": price.get("currency"),
+        "tiny_image": details.get("capsule_image"),
+        "metascore": (details.get("metacritic") or {}).get("score"),
+        "platforms_windows": int(bool(platforms.get("windows"))),
+        "platforms_mac": int(bool(platforms.get("mac"))),
+        "platforms_linux": int(bool(platforms.get("linux"))),
+        "streamingvideo": None,  # Only reported by storesearch
+        "controller_support": details.get("controller_support"),
+    }
+
+
+def store_search_row(item):
+    """
+    Games row from a storesearch result item (the shape the Games table mirrors).
+    """
+    price = item.get("price") or {}
+    platforms = item.get("platforms") or {}
+    metascore = str(item.get("metascore") or "")
+    return {
+        "id": int(item["id"]),
+        "name": item.get("name"),
+        "type": item.get("type"),
+        "price_initial": price.get("initial"),
+        "price_final": price.get("final"),
+        "currency": price.get("currency"),
+        "tiny_image": item.get("tiny_image"),
+        "metascore": int(metascore) if metascore.isdigit() else None,
+        "platforms_windows": int(bool(platforms.get("windows"))),
+        "platforms_mac": int(bool(platforms.get("mac"))),
+        "platforms_linux": int(bool(platforms.get("linux"))),
+        "streamingvideo": int(bool(item.get("streamingvideo"))),
+        "controller_support": item.get("controller_support"),
+    }
+
+
+def game_stub_row(app_id, name=None):
+    return {"id": int(app_id), "name": name}
+
+
+def achievement_rows(app_id, achievements):
+    return [
+        {"app_id": int(app_id), "name": a["name"], "percent": float(a["percent"])}
+        for a in achievements
+    ]
+
+
+def player_count_row(app_id, player_count):
+    return {"app_id": int(app_id), "current_player_count": int(player_count)}
+
+
+def user_profile_row(user_id, summary):
+    return {
+        "id": user_id,
+        "display_name": summary.get("personaname"),
+        "profile_url": summary.get("profileurl"),
+    }
+
+
+def owned_game_rows(user_id, owned_games):
+    return [
+        {
+            "user_id": user_id,
+            "app_id": int(game["app_id"]),
+            "playtime_forever": game["playtime_forever"],
+            "playtime_2weeks": game["playtime_2weeks"],
+        }
+        for game in owned_games
+    ]
+
+
+def user_game_stat_rows(user_id, app_id, player_stats):
+    return [
+        {
+            "user_id": user_id,
+            "app_id": int(app_id),
+            "stat_name": stat["name"],
+            "stat_value": int(round(float(stat["value"]))),
+        }
+        for stat in player_stats
+    ]
+
+
+def user_achievement_rows(user_id, app_id, achievements):
+    return [
+        {
+            "user_id": user_id,
+            "app_id": int(app_id),
+            "achievement_name": a["name"],
+            "achieved": int(a.get("achieved", 0)),
+        }
+        for a in achievements
+    ]
+
+
+class IngestionError(Exception):
+    """The write stage failed, so the run stopped before all units were written."""
+
+
+class Checkpoint:
+    """
+    Append-only record of committed units ("app:440", "user:7656...:owned", ...).
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        self.done.add(json.loads(line))
+                    except ValueError:
+                        pass  # A line cut short by a crash; that unit is simply redone
+
+    def __contains__(self, unit):
+        return unit in self.done
+
+    def mark(self, units):
+        with self._lock:
+            self.done.update(units)
+            if self.path:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.writelines(json.dumps(unit) + "\n" for unit in units)
+
+
+class IngestionPipeline:
+    """
+    Fan out Steam fetches over a worker pool and write the results in batches.
+
+        pipeline = IngestionPipeline(APIHelper(priority=BULK), db)
+        pipeline.ingest_apps([440, 570])
+        pipeline.ingest_users(["76561197960287930"])
+    """
+
+    write_plan = WRITE_PLAN
+
+    def __init__(
+        self,
+        api,
+        db,
+        workers=8,
+        queue_size=256,
+        batch_size=1000,
+        flush_interval=2.0,
+        checkpoint_path=CHECKPOINT_PATH,
+    ):
+        self.api = api
+        self.db = db
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.stats = Counter()
+
+        self._results = queue.Queue(maxsize=queue_size)
+        # Caps top-level tasks in flight so huge id lists don't sit in memory as futures
+        self._task_slots = threading.BoundedSemaphore(workers * 4)
+        self._pending = 0
+        self._pending_done = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self._on_flush = []
+        # steamid -> GetPlayerSummaries entry for the users being ingested
+        self._profiles = {}
+        self._stopped = threading.Event()
+        self._writer_error = None
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    """ Fetch Stage: """
+
+    def _submit(self, executor, fn, *args, bounded=False):
+        """
+        Queue fn(executor, *args) on the pool. Top-level submissions are bounded;
+        follow-up tasks submitted from inside a task are not, so a task never
+        waits on a slot that only its own children could free.
+        """
+        if bounded:
+            self._task_slots.acquire()
+        with self._pending_done:
+            self._pending += 1
+
+        def run():
+            try:
+                if not self._stopped.is_set():
+                    fn(executor, *args)
+            except IngestionError:
+                pass  # The writer failed; _run reports it once
+            except Exception as e:
+                print(f"Ingestion task {fn.__name__}{args} failed: {e}")
+                self._count("failed_tasks")
+            finally:
+                if bounded:
+                    self._task_slots.release()
+                with self._pending_done:
+                    self._pending -= 1
+                    self._pending_done.notify_all()
+
+        executor.submit(run)
+
+    def _put(self, item):
+        """
+        Put item on the writer's queue, blocking while it is full. Raises
+        IngestionError once the run has stopped, so no fetcher waits on a dead writer.
+        """
+        while True:
+            if self._stopped.is_set():
+                raise IngestionError("Ingestion stopped after the writer failed")
+            try:
+                self._results.put(item, timeout=QUEUE_PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+    def _emit(self, units, rows):
+        """
+        Hand a finished unit of work to the writer; blocks while the queue is full.
+        """
+        self._put((units, rows))
+
+    def _fetch_app(self, executor, app_id):
+        rows = {bucket: [] for bucket in self.write_plan}
+
+        details = self.api.getAppDetails(app_id)
+        if isinstance(details, dict):
+            rows["Games"].append(game_row(app_id, details))
+        else:
+            rows["GameStubs"].append(game_stub_row(app_id))
+
+        achievements = self.api.getGameAchievementData(app_id=app_id)
+        if isinstance(achievements, dict):
+            rows["Achievements"] = achievement_rows(app_id, achievements["achievements"])
+
+        player_count = self.api.getGamePlayerCount(app_id=app_id)
+        if isinstance(player_count, dict):
+            rows["PlayerCounts"].append(
+                player_count_row(app_id, player_count["current_player_count"])
+            )
+
+        self._count("apps_fetched")
+        self._emit([f"app:{app_id}"], rows)
+
+    def _profile_rows(self, user_id):
+        summary = self._profiles.get(str(user_id))
+        return [user_profile_row(user_id, summary)] if summary else []
+
+    def _fetch_user(self, executor, user_id):
+        owned = self.api.getUserOwnedGames(user_id)
+        if not isinstance(owned, dict):
+            # Private profile or unknown user: nothing more to fetch
+            self._count("users_without_games")
+            self._emit(
+                [f"user:{user_id}:owned"],
+                {"Users": [{"id": user_id}], "UserProfiles": self._profile_rows(user_id)},
+            )
+            return
+
+        owned_unit = f"user:{user_id}:owned"
+        if owned_unit not in self.checkpoint:
+            self._emit(
+                [owned_unit],
+                {
+                    "Users": [{"id": user_id}],
+                    "UserProfiles": self._profile_rows(user_id),
+                    "GameStubs": [
+                        game_stub_row(g["app_id"], g["name"]) for g in owned["owned_games"]
+                    ],
+                    "UserOwnedGames": owned_game_rows(user_id, owned["owned_games"]),
+                },
+            )
+        self._count("users_fetched")
+
+        for game in owned["owned_games"]:
+            unit = f"user:{user_id}:app:{game['app_id']}"
+            if unit not in self.checkpoint:
+                self._submit(executor, self._fetch_user_app, user_id, game["app_id"], game["name"])
+
+    def _fetch_user_app(self, executor, user_id, app_id, game_title):
+        stats = self.api.getUserStatsForApp(user_id, app_id, game_title)
+        rows = {}
+        if isinstance(stats["player_stats"], dict):
+            rows["UserGameStatistics"] = user_game_stat_rows(
+                user_id, app_id, stats["player_stats"]["player_stats"]
+            )
+        if isinstance(stats["achievements"], dict):
+            rows["UserAchievementStatistics"] = user_achievement_rows(
+                user_id, app_id, stats["achievements"]["achievements"]
+            )
+        self._count("user_apps_fetched")
+        self._emit([f"user:{user_id}:app:{app_id}"], rows)
+
+    """ Write Stage: """
+
+    def _flush(self, buffered, units):
+        for bucket, (table, mode, update_columns) in self.write_plan.items():
+            rows = buffered.get(bucket)
+            if not rows:
+                continue
+            if mode == "insert":
+                written = self.db.bulk_insert(table, rows, batch_size=self.batch_size)
+            else:
+                written = self.db.upsert(
+                    table, rows, update_columns=update_columns, batch_size=self.batch_size
+                )
+            if written is None:
+                # Leave these units out of the checkpoint so the next run redoes them
+                self._count("failed_flushes")
+                return False
+            self._count(f"rows_{bucket}", written)
+
+        for callback in self._on_flush:
+            callback(buffered, units)
+        self.checkpoint.mark(units)
+        return True
+
+    def _writer(self):
+        try:
+            self._write_loop()
+        except BaseException as e:
+            # Stop the fetchers; _run re-raises this once they have wound down
+            self._writer_error = e
+            self._stopped.set()
+
+    def _write_loop(self):
+        buffered, units, pending = {}, [], 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._results.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = False
+
+            if item is None or item is False:
+                if units:
+                    self._flush(self._materialize(buffered), units)
+                    buffered, units, pending = {}, [], 0
+                    last_flush = time.monotonic()
+                if item is None:
+                    return
+                continue
+
+            item_units, rows = item
+            units.extend(item_units)
+            for bucket, bucket_rows in rows.items():
+                if bucket in ("Users", "UserProfiles", "GameStubs"):
+                    # The same user/game shows up in many units; keep one row per id
+                    merged = buffered.setdefault(bucket, {})
+                    merged.update((row["id"], row) for row in bucket_rows)
+                    continue
+                buffered.setdefault(bucket, []).extend(bucket_rows)
+                pending += len(bucket_rows)
+
+            if pending >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush(self._materialize(buffered), units)
+                buffered, units, pending = {}, [], 0
+                last_flush = time.monotonic()
+
+    @staticmethod
+    def _materialize(buffered):
+        return {
+            bucket: list(rows.values()) if isinstance(rows, dict) else rows
+            for bucket, rows in buffered.items()
+        }
+
+    """ Entry Points: """
+
+    def check_schema(self):
+        """
+        Raise IngestionError if an upserted table lacks its natural key, since the
+        upserts would then append duplicate rows instead of updating.
+        """
+        keys = self.db.execute_query(UNIQUE_KEYS_QUERY)
+        if keys is None:
+            raise IngestionError("Could not read the table keys from information_schema")
+        unique = {(row["table_name"], tuple(row["columns"].split(","))) for row in keys}
+        missing = sorted(
+            f"{table}({', '.join(NATURAL_KEYS[table])})"
+            for table, mode, _ in self.write_plan.values()
+            if mode == "upsert" and (table, NATURAL_KEYS[table]) not in unique
+        )
+        if missing:
+            raise IngestionError(
+                "Missing natural keys on " + ", ".join(dict.fromkeys(missing))
+                + "; apply db/migrations/003_natural_keys.sql"
+            )
+
+    def on_flush(self, callback):
+        """
+        Register callback(rows_by_bucket, units), called after each committed batch.
+        """
+        self._on_flush.append(callback)
+
+    def _run(self, fn, items, unit_format=None):
+        """
+        Fetch every item through fn and write the results. Raises IngestionError if the
+        writer failed; units committed before the failure stay in the checkpoint.
+        """
+        self.check_schema()
+        self._stopped.clear()
+        self._writer_error = None
+        writer = threading.Thread(target=self._writer, name="ingest-writer", daemon=True)
+        writer.start()
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest") as executor:
+            for item in items:
+                if self._stopped.is_set():
+                    break
+                if unit_format and unit_format.format(item) in self.checkpoint:
+                    self._count("skipped")
+                    continue
+                self._submit(executor, fn, item, bounded=True)
+            # Tasks submit follow-up tasks, so wait for the pending count rather than the futures
+            with self._pending_done:
+                self._pending_done.wait_for(lambda: self._pending == 0)
+
+        try:
+            self._put(None)
+        except IngestionError:
+            pass
+        writer.join()
+        self.stats["seconds"] = round(time.monotonic() - started, 2)
+        if self._writer_error is not None:
+            raise IngestionError(
+                f"Writing to the database failed: {self._writer_error!r}"
+            ) from self._writer_error
+        return dict(self.stats)
+
+    def ingest_apps(self, app_ids):
+        """
+        Games, global achievement percentages and a player-count sample per app.
+        """
+        return self._run(self._fetch_app, [int(a) for a in app_ids], "app:{}")
+
+    def ingest_users(self, steam_ids):
+        """
+        Owned games plus per-game stats and achievements for each SteamID64.
+        Users are always revisited on resume; their committed per-game units are skipped.
+        """
+        steam_ids = [str(s) for s in steam_ids]
+        # Names and profile URLs for the Users rows, 100 users per request
+        self._profiles = self.api.getPlayerSummaries(steam_ids) if steam_ids else {}
+        self._count("user_profiles_fetched", len(self._profiles))
+        return self._run(self._fetch_user, steam_ids)
@@ -0,0 +1,200 @@
+"""
+Local background-job support for the Dash app, backed by diskcache (no broker).
+
+Dash's DiskcacheManager starts a new process for every background callback,
+which throws away everything a warm server process holds: HTTP sessions, the
+rate limiter's budget, the response cache's LRU and in-flight coalescing, the
+Chrome pool and the MySQL pool. ThreadedDiskcacheManager instead runs jobs on a
+thread pool that lives as long as the server process, and keeps the job's
+progress, result and running/cancelled state in the shared diskcache so any
+server process can answer Dash's polls. On top of that, JobManager provides:
+
+  - per_process(): objects (like the APIHelper, with its sockets, locks and
+    SQLite connections) built once per server process and shared by its jobs,
+    rather than inherited across the gunicorn fork.
+  - run_exclusive(): maintenance work (like refreshing the app index) run off
+    the request path by one server process at a time.
+  - single_flight(): de-duplication of identical in-flight work. A second job
+    with the same arguments waits for the first and reuses its result instead
+    of repeating the Steam calls.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import diskcache
+from dash import DiskcacheManager
+
+JOB_CACHE_DIR = os.getenv("DASH_JOB_CACHE_DIR", "data/dash_jobs")
+# Background callbacks run at once per server process; more wait in the pool's queue
+JOB_THREADS = int(os.getenv("DASH_JOB_THREADS", "8"))
+
+_MISSING = object()
+
+
+class ThreadedDiskcacheManager(DiskcacheManager):
+    """
+    DiskcacheManager that runs jobs on a long-lived per-process thread pool.
+
+    A thread can't be killed, so cancelling is cooperative: a cancelled job that
+    hasn't started is skipped, and one that is already running finishes (bounded
+    by the HTTP timeouts) but its result is dropped.
+    """
+
+    def __init__(self, cache, threads=JOB_THREADS, job_timeout=300):
+        super().__init__(cache)
+        self.threads = threads
+        # A job whose process died stops counting as running after this many seconds
+        self.job_timeout = job_timeout
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+
+    def pool(self):
+        """The job thread pool of this process, started on first use."""
+        # The app is preloaded before gunicorn forks; each worker needs its own threads
+        with self._executor_lock:
+            if self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.threads, thread_name_prefix="dash-job"
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def shutdown(self, wait=True):
+        """Stop taking jobs; with wait, return once the running ones have finished."""
+        with self._executor_lock:
+            executor, self._executor, self._executor_pid = self._executor, None, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    @staticmethod
+    def _running_key(job):
+        return f"dash-job:{job}"
+
+    @staticmethod
+    def _owner_key(key):
+        return f"dash-job-owner:{key}"
+
+    def call_job_fn(self, key, job_fn, args, context):
+        job = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self.handle.set(self._running_key(job), True, expire=self.job_timeout)
+        # Identical callback arguments share a result key; the newest job owns it
+        self.handle.set(self._owner_key(key), job, expire=self.job_timeout)
+
+        def run():
+            try:
+                if self.job_running(job):
+                    job_fn(key, self._make_progress_key(key), args, context)
+            finally:
+                cancelled = self.handle.pop(self._running_key(job)) is None
+                if cancelled and self.handle.get(self._owner_key(key)) == job:
+                    self.clear_cache_entry(key)
+                    self.clear_cache_entry(self._make_progress_key(key))
+
+        self.pool().submit(run)
+        return job
+
+    def terminate_job(self, job):
+        if job:
+            self.handle.delete(self._running_key(job))
+
+    def terminate_unhealthy_job(self, job):
+        # Threads don't linger as zombies; an abandoned job's marker expires instead
+        return False
+
+    def job_running(self, job):
+        return bool(job) and self.handle.get(self._running_key(job)) is not None
+
+
+class JobManager:
+    def __init__(self, directory=JOB_CACHE_DIR, result_ttl=30, lock_timeout=120):
+        self.cache = diskcache.Cache(directory)
+        # Pass as Dash(background_callback_manager=...)
+        self.callback_manager = ThreadedDiskcacheManager(self.cache)
+        self.result_ttl = result_ttl
+        self.lock_timeout = lock_timeout
+        self._pid = None
+        self._objects = {}
+        self._objects_lock = threading.RLock()
+        # run_exclusive() names queued or running in this process
+        self._exclusive = set()
+
+    def per_process(self, name, factory):
+        """
+        factory() built once per process and shared by all of its job threads.
+        """
+        with self._objects_lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._objects = {}
+            if name not in self._objects:
+                self._objects[name] = factory()
+            return self._objects[name]
+
+    def close(self):
+        """
+        Let queued and running jobs finish, then close this process's per_process()
+        objects, newest first, so a wrapper is flushed before the helpers it uses.
+        """
+        self.callback_manager.shutdown(wait=True)
+        with self._objects_lock:
+            objects = list(self._objects.values()) if self._pid == os.getpid() else []
+            self._objects = {}
+        for obj in reversed(objects):
+            close = getattr(obj, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Failed to close {type(obj).__name__}: {e}")
+
+    def run_exclusive(self, name, fn, timeout=600):
+        """
+        Run fn() on the job thread pool, at most once at a time across every server
+        process. Returns False without queueing it if this process already has one pending.
+        """
+        with self._objects_lock:
+            if name in self._exclusive:
+                return False
+            self._exclusive.add(name)
+
+        def run():
+            try:
+                with diskcache.Lock(self.cache, f"exclusive:{name}:lock", expire=timeout):
+                    fn()
+            except Exception as e:
+                print(f"Background task {name} failed: {e}")
+            finally:
+                with self._objects_lock:
+                    self._exclusive.discard(name)
+
+        self.callback_manager.pool().submit(run)
+        return True
+
+    def single_flight(self, name, args, fn):
+        """
+        Return fn(), sharing the result between identical (name, args) calls that
+        overlap. The result is kept for result_ttl seconds for late duplicates.
+        """
+        digest = hashlib.sha1(
+            json.dumps([name, args], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        key = f"single-flight:{digest}"
+
+        value = self.cache.get(key, default=_MISSING)
+        if value is not _MISSING:
+            return value
+        # Jobs are threads that always unwind, so the lock is released when fn() returns
+        # or raises; the expiry only covers a server process that died holding it
+        with diskcache.Lock(self.cache, f"{key}:lock", expire=self.lock_timeout):
+            # A twin job may have finished while this one waited for the lock
+            value = self.cache.get(key, default=_MISSING)
+            if value is _MISSING:
+                value = fn()
+                self.cache.set(key, value, expire=self.result_ttl)
+        return value
@@ -0,0 +1,232 @@
+"""
+Prometheus metrics, slow-query logging and optional trace spans for the hot paths.
+
+APIHelper/AsyncAPIHelper record every upstream Steam call (per endpoint: status,
+retries, bytes, latency), MySQLHelper every statement (per fingerprint: rows,
+latency, errors), and the Dash app every callback and HTTP request. The Dash
+server exposes them all at /metrics via instrument_dash(app).
+
+Recording is a couple of dictionary lookups per call plus prometheus_client's
+per-metric lock around each inc/observe, which is only held for the update.
+With PROMETHEUS_MULTIPROC_DIR set, each WSGI worker writes its values to that
+directory and they are aggregated at scrape time. Background callbacks run on
+the worker's own job threads, so they add no per-process files of their own.
+Trace spans are only created when METRICS_TRACING=true and opentelemetry is
+installed.
+"""
+
+import functools
+import os
+import re
+import time
+from contextlib import contextmanager, nullcontext
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+try:
+    from opentelemetry import trace
+except ImportError:  # Spans are optional; metrics don't need them
+    trace = None
+
+SLOW_QUERY_SECONDS = float(os.getenv("MYSQL_SLOW_QUERY_SECONDS", "1.0"))
+TRACING = trace is not None and os.getenv("METRICS_TRACING", "false").lower() == "true"
+
+# Fingerprints are label values, so keep them bounded
+FINGERPRINT_LENGTH = 160
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+""" Metric Definitions: """
+
+STEAM_REQUESTS = Counter(
+    "steam_api_requests_total", "Upstream Steam requests.", ["endpoint", "status"]
+)
+STEAM_REQUEST_SECONDS = Histogram(
+    "steam_api_request_seconds",
+    "Upstream Steam request latency, including retries.",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+STEAM_RETRIES = Counter("steam_api_retries_total", "Retried Steam requests.", ["endpoint"])
+STEAM_RESPONSE_BYTES = Counter(
+    "steam_api_response_bytes_total", "Steam response body bytes.", ["endpoint"]
+)
+
+MYSQL_QUERIES = Counter("mysql_queries_total", "MySQL statements executed.", ["statement"])
+MYSQL_QUERY_SECONDS = Histogram(
+    "mysql_query_seconds", "MySQL statement latency.", ["statement"], buckets=LATENCY_BUCKETS
+)
+MYSQL_ROWS = Counter("mysql_rows_total", "Rows returned or written.", ["statement"])
+MYSQL_ERRORS = Counter("mysql_query_errors_total", "Failed MySQL statements.", ["statement"])
+
+CALLBACK_SECONDS = Histogram(
+    "dash_callback_seconds", "Dash callback run time.", ["callback"], buckets=LATENCY_BUCKETS
+)
+CALLBACK_ERRORS = Counter("dash_callback_errors_total", "Dash callbacks that raised.", ["callback"])
+HTTP_REQUEST_SECONDS = Histogram(
+    "dash_http_request_seconds",
+    "Dash server request latency, including serialization.",
+    ["route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+""" Spans: """
+
+_NO_SPAN = nullcontext()
+
+
+def span(name, **attributes):
+    """
+    Context manager for a trace span; a shared no-op unless tracing is enabled.
+    """
+    if not TRACING:
+        return _NO_SPAN
+    return trace.get_tracer("steam-dashboard").start_as_current_span(name, attributes=attributes)
+
+
+""" Steam API: """
+
+
+def record_steam_request(endpoint, status, seconds, size=0, retries=0):
+    STEAM_REQUESTS.labels(endpoint, str(status)).inc()
+    STEAM_REQUEST_SECONDS.labels(endpoint).observe(seconds)
+    if size:
+        STEAM_RESPONSE_BYTES.labels(endpoint).inc(size)
+    if retries:
+        STEAM_RETRIES.labels(endpoint).inc(retries)
+
+
+def response_retries(response):
+    """Retries urllib3 made before returning a requests response."""
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+
+@contextmanager
+def timed_upstream(endpoint):
+    """
+    Time a non-HTTP upstream step (e.g. a Selenium search) as a Steam request.
+    """
+    start = time.perf_counter()
+    status = "error"
+    with span(f"steam {endpoint}"):
+        try:
+            yield
+            status = "ok"
+        finally:
+            record_steam_request(endpoint, status, time.perf_counter() - start)
+
+
+""" MySQL: """
+
+_QUOTED = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"(?<![\w`])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """
+    Statement shape with literals and placeholders collapsed, so every IN list
+    and VALUES batch of the same query shares one label.
+
+        fingerprint("SELECT * FROM Games WHERE id IN (%s, %s)")
+        -> "SELECT * FROM Games WHERE id IN (...)"
+    """
+    text = sql.replace("%s", "?")
+    text = _QUOTED.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(...)", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text[:FINGERPRINT_LENGTH]
+
+
+def record_query(sql, seconds, rows=0, failed=False):
+    statement = fingerprint(sql)
+    MYSQL_QUERIES.labels(statement).inc()
+    MYSQL_QUERY_SECONDS.labels(statement).observe(seconds)
+    if rows and rows > 0:
+        MYSQL_ROWS.labels(statement).inc(rows)
+    if failed:
+        MYSQL_ERRORS.labels(statement).inc()
+    if seconds >= SLOW_QUERY_SECONDS:
+        print(f"Slow query ({seconds:.3f}s, {max(rows or 0, 0)} rows): {statement}")
+
+
+""" Dash: """
+
+
+def timed_callback(name):
+    """
+    Decorator timing a Dash callback body. Goes under @app.callback; for background
+    callbacks it runs (and records) on the server process's job thread.
+    """
+
+    def decorator(fn):
+        histogram = CALLBACK_SECONDS.labels(name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            with span(f"callback {name}"):
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    CALLBACK_ERRORS.labels(name).inc()
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def metrics_text():
+    """(body, content type) for a Prometheus scrape."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def instrument_dash(app):
+    """
+    Add /metrics to the Dash app's Flask server and time every HTTP request to it.
+    """
+    from flask import Response, g, request
+
+    server = app.server
+
+    @server.route("/metrics")
+    def metrics():
+        body, content_type = metrics_text()
+        return Response(body, content_type=content_type)
+
+    @server.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def record_request(response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            # The URL rule, not the raw path, so asset and component URLs don't explode the labels
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_SECONDS.labels(route, str(response.status_code)).observe(
+                time.perf_counter() - start
+            )
+        return response
+
+    return app
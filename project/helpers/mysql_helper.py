@@ -1,11 +1,50 @@
 import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
+from contextlib import contextmanager
 import os
+import queue
+import tempfile
+import threading
+import time
+
+from .metrics import record_query, span
+
+
+def _quote(identifier):
+    return "`" + identifier.replace("`", "``") + "`"
+
+
+def _as_records(rows):
+    """
+    Accept a list of dicts or a pandas DataFrame and return a list of dicts.
+    """
+    if hasattr(rows, "to_dict"):
+        # DataFrame NaN/NaT become None so they're written as NULL
+        rows = rows.astype(object).where(rows.notna(), None).to_dict("records")
+    return list(rows)
+
+
+def _infile_value(value):
+    """
+    Format a value in LOAD DATA's default tab-separated, backslash-escaped format.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
 
 
 class MySQLHelper:
-    def __init__(self):
+    def __init__(self, pool_size=None, pool_timeout=30):
         """
         Initialize the helper class with connection parameters.
         """
@@ -15,67 +54,362 @@ class MySQLHelper:
         self.user = os.getenv("MYSQL_ROOT_USER")
         self.password = os.getenv("MYSQL_ROOT_PASSWORD")
         self.port = 3306
-        self.connection = None
+
+        self.pool_size = int(pool_size or os.getenv("MYSQL_POOL_SIZE", "5"))
+        self.pool_timeout = pool_timeout
+        self._config = None
+        # Idle pooled connections, most recently used first; None while disconnected
+        self._idle = None
+        self._legacy_connection = None
+        self._pool_lock = threading.Lock()
+        # At most pool_size connections are checked out at once; further checkouts wait
+        self._slots = threading.BoundedSemaphore(self.pool_size)
 
     def connect(self):
         """
-        Establish a new connection to the MySQL database.
+        Open the connection pool. Safe to call more than once.
         """
-        if self.connection and self.connection.is_connected():
-            print("Connection is already open.")
-            return
-        try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                port=self.port,
-            )
-            if self.connection.is_connected():
-                print("Connected to MySQL database.")
-        except Error as e:
-            print(f"Failed to connect: {e}")
-            self.connection = None
+        with self._pool_lock:
+            if self._idle is not None:
+                print("Connection pool is already open.")
+                return
+            config = {
+                "host": self.host,
+                "database": self.database,
+                "user": self.user,
+                "password": self.password,
+                "port": self.port,
+                "autocommit": False,
+                # LOAD DATA LOCAL INFILE may only read the temp files load_data_infile writes
+                "allow_local_infile_in_path": tempfile.gettempdir(),
+            }
+            try:
+                # The first connection is opened now so an unreachable server fails fast
+                connection = mysql.connector.connect(**config)
+            except Error as e:
+                print(f"Failed to connect: {e}")
+                return
+            self._config = config
+            self._idle = queue.LifoQueue()
+            self._idle.put(connection)
+            print("Connected to MySQL database.")
 
     def close(self):
         """
-        Close the existing connection.
+        Close every idle pooled connection and drop the pool. Connections still
+        checked out are closed when their transaction ends.
         """
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("Connection closed.")
-        else:
+        with self._pool_lock:
+            idle, self._idle = self._idle, None
+            legacy, self._legacy_connection = self._legacy_connection, None
+        if idle is None:
             print("No connection to close.")
-        self.connection = None
+            return
+        while True:
+            try:
+                idle.get_nowait().close()
+            except queue.Empty:
+                break
+        if legacy is not None:
+            legacy.close()
+        print("Connection closed.")
+
+    @property
+    def is_connected(self):
+        return self._idle is not None
+
+    @property
+    def connection(self):
+        """
+        A single long-lived connection, as the helper exposed before it pooled
+        (db.connection.cursor(), db.connection.commit()); None until connect().
+        It is separate from the pool, which transaction() draws from.
+        """
+        if self._idle is None:
+            return None
+        with self._pool_lock:
+            if self._legacy_connection is None or not self._legacy_connection.is_connected():
+                self._legacy_connection = mysql.connector.connect(**self._config)
+            return self._legacy_connection
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return mysql.connector.connect(**self._config)
+
+    def _checkin(self, connection):
+        idle = self._idle
+        if idle is None:
+            # The pool was closed while this connection was checked out
+            connection.close()
+            return
+        try:
+            # Session variables and temporary tables don't leak into the next transaction
+            connection.reset_session()
+        except Error:
+            connection.close()
+            return
+        idle.put(connection)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Check out a pooled connection for the duration of a with-block.
+
+        The block runs as one transaction: it is committed when the block exits
+        normally and rolled back if it raises. Connections are pinged (and
+        reconnected if the server dropped them) before being handed out.
+        """
+        if self._idle is None:
+            raise Error(msg="No active connection. Call connect() first.")
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise Error(msg="Timed out waiting for a pooled MySQL connection.")
+        try:
+            connection = self._checkout()
+            try:
+                connection.ping(reconnect=True, attempts=3, delay=1)
+                yield connection
+                connection.commit()
+            except BaseException:
+                try:
+                    connection.rollback()
+                except Error:
+                    pass
+                raise
+            finally:
+                self._checkin(connection)
+        finally:
+            self._slots.release()
 
     def execute_query(self, query, params=None):
         """
         Execute a query and return the result.
         """
-        if not self.connection or not self.connection.is_connected():
+        if not self.is_connected:
             print("No active connection. Call connect() first.")
             return None
 
+        start = time.perf_counter()
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(query, params)
-            if cursor.description:
-                # If the query returns results, fetch them
-                results = cursor.fetchall()
+            with span("mysql query"), self.transaction() as connection:
+                cursor = connection.cursor(dictionary=True)
+                cursor.execute(query, params)
+                if cursor.description:
+                    # If the query returns results, fetch them
+                    results = cursor.fetchall()
+                    cursor.close()
+                    record_query(query, time.perf_counter() - start, len(results))
+                    return results
+                else:
+                    # Statements without results are committed when the connection is returned
+                    rows = cursor.rowcount
+                    cursor.close()
+            record_query(query, time.perf_counter() - start, rows)
+            print("Query executed successfully.")
+        except Error as e:
+            record_query(query, time.perf_counter() - start, failed=True)
+            print(f"Failed to execute query: {e}")
+            return None
+
+    """ Streaming and Columnar Reads: """
+
+    def stream_batches(self, query, params=None, fetch_size=1000):
+        """
+        Yield (column_names, rows) chunks of up to fetch_size tuples from an
+        unbuffered cursor, so result sets of any size are read in constant memory.
+        The pooled connection is held until the generator is exhausted or closed.
+        """
+        start = time.perf_counter()
+        fetched = 0
+        failed = True
+        with self.transaction() as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query, params)
+                columns = list(cursor.column_names)
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    fetched += len(rows)
+                    yield columns, rows
+                failed = False
+            finally:
+                # Includes the time the caller spent between chunks
+                record_query(query, time.perf_counter() - start, fetched, failed=failed)
+                # An unbuffered result must be drained before the connection can be reused
+                if connection.unread_result:
+                    connection.consume_results()
                 cursor.close()
-                return results
-            else:
-                # If the query doesn't return results, commit the transaction
-                self.connection.commit()
+
+    def stream_query(self, query, params=None, fetch_size=1000):
+        """
+        Generator over result rows as dicts, fetched fetch_size at a time.
+        """
+        for columns, rows in self.stream_batches(query, params, fetch_size):
+            for row in rows:
+                yield dict(zip(columns, row))
+
+    def query_dataframe(self, query, params=None, fetch_size=10000):
+        """
+        Run a query straight into a pandas DataFrame, skipping the per-row dict step.
+        """
+        import pandas as pd
+
+        columns, records = None, []
+        for columns, rows in self.stream_batches(query, params, fetch_size):
+            records.extend(rows)
+        if columns is None:
+            return pd.DataFrame()
+        return pd.DataFrame.from_records(records, columns=columns)
+
+    def query_dataframe_chunks(self, query, params=None, fetch_size=10000):
+        """
+        Yield one DataFrame per fetch_size rows, for analyses that can work chunk by chunk.
+        """
+        import pandas as pd
+
+        for columns, rows in self.stream_batches(query, params, fetch_size):
+            yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def query_arrow(self, query, params=None, fetch_size=10000):
+        """
+        Run a query into a pyarrow Table, converting each fetched chunk to columns as it arrives.
+        """
+        import pyarrow as pa
+
+        tables = []
+        for columns, rows in self.stream_batches(query, params, fetch_size):
+            tables.append(
+                pa.Table.from_arrays(
+                    [pa.array(values) for values in zip(*rows)], names=columns
+                )
+            )
+        if not tables:
+            return pa.table({})
+        # Chunks that were entirely NULL in a column get promoted to that column's type
+        return pa.concat_tables(tables, promote_options="default")
+
+    """ Bulk Writes: """
+
+    def _write_batches(self, sql, columns, rows, batch_size):
+        """
+        executemany sql over rows in chunks of batch_size, one transaction per chunk.
+        Returns the number of rows written, or None if a batch failed.
+        """
+        if not self.is_connected:
+            print("No active connection. Call connect() first.")
+            return None
+
+        written = 0
+        for start in range(0, len(rows), batch_size):
+            batch = [
+                tuple(row.get(column) for column in columns)
+                for row in rows[start : start + batch_size]
+            ]
+            started = time.perf_counter()
+            try:
+                with span("mysql write batch"), self.transaction() as connection:
+                    cursor = connection.cursor()
+                    cursor.executemany(sql, batch)
+                    cursor.close()
+            except Error as e:
+                record_query(sql, time.perf_counter() - started, failed=True)
+                print(f"Failed to write batch starting at row {start}: {e}")
+                return None
+            record_query(sql, time.perf_counter() - started, len(batch))
+            written += len(batch)
+        return written
+
+    def bulk_insert(self, table, rows, columns=None, batch_size=1000, ignore=False):
+        """
+        Insert a list of dicts (or a DataFrame) into table in multi-row batches.
+        With ignore=True rows that collide with an existing key are skipped.
+        """
+        rows = _as_records(rows)
+        if not rows:
+            return 0
+        columns = columns or list(rows[0])
+        sql = (
+            f"INSERT {'IGNORE ' if ignore else ''}INTO {_quote(table)} "
+            f"({', '.join(_quote(c) for c in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+        written = self._write_batches(sql, columns, rows, batch_size)
+        if written is not None:
+            print(f"Inserted {written} rows into {table}.")
+        return written
+
+    def upsert(self, table, rows, update_columns=None, columns=None, batch_size=1000):
+        """
+        INSERT ... ON DUPLICATE KEY UPDATE a list of dicts (or a DataFrame) in batches.
+        update_columns defaults to every inserted column; pass [] to leave existing rows untouched.
+        """
+        rows = _as_records(rows)
+        if not rows:
+            return 0
+        columns = columns or list(rows[0])
+        update_columns = columns if update_columns is None else update_columns
+        # Updating a column to itself is a no-op that still satisfies the syntax
+        assignments = [f"{_quote(c)} = VALUES({_quote(c)})" for c in update_columns] or [
+            f"{_quote(columns[0])} = {_quote(columns[0])}"
+        ]
+        sql = (
+            f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON DUPLICATE KEY UPDATE {', '.join(assignments)}"
+        )
+        written = self._write_batches(sql, columns, rows, batch_size)
+        if written is not None:
+            print(f"Upserted {written} rows into {table}.")
+        return written
+
+    def load_data_infile(self, table, rows, columns=None, replace=False):
+        """
+        Fast path for very large loads: stream rows to a temp file and LOAD DATA LOCAL INFILE it.
+        Requires local_infile=ON on the server (see docker-compose.yml).
+        """
+        rows = _as_records(rows)
+        if not rows:
+            return 0
+        if not self.is_connected:
+            print("No active connection. Call connect() first.")
+            return None
+        columns = columns or list(rows[0])
+
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".tsv", encoding="utf-8", newline="\n", delete=False
+        ) as f:
+            for row in rows:
+                f.write("\t".join(_infile_value(row.get(c)) for c in columns) + "\n")
+            path = f.name
+
+        sql = (
+            f"LOAD DATA LOCAL INFILE %s {'REPLACE' if replace else 'IGNORE'} "
+            f"INTO TABLE {_quote(table)} CHARACTER SET utf8mb4 "
+            f"({', '.join(_quote(c) for c in columns)})"
+        )
+        start = time.perf_counter()
+        try:
+            with span("mysql load data"), self.transaction() as connection:
+                cursor = connection.cursor()
+                cursor.execute(sql, (path,))
+                loaded = cursor.rowcount
                 cursor.close()
-                print("Query executed successfully.")
+            record_query(sql, time.perf_counter() - start, loaded)
+            print(f"Loaded {loaded} rows into {table}.")
+            return loaded
         except Error as e:
-            print(f"Failed to execute query: {e}")
+            record_query(sql, time.perf_counter() - start, failed=True)
+            print(f"Failed to load data into {table}: {e}")
             return None
+        finally:
+            os.remove(path)
 
     def __del__(self):
         """
         Destructor to ensure the connection is closed when the object is deleted.
         """
-        self.close()
+        if self.is_connected:
+            self.close()
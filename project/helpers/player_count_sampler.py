@@ -0,0 +1,263 @@
+"""
+Player-count time series: periodic sampling, rollups and retention.
+
+Raw samples go into PlayerCountSamples, which is range-partitioned by day so
+old data is dropped a partition at a time instead of with large DELETEs.
+PlayerCountRollups holds 5-minute, hourly and daily min/max/avg per app; each
+level is rebuilt from the one below it, so rollups stay correct after the raw
+samples they came from have been dropped. Charts read rollups through
+player_count_series(), which picks the finest level that fits max_points.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from .ingestion import game_stub_row
+
+SAMPLES_TABLE = "PlayerCountSamples"
+ROLLUPS_TABLE = "PlayerCountRollups"
+FUTURE_PARTITION = "p_future"
+
+# bucket -> (width, SQL truncating `ts` to the bucket start, source level).
+# Plain date arithmetic keeps % out of these statements: the connector only substitutes
+# %s and sends any other % to MySQL as written (it never turns %% back into %).
+ROLLUP_LEVELS = {
+    "5m": (
+        timedelta(minutes=5),
+        "{ts} - INTERVAL (MOD(MINUTE({ts}), 5) * 60 + SECOND({ts})) SECOND",
+        None,
+    ),
+    "1h": (timedelta(hours=1), "{ts} - INTERVAL (MINUTE({ts}) * 60 + SECOND({ts})) SECOND", "5m"),
+    "1d": (timedelta(days=1), "DATE({ts})", "1h"),
+}
+
+# How long each level is kept; None keeps it forever
+DEFAULT_RETENTION = {
+    "raw": timedelta(days=7),
+    "5m": timedelta(days=30),
+    "1h": timedelta(days=365),
+    "1d": None,
+}
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def _floor(moment, width):
+    if width >= timedelta(days=1):
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    seconds = int(width.total_seconds())
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    offset = int((moment - midnight).total_seconds()) // seconds * seconds
+    return midnight + timedelta(seconds=offset)
+
+
+def player_count_series(db, app_id, start, end, max_points=500):
+    """
+    Rows of (bucket_start, min_count, max_count, avg_count) for app_id between
+    start and end, from the finest rollup level that needs at most max_points rows.
+    """
+    for bucket, (width, _, _) in ROLLUP_LEVELS.items():
+        if (end - start) / width <= max_points:
+            break
+    return db.execute_query(
+        f"SELECT bucket_start, min_count, max_count, avg_count FROM {ROLLUPS_TABLE}"
+        " WHERE app_id = %s AND bucket = %s AND bucket_start >= %s AND bucket_start < %s"
+        " ORDER BY bucket_start",
+        (app_id, bucket, _floor(start, width), end),
+    )
+
+
+class PlayerCountSampler:
+    """
+    Poll GetNumberOfCurrentPlayers for a tracked set of apps every interval seconds.
+
+        sampler = PlayerCountSampler(APIHelper(priority=BULK, cache=False), db, [440, 570, 730])
+        sampler.run()
+
+    The API helper must be built with cache=False: its response cache keeps player
+    counts for a minute and serves them stale while revalidating, so cached samples
+    would be up to two minutes old and repeat across rounds.
+    """
+
+    def __init__(
+        self,
+        api,
+        db,
+        app_ids,
+        interval=300,
+        workers=16,
+        retention=None,
+        partitions_ahead=3,
+    ):
+        if getattr(api, "cache", None) is not None:
+            raise ValueError("PlayerCountSampler needs an API helper built with cache=False")
+        self.api = api
+        self.db = db
+        self.app_ids = [int(a) for a in app_ids]
+        self.interval = interval
+        self.workers = workers
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.partitions_ahead = partitions_ahead
+        self._stop = threading.Event()
+        self._games_ensured = False
+
+    """ Sampling: """
+
+    def _sample_app(self, app_id):
+        result = self.api.getGamePlayerCount(app_id=app_id)
+        if isinstance(result, dict):
+            return {"app_id": app_id, "player_count": int(result["current_player_count"])}
+        return None
+
+    def sample_once(self, sampled_at=None):
+        """
+        Fetch every tracked app concurrently and store the counts under one timestamp.
+        Returns the number of samples written.
+        """
+        sampled_at = sampled_at or _utcnow()
+        if not self._games_ensured:
+            # Rollups reference Games, so make sure every tracked app has at least a stub row
+            self._games_ensured = (
+                self.db.upsert("Games", [game_stub_row(a) for a in self.app_ids], update_columns=[])
+                is not None
+            )
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sampler") as pool:
+            results = [row for row in pool.map(self._sample_app, self.app_ids) if row]
+        for row in results:
+            row["sampled_at"] = sampled_at
+        # IGNORE: a second sample for the same app and second adds nothing
+        written = self.db.bulk_insert(SAMPLES_TABLE, results, ignore=True)
+        return written or 0
+
+    """ Rollups: """
+
+    def rollup(self, since, until=None):
+        """
+        Rebuild every rollup bucket overlapping [since, until), finest level first.
+        Buckets are recomputed from their source rather than incremented, so
+        re-running a window is harmless.
+        """
+        until = until or _utcnow() + timedelta(seconds=1)
+        for bucket, (width, truncate, source) in ROLLUP_LEVELS.items():
+            start = _floor(since, width)
+            if source is None:
+                bucket_start = truncate.format(ts="sampled_at")
+                select = (
+                    f"SELECT app_id, %s, {bucket_start},"
+                    " MIN(player_count), MAX(player_count), SUM(player_count), COUNT(*)"
+                    f" FROM {SAMPLES_TABLE} WHERE sampled_at >= %s AND sampled_at < %s"
+                    f" GROUP BY app_id, {bucket_start}"
+                )
+                params = (bucket, start, until)
+            else:
+                bucket_start = truncate.format(ts="bucket_start")
+                select = (
+                    f"SELECT app_id, %s, {bucket_start},"
+                    " MIN(min_count), MAX(max_count), SUM(sum_count), SUM(samples)"
+                    f" FROM {ROLLUPS_TABLE}"
+                    " WHERE bucket = %s AND bucket_start >= %s AND bucket_start < %s"
+                    f" GROUP BY app_id, {bucket_start}"
+                )
+                params = (bucket, source, start, until)
+            self.db.execute_query(
+                f"INSERT INTO {ROLLUPS_TABLE}"
+                " (app_id, bucket, bucket_start, min_count, max_count, sum_count, samples)"
+                f" {select}"
+                " ON DUPLICATE KEY UPDATE min_count = VALUES(min_count),"
+                " max_count = VALUES(max_count), sum_count = VALUES(sum_count),"
+                " samples = VALUES(samples)",
+                params,
+            )
+
+    """ Partitions and Retention: """
+
+    def _partitions(self):
+        rows = self.db.execute_query(
+            "SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS upper_bound"
+            " FROM INFORMATION_SCHEMA.PARTITIONS"
+            " WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL",
+            (SAMPLES_TABLE,),
+        )
+        return {row["name"]: row["upper_bound"] for row in rows or []}
+
+    def ensure_partitions(self, today=None):
+        """
+        Split one daily partition per day off p_future, up to partitions_ahead days out.
+        p_future stays empty in normal operation, so the split is a metadata change.
+        """
+        today = (today or _utcnow()).date()
+        existing = self._partitions()
+        for offset in range(self.partitions_ahead + 1):
+            day = today + timedelta(days=offset)
+            name = f"p{day:%Y%m%d}"
+            if name in existing:
+                continue
+            self.db.execute_query(
+                f"ALTER TABLE {SAMPLES_TABLE} REORGANIZE PARTITION {FUTURE_PARTITION} INTO ("
+                f" PARTITION {name} VALUES LESS THAN (TO_DAYS('{day + timedelta(days=1)}')),"
+                f" PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE)"
+            )
+
+    def apply_retention(self, now=None):
+        """
+        Drop raw-sample partitions older than the raw retention and delete expired rollups.
+        """
+        now = now or _utcnow()
+        if self.retention["raw"] is not None:
+            cutoff = (now - self.retention["raw"]).date()
+            # A partition can go once everything below its upper bound is past the cutoff
+            cutoff_days = (self.db.execute_query("SELECT TO_DAYS(%s) AS days", (cutoff,)) or [{}])
+            cutoff_days = cutoff_days[0].get("days")
+            expired = [
+                name
+                for name, upper_bound in self._partitions().items()
+                if name != FUTURE_PARTITION
+                and cutoff_days is not None
+                and int(upper_bound) <= cutoff_days
+            ]
+            if expired:
+                self.db.execute_query(
+                    f"ALTER TABLE {SAMPLES_TABLE} DROP PARTITION {', '.join(expired)}"
+                )
+
+        for bucket in ROLLUP_LEVELS:
+            if self.retention.get(bucket) is not None:
+                self.db.execute_query(
+                    f"DELETE FROM {ROLLUPS_TABLE} WHERE bucket = %s AND bucket_start < %s",
+                    (bucket, now - self.retention[bucket]),
+                )
+
+    """ Scheduling: """
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, rounds=None, maintenance_every=12):
+        """
+        Sample on interval-aligned ticks until stop() is called (or rounds is reached).
+        Rollups follow every round; partitions and retention every maintenance_every rounds.
+        """
+        completed = 0
+        while not self._stop.is_set() and (rounds is None or completed < rounds):
+            if completed % maintenance_every == 0:
+                self.ensure_partitions()
+                self.apply_retention()
+
+            sampled_at = _utcnow()
+            started = time.monotonic()
+            written = self.sample_once(sampled_at)
+            self.rollup(sampled_at)
+            completed += 1
+            print(
+                f"Sampled {written}/{len(self.app_ids)} apps at {sampled_at:%Y-%m-%d %H:%M:%S} "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+
+            if rounds is None or completed < rounds:
+                # Align to the next multiple of interval so samples land on even bucket edges
+                self._stop.wait(self.interval - time.time() % self.interval)
+        return completed
@@ -0,0 +1,231 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+
+# Priority lanes: interactive (dashboard) requests are always served before bulk ingestion
+INTERACTIVE = 0
+BULK = 1
+
+# Endpoint name -> family whose requests share a token bucket
+ENDPOINT_FAMILIES = {
+    "storesearch": "store",
+    "appdetails": "store",
+    "SearchCommunityAjax": "community",
+}
+
+# family -> (tokens per second, burst capacity)
+DEFAULT_FAMILY_LIMITS = {
+    "webapi": (20.0, 40),
+    "store": (200 / 300, 20),  # the storefront allows roughly 200 requests per 5 minutes
+    "community": (1.0, 5),
+}
+
+# Steam Web API terms allow 100,000 calls per key per day
+DEFAULT_KEY_LIMIT = (100_000 / 86_400, 2_000)
+
+
+def endpoint_family(endpoint):
+    return ENDPOINT_FAMILIES.get(endpoint, "webapi")
+
+
+class TokenBucket:
+    """
+    Classic token bucket. Not thread-safe by itself; RateLimiter guards it with a lock.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """
+        Seconds until a token is available (0 if one is available now).
+        """
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, now, seconds):
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+
+
+class RateLimiter:
+    """
+    Shared client-side scheduler for Steam calls.
+
+    Every request takes a token from its endpoint family's bucket, and requests
+    that carry an API key also take one from that key's bucket. With several keys
+    configured, keyed requests are spread round-robin over whichever key has
+    capacity. Bulk requests wait while any interactive request is queued.
+
+    acquire() blocks the calling thread; acquire_async() yields to the event loop.
+    Both share the same buckets, so threads and coroutines can mix freely.
+    """
+
+    def __init__(self, api_keys=(), family_limits=None, key_limit=DEFAULT_KEY_LIMIT):
+        self.family_limits = {**DEFAULT_FAMILY_LIMITS, **(family_limits or {})}
+        self.key_limit = key_limit
+        self.family_buckets = {}
+        self.key_buckets = {}
+        self.api_keys = []
+        self._next_key = itertools.count()
+        self._interactive_waiting = 0
+        self._usage = {}
+        self._condition = threading.Condition()
+        for key in api_keys:
+            self.add_key(key)
+
+    def add_key(self, api_key):
+        with self._condition:
+            if api_key and api_key not in self.key_buckets:
+                self.api_keys.append(api_key)
+                self.key_buckets[api_key] = TokenBucket(*self.key_limit)
+                self._usage[api_key] = {"calls": 0, "since": time.time()}
+
+    def _family_bucket(self, family):
+        bucket = self.family_buckets.get(family)
+        if bucket is None:
+            rate, capacity = self.family_limits.get(family, self.family_limits["webapi"])
+            bucket = self.family_buckets[family] = TokenBucket(rate, capacity)
+        return bucket
+
+    def _try_acquire(self, family, priority, needs_key):
+        """
+        Take tokens if possible. Returns (granted, api_key, seconds_to_wait).
+        Must be called with the condition held.
+        """
+        if priority == BULK and self._interactive_waiting:
+            return False, None, 0.05
+
+        now = time.monotonic()
+        family_bucket = self._family_bucket(family)
+        wait = family_bucket.wait_time(now)
+        if wait > 0:
+            return False, None, wait
+        if not needs_key or not self.api_keys:
+            family_bucket.take()
+            return True, None, 0.0
+
+        start = next(self._next_key)
+        key_waits = []
+        for offset in range(len(self.api_keys)):
+            api_key = self.api_keys[(start + offset) % len(self.api_keys)]
+            key_wait = self.key_buckets[api_key].wait_time(now)
+            if key_wait == 0:
+                family_bucket.take()
+                self.key_buckets[api_key].take()
+                self._usage[api_key]["calls"] += 1
+                return True, api_key, 0.0
+            key_waits.append(key_wait)
+        return False, None, min(key_waits)
+
+    def acquire(self, endpoint, priority=INTERACTIVE, needs_key=False, timeout=None):
+        """
+        Block until the request may be sent. Returns the API key to use (or None).
+        Raises TimeoutError if no capacity frees up within timeout seconds.
+        """
+        family = endpoint_family(endpoint)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if priority == INTERACTIVE:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    granted, api_key, wait = self._try_acquire(family, priority, needs_key)
+                    if granted:
+                        return api_key
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"Rate limit wait exceeded for '{endpoint}'")
+                        wait = min(wait, remaining)
+                    self._condition.wait(wait)
+            finally:
+                if priority == INTERACTIVE:
+                    self._interactive_waiting -= 1
+                    self._condition.notify_all()
+
+    async def acquire_async(self, endpoint, priority=INTERACTIVE, needs_key=False):
+        """
+        asyncio version of acquire(); sleeps on the event loop instead of blocking it.
+        """
+        family = endpoint_family(endpoint)
+        with self._condition:
+            if priority == INTERACTIVE:
+                self._interactive_waiting += 1
+        try:
+            while True:
+                with self._condition:
+                    granted, api_key, wait = self._try_acquire(family, priority, needs_key)
+                if granted:
+                    return api_key
+                await asyncio.sleep(wait)
+        finally:
+            with self._condition:
+                if priority == INTERACTIVE:
+                    self._interactive_waiting -= 1
+                    self._condition.notify_all()
+
+    def backoff(self, endpoint, seconds, api_key=None):
+        """
+        Pause a family (and key) after Steam answered 429 despite our pacing.
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._family_bucket(endpoint_family(endpoint)).pause(now, seconds)
+            if api_key in self.key_buckets:
+                self.key_buckets[api_key].pause(now, seconds)
+
+    def usage(self):
+        """
+        Calls made per API key since the limiter started, keyed by the key's last 4 characters.
+        """
+        with self._condition:
+            return {
+                f"...{api_key[-4:]}": dict(self._usage[api_key]) for api_key in self.api_keys
+            }
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # A forked child (e.g. a gunicorn worker) can't trust locks another thread held at
+    # fork time, so it starts with a fresh limiter of its own
+    global _shared_limiter, _shared_lock
+    _shared_limiter = None
+    _shared_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def shared_rate_limiter(api_keys=()):
+    """
+    Process-wide limiter so every APIHelper/AsyncAPIHelper instance draws from the same buckets.
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+    for api_key in api_keys:
+        _shared_limiter.add_key(api_key)
+    return _shared_limiter
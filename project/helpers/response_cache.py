@@ -0,0 +1,195 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .ttl_cache import TTLCache
+
+CACHE_PATH = os.getenv("STEAM_CACHE_PATH", "data/steam_cache.sqlite3")
+
+# Seconds a response stays fresh, per endpoint
+DEFAULT_TTLS = {
+    "default": 10 * 60,
+    "GetNumberOfCurrentPlayers": 60,
+    "GetGlobalAchievementPercentagesForApp": 24 * 60 * 60,
+    "GetAppList": 24 * 60 * 60,
+    "storesearch": 60 * 60,
+    "appdetails": 24 * 60 * 60,
+    "GetNewsForApp": 15 * 60,
+    "GetUserStatsForGame": 60 * 60,
+    "GetOwnedGames": 60 * 60,
+    "ResolveVanityURL": 7 * 24 * 60 * 60,
+    "GetPlayerSummaries": 60 * 60,
+    "SearchCommunityAjax": 10 * 60,
+}
+
+
+# Params that differ between otherwise identical requests (rotating API keys, CSRF tokens)
+VOLATILE_PARAMS = ("key", "sessionid")
+
+
+def cache_key(endpoint, url, params=None):
+    """
+    Stable key for a request, ignoring volatile params so equivalent requests share entries.
+    """
+    query = "&".join(
+        f"{name}={value}"
+        for name, value in sorted((params or {}).items())
+        if name not in VOLATILE_PARAMS
+    )
+    return f"{endpoint}|{url}?{query}"
+
+
+class ResponseCache:
+    """
+    Two-tier cache for Steam responses: a bounded in-process LRU in front of a
+    SQLite file that survives restarts and is shared by every process using it.
+
+    Entries are fresh for their endpoint's TTL and may then be served stale for
+    another stale_factor * TTL while a background refresh runs. Concurrent misses
+    for the same key are coalesced into a single upstream call.
+    """
+
+    def __init__(self, path=CACHE_PATH, memory_size=2048, ttls=None, stale_factor=1.0):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.stale_factor = stale_factor
+        self.memory = TTLCache(max_size=memory_size)
+        self.metrics = Counter()
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db().execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " fresh_until REAL NOT NULL, stale_until REAL NOT NULL)"
+            )
+
+    def _db(self):
+        """
+        One SQLite connection per thread; WAL lets several processes read while one writes.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
+
+    """ Lookups: """
+
+    def _lookup(self, key):
+        """
+        Return (value, fresh_until, stale_until) from memory, then disk, or None.
+        """
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._count("memory_hits")
+            return entry
+        if not self.path:
+            return None
+
+        row = self._db().execute(
+            "SELECT value, fresh_until, stale_until FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[2] <= time.time():
+            return None
+        entry = (json.loads(row[0]), row[1], row[2])
+        self.memory.set(key, entry, ttl=row[2] - time.time())
+        self._count("disk_hits")
+        return entry
+
+    def _store(self, endpoint, key, value):
+        ttl = self.ttls.get(endpoint, self.ttls["default"])
+        now = time.time()
+        entry = (value, now + ttl, now + ttl * (1 + self.stale_factor))
+        self.memory.set(key, entry, ttl=entry[2] - now)
+        if self.path:
+            self._db().execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), entry[1], entry[2]),
+            )
+
+    def _fetch_coalesced(self, endpoint, key, fetch):
+        """
+        Run fetch once per key no matter how many callers miss at the same time.
+        fetch returns (value, cacheable); only cacheable values are stored.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            self._count("coalesced")
+            return future.result()
+
+        try:
+            self._count("upstream_calls")
+            value, cacheable = fetch()
+            if cacheable:
+                self._store(endpoint, key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            self._count("errors")
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _revalidate(self, endpoint, key, fetch):
+        with self._lock:
+            if key in self._in_flight:
+                return
+        self._refresher.submit(self._fetch_coalesced, endpoint, key, fetch).add_done_callback(
+            lambda done: done.exception()  # Failed refreshes keep serving the stale value
+        )
+
+    def get_or_fetch(self, endpoint, key, fetch):
+        entry = self._lookup(key)
+        if entry is None:
+            self._count("misses")
+            return self._fetch_coalesced(endpoint, key, fetch)
+
+        value, fresh_until, _ = entry
+        if fresh_until <= time.time():
+            self._count("stale_hits")
+            self._revalidate(endpoint, key, fetch)
+        return value
+
+    """ Maintenance and Metrics: """
+
+    def invalidate(self, key):
+        self.memory.pop(key)
+        if self.path:
+            self._db().execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        if self.path:
+            self._db().execute("DELETE FROM responses WHERE stale_until <= ?", (time.time(),))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.metrics)
+        hits = stats.get("memory_hits", 0) + stats.get("disk_hits", 0)
+        lookups = hits + stats.get("misses", 0)
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        return stats
@@ -0,0 +1,122 @@
+"""
+Server-side paging, sorting and filtering for dash_table.DataTable results.
+
+A search callback stores its full result list once with ResultPages.store()
+and hands the browser only the returned key; the table's page callback then
+calls ResultPages.page() to filter, sort and slice the stored rows, so each
+response carries a single page no matter how long the list is.
+"""
+
+import math
+import uuid
+
+# DataTable filter_query operators, longest first so "<=" wins over "<"
+FILTER_OPERATORS = (
+    ("ge ", ">="),
+    ("le ", "<="),
+    ("lt ", "<"),
+    ("gt ", ">"),
+    ("ne ", "!="),
+    ("eq ", "="),
+    ("contains ",),
+    ("datestartswith ",),
+)
+
+
+def split_filter_part(filter_part):
+    """
+    Parse one "{column} op value" clause of a DataTable filter_query into
+    (column, operator, value); returns (None, None, None) if it can't be parsed.
+    """
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find("{") + 1 : name_part.rfind("}")]
+
+                value_part = value_part.strip()
+                if value_part and value_part[0] == value_part[-1] and value_part[0] in "'\"`":
+                    value = value_part[1:-1].replace("\\" + value_part[0], value_part[0])
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                # Symbols (">=") are normalized to their word form ("ge")
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+
+def _matches(cell, operator, value):
+    if cell is None:
+        return False
+    if operator in ("contains", "datestartswith"):
+        if operator == "contains":
+            return str(value).lower() in str(cell).lower()
+        return str(cell).startswith(str(value))
+    if isinstance(value, float) and not isinstance(cell, (int, float)):
+        try:
+            cell = float(cell)
+        except ValueError:
+            return False
+    try:
+        return {
+            "eq": cell == value,
+            "ne": cell != value,
+            "lt": cell < value,
+            "le": cell <= value,
+            "gt": cell > value,
+            "ge": cell >= value,
+        }[operator]
+    except TypeError:
+        # Comparing text with a number; treat as no match
+        return False
+
+
+def filter_rows(rows, filter_query):
+    for filter_part in (filter_query or "").split(" && "):
+        column, operator, value = split_filter_part(filter_part)
+        if column is None:
+            continue
+        rows = [row for row in rows if _matches(row.get(column), operator, value)]
+    return rows
+
+
+def sort_rows(rows, sort_by):
+    # Apply the least significant sort first; Python's sort is stable
+    for sort in reversed(sort_by or []):
+        column = sort["column_id"]
+        present = [row for row in rows if row.get(column) is not None]
+        missing = [row for row in rows if row.get(column) is None]
+        present.sort(key=lambda row: row[column], reverse=sort["direction"] == "desc")
+        rows = present + missing
+    return rows
+
+
+class ResultPages:
+    """
+    Result lists kept in a diskcache.Cache (shared by every server process).
+    """
+
+    def __init__(self, cache, ttl=30 * 60):
+        self.cache = cache
+        self.ttl = ttl
+
+    def store(self, rows):
+        key = f"results:{uuid.uuid4().hex}"
+        self.cache.set(key, list(rows), expire=self.ttl)
+        return key
+
+    def page(self, key, page_current=0, page_size=25, sort_by=None, filter_query=None):
+        """
+        (rows on the requested page, page count) for the stored list, or ([], 1) once it expired.
+        """
+        rows = self.cache.get(key) if key else None
+        if rows is None:
+            return [], 1
+        rows = sort_rows(filter_rows(rows, filter_query), sort_by)
+        page_count = max(1, math.ceil(len(rows) / page_size))
+        page_current = min(page_current or 0, page_count - 1)
+        start = page_current * page_size
+        return rows[start : start + page_size], page_count
@@ -0,0 +1,285 @@
+"""
+Database-first reads for the dashboard.
+
+ServingLayer answers the game, achievement and player-count panels from the
+steamdatabase schema when the stored rows are fresh enough (per SyncState or
+the latest player-count sample), and only otherwise calls Steam through the
+wrapped APIHelper. Whatever it fetched upstream is written back on a
+background thread so the next request for the same title is a local,
+indexed query. Every other APIHelper method passes straight through, so it
+can stand in for an APIHelper. The dashboard keeps one ServingLayer per
+server process, and JobManager.close() (gunicorn's worker_exit) waits for
+its pending write-backs.
+"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from .incremental_sync import APP_ACHIEVEMENTS, APP_DETAILS, content_hash
+from .ingestion import achievement_rows, game_stub_row, store_search_row
+from .player_count_sampler import SAMPLES_TABLE
+
+# SyncState entity type for Games rows written from storesearch results
+APP_STORE_SEARCH = "app_store_search"
+
+# Seconds a stored row is served before Steam is asked again
+DEFAULT_MAX_AGES = {
+    "games": 24 * 60 * 60,
+    "achievements": 6 * 60 * 60,
+    "player_count": 5 * 60,
+}
+
+SEARCH_LIMIT = 10
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def _store_search_item(row):
+    """
+    Games row -> the storesearch item shape the dashboard renders.
+    """
+    item = {
+        "type": row["type"],
+        "name": row["name"],
+        "id": row["id"],
+        "tiny_image": row["tiny_image"],
+        "metascore": "" if row["metascore"] is None else str(row["metascore"]),
+        "platforms": {
+            "windows": bool(row["platforms_windows"]),
+            "mac": bool(row["platforms_mac"]),
+            "linux": bool(row["platforms_linux"]),
+        },
+        "streamingvideo": bool(row["streamingvideo"]),
+        "controller_support": row["controller_support"],
+    }
+    if row["price_final"] is not None:
+        item["price"] = {
+            "currency": row["currency"],
+            "initial": row["price_initial"],
+            "final": row["price_final"],
+        }
+    return item
+
+
+class ServingLayer:
+    """
+    APIHelper front that prefers fresh local rows.
+
+        serving = ServingLayer(APIHelper(), db)
+        serving.getGameAchievementData("Portal 2")  # MySQL when fresh, Steam otherwise
+    """
+
+    def __init__(self, api, db=None, max_ages=None, write_workers=2, reconnect_interval=30):
+        self.api = api
+        self.db = db
+        # A disconnected db is retried at most this often, so an outage doesn't slow every read
+        self.reconnect_interval = reconnect_interval
+        self._next_connect = 0.0
+        self._connect_lock = threading.Lock()
+        self.max_ages = {**DEFAULT_MAX_AGES, **(max_ages or {})}
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(
+            max_workers=write_workers, thread_name_prefix="serving-write"
+        )
+
+    def __getattr__(self, name):
+        # Anything not served from the database goes straight to the APIHelper
+        if name == "api":
+            raise AttributeError(name)
+        return getattr(self.api, name)
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _db_ready(self):
+        """
+        Whether reads and write-backs can use the database. A helper that isn't connected
+        (e.g. MySQL was still starting) is reconnected lazily, once per reconnect_interval.
+        """
+        if self.db is None:
+            return False
+        if self.db.is_connected:
+            return True
+        if not self._connect_lock.acquire(blocking=False):
+            return False  # Another thread is already trying
+        try:
+            if time.monotonic() >= self._next_connect:
+                self._next_connect = time.monotonic() + self.reconnect_interval
+                self.db.connect()
+                self._count("reconnects" if self.db.is_connected else "reconnect_failures")
+        finally:
+            self._connect_lock.release()
+        return self.db.is_connected
+
+    def _fresh_since(self, kind):
+        return _utcnow() - timedelta(seconds=self.max_ages[kind])
+
+    def _is_fresh(self, entity_type, entity_id, kind):
+        rows = self.db.execute_query(
+            "SELECT 1 FROM SyncState WHERE entity_type = %s AND entity_id = %s AND fetched_at >= %s",
+            (entity_type, str(entity_id), self._fresh_since(kind)),
+        )
+        return bool(rows)
+
+    def _sync_state(self, entity_type, entity_id, payload):
+        now = _utcnow()
+        return {
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "content_hash": content_hash(payload),
+            "fetched_at": now,
+            "changed_at": now,
+        }
+
+    def _write_back(self, writes):
+        """
+        Apply [(table, rows, update_columns)] in order on the writer thread;
+        update_columns=False means a plain INSERT IGNORE.
+        """
+
+        def write():
+            for table, rows, update_columns in writes:
+                if update_columns is False:
+                    written = self.db.bulk_insert(table, rows, ignore=True)
+                else:
+                    written = self.db.upsert(table, rows, update_columns=update_columns)
+                if written is None:
+                    self._count("write_back_failures")
+                    return
+
+        if self._db_ready():
+            self._writer.submit(write)
+
+    def close(self):
+        """Wait for pending write-backs, then release the wrapped helper."""
+        self._writer.shutdown(wait=True)
+        self.api.close()
+
+    """ Games: """
+
+    def resolveAppID(self, game_title):
+        if not isinstance(game_title, str) or not game_title.strip():
+            return None
+        if self._db_ready():
+            rows = self.db.execute_query(
+                "SELECT id FROM Games WHERE name = %s LIMIT 1", (game_title,)
+            )
+            if rows:
+                return rows[0]["id"]
+        return self.api.resolveAppID(game_title)
+
+    def searchSteamApps(self, game_title):
+        """
+        Stored games whose title starts with game_title, when an exact-title row is
+        fresh; otherwise storesearch, with its results written back to Games.
+        """
+        if self._db_ready():
+            rows = self.db.execute_query(
+                "SELECT g.* FROM Games g"
+                " JOIN SyncState s ON s.entity_id = CAST(g.id AS CHAR)"
+                "  AND s.entity_type IN (%s, %s) AND s.fetched_at >= %s"
+                " WHERE g.name LIKE %s"
+                " GROUP BY g.id"
+                " ORDER BY g.name = %s DESC, CHAR_LENGTH(g.name), g.name"
+                " LIMIT %s",
+                (
+                    APP_DETAILS,
+                    APP_STORE_SEARCH,
+                    self._fresh_since("games"),
+                    game_title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",
+                    game_title,
+                    SEARCH_LIMIT,
+                ),
+            )
+            if rows and rows[0]["name"].lower() == game_title.lower():
+                self._count("games_from_db")
+                return [_store_search_item(row) for row in rows]
+
+        items = self.api.searchSteamApps(game_title)
+        self._count("games_from_api")
+        if isinstance(items, list) and items:
+            self._write_back(
+                [
+                    ("Games", [store_search_row(item) for item in items], None),
+                    (
+                        "SyncState",
+                        [
+                            self._sync_state(APP_STORE_SEARCH, item["id"], store_search_row(item))
+                            for item in items
+                        ],
+                        None,
+                    ),
+                ]
+            )
+        return items
+
+    """ Achievements and Player Counts: """
+
+    def getGameAchievementData(self, game_title=None, app_id=None):
+        if app_id is None:
+            app_id = self.resolveAppID(game_title)
+            if not app_id:
+                return f"Game '{game_title}' not found"
+
+        if self._db_ready() and self._is_fresh(APP_ACHIEVEMENTS, app_id, "achievements"):
+            rows = self.db.execute_query(
+                "SELECT name, percent FROM Achievements WHERE app_id = %s ORDER BY percent DESC",
+                (app_id,),
+            )
+            if rows is not None:
+                self._count("achievements_from_db")
+                return {"game_title": game_title, "app_id": app_id, "achievements": rows}
+
+        data = self.api.getGameAchievementData(game_title, app_id=app_id)
+        self._count("achievements_from_api")
+        if isinstance(data, dict):
+            rows = achievement_rows(app_id, data["achievements"])
+            # Same payload IncrementalSync hashes, so a later delta sync sees these as unchanged
+            payload = sorted((a["name"], round(a["percent"], 2)) for a in rows)
+            self._write_back(
+                [
+                    ("Games", [game_stub_row(app_id)], []),
+                    ("Achievements", rows, ["percent"]),
+                    ("SyncState", [self._sync_state(APP_ACHIEVEMENTS, app_id, payload)], None),
+                ]
+            )
+        return data
+
+    def getGamePlayerCount(self, game_title=None, app_id=None):
+        if app_id is None:
+            app_id = self.resolveAppID(game_title)
+            if not app_id:
+                return f"Game '{game_title}' not found"
+
+        if self._db_ready():
+            # Newest sample first along the (app_id, sampled_at) primary key
+            rows = self.db.execute_query(
+                f"SELECT player_count FROM {SAMPLES_TABLE}"
+                " WHERE app_id = %s AND sampled_at >= %s ORDER BY sampled_at DESC LIMIT 1",
+                (app_id, self._fresh_since("player_count")),
+            )
+            if rows:
+                self._count("player_counts_from_db")
+                return {
+                    "game_title": game_title,
+                    "app_id": app_id,
+                    "current_player_count": rows[0]["player_count"],
+                }
+
+        data = self.api.getGamePlayerCount(game_title, app_id=app_id)
+        self._count("player_counts_from_api")
+        if isinstance(data, dict):
+            sample = {
+                "app_id": int(app_id),
+                "sampled_at": _utcnow(),
+                "player_count": int(data["current_player_count"]),
+            }
+            self._write_back([(SAMPLES_TABLE, [sample], False)])
+        return data
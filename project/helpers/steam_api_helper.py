@@ -1,294 +1,530 @@
-import json
-import platform
+import logging
 import requests
-import pandas as pd
+import secrets
 import os
-from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
+import threading
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+# selenium, BeautifulSoup and python-dotenv are imported where they're used, so importing
+# APIHelper stays cheap for the many processes that never open a browser
+from .app_index import SteamAppIndex
+from .community_search import (
+    RESULTS_PER_PAGE,
+    SEARCH_AJAX_PATH,
+    STEAM_COMMUNITY_BASE,
+    CommunitySearchError,
+    parse_search_page,
+    search_params,
+)
+from .http_helper import (
+    DEFAULT_TIMEOUTS,
+    MAX_RETRY_AFTER,
+    THROTTLED_STATUS,
+    create_session,
+    resolve_timeout,
+)
+from .metrics import record_steam_request, response_retries, span, timed_upstream
+from .rate_limiter import INTERACTIVE, shared_rate_limiter
+from .response_cache import ResponseCache, cache_key
+from .steam_responses import (
+    ACHIEVEMENT_PERCENTAGES_PATH,
+    APP_DETAILS_PATH,
+    APP_LIST_PATH,
+    NEWS_PATH,
+    OWNED_GAMES_PATH,
+    PLAYER_COUNT_PATH,
+    PLAYER_SUMMARIES_BATCH,
+    PLAYER_SUMMARIES_PATH,
+    RESOLVE_VANITY_PATH,
+    STEAM_API_BASE,
+    STEAM_STORE_BASE,
+    STORE_SEARCH_PATH,
+    USER_STATS_PATH,
+    format_achievement_percentages,
+    format_app_details,
+    format_news,
+    format_owned_games,
+    format_player_count,
+    format_player_summaries,
+    format_user_achievements,
+    format_user_game_stats,
+    format_vanity,
+    is_cacheable,
+    non_json_error,
+    owned_games_params,
+    parse_profile_reference,
+)
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+APP_INDEX_DIR = os.getenv("STEAM_APP_INDEX_DIR", "data/app_index")
+
+
+def steam_api_keys(primary_key):
+    """STEAM_API_KEY plus any extra comma-separated keys in STEAM_API_KEYS."""
+    keys = [primary_key] + os.getenv("STEAM_API_KEYS", "").split(",")
+    return list(dict.fromkeys(key.strip() for key in keys if key and key.strip()))
+
+
+def retry_after_seconds(headers, default=30):
+    retry_after = headers.get("Retry-After", "").strip()
+    return int(retry_after) if retry_after.isdigit() else default
 
 
 class APIHelper:
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size=10,
+        max_retries=3,
+        backoff_factor=0.5,
+        timeouts=None,
+        api_base=STEAM_API_BASE,
+        store_base=STEAM_STORE_BASE,
+        community_base=STEAM_COMMUNITY_BASE,
+        app_id_ttl=6 * 60 * 60,
+        rate_limiter=None,
+        priority=INTERACTIVE,
+        cache=True,
+    ):
+        from dotenv import load_dotenv
+
         load_dotenv()
         self.steam_key = os.getenv("STEAM_API_KEY")
+        self.steam_keys = steam_api_keys(self.steam_key)
+
+        # Base URLs are configurable so the helper can be pointed at a local stub server
+        self.api_base = api_base.rstrip("/")
+        self.store_base = store_base.rstrip("/")
+        self.community_base = community_base.rstrip("/")
+
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.session = create_session(
+            pool_size=pool_size, max_retries=max_retries, backoff_factor=backoff_factor
+        )
+
+        # Memoized title -> app_id lookups so per-game calls skip the storesearch round-trip
+        self.app_id_cache = TTLCache(ttl=app_id_ttl, max_size=4096)
+        self.app_index = None
+
+        # Shared across helpers in this process; priority picks the lane (INTERACTIVE or BULK)
+        self.rate_limiter = rate_limiter or shared_rate_limiter(self.steam_keys)
+        self.priority = priority
+
+        # Pass a ResponseCache to share one, or cache=False to always go upstream
+        if isinstance(cache, ResponseCache):
+            self.cache = cache
+        else:
+            self.cache = ResponseCache() if cache else None
+
+        self.browser_pool = None
+        self._browser_pool_lock = threading.Lock()
+
+    def _get(self, endpoint, url, params=None, api_key=None):
+        """Issue a GET through the pooled session with the endpoint's timeouts, after
+        taking a rate-limit token. Keyed requests use whichever API key the limiter picks,
+        unless the caller passes api_key, which is then sent as given.
+        A 429 pauses the limiter; the request is retried through it when Steam asks for
+        at most MAX_RETRY_AFTER seconds, and the 429 response is returned otherwise.
+        """
+        needs_key = api_key is None and bool(params) and "key" in params
+        if api_key is not None:
+            params = {**(params or {}), "key": api_key}
+
+        start = time.perf_counter()
+        with span(f"steam {endpoint}"):
+            for attempt in range(self.max_retries + 1):
+                picked_key = self.rate_limiter.acquire(endpoint, self.priority, needs_key)
+                if picked_key:
+                    api_key = picked_key
+                    params = {**params, "key": api_key}
+                try:
+                    response = self.session.get(
+                        url, params=params, timeout=resolve_timeout(self.timeouts, endpoint)
+                    )
+                except requests.exceptions.RequestException:
+                    record_steam_request(endpoint, "error", time.perf_counter() - start)
+                    raise
+                if response.status_code != THROTTLED_STATUS:
+                    break
+                wait = retry_after_seconds(
+                    response.headers, default=self.backoff_factor * 2**attempt
+                )
+                self.rate_limiter.backoff(endpoint, wait, api_key)
+                if wait > MAX_RETRY_AFTER:
+                    break
+
+        record_steam_request(
+            endpoint,
+            response.status_code,
+            time.perf_counter() - start,
+            len(response.content),
+            response_retries(response) + attempt,
+        )
+        return response
+
+    def _getJSON(self, endpoint, url, params=None, raise_for_status=False, api_key=None):
+        """Parsed JSON for a GET, served from the response cache when possible.
+        Only 200 responses whose payload passes the endpoint's is_cacheable check are
+        cached; HTTP and JSON errors propagate as from _get.
+        """
+
+        def fetch():
+            response = self._get(endpoint, url, params, api_key=api_key)
+            if raise_for_status:
+                response.raise_for_status()
+            data = response.json()
+            return data, response.status_code == 200 and is_cacheable(endpoint, data)
+
+        if self.cache is None:
+            return fetch()[0]
+        return self.cache.get_or_fetch(endpoint, cache_key(endpoint, url, params), fetch)
+
+    def close(self):
+        """Release the pooled connections and browsers held by this helper."""
+        self.session.close()
+        if self.browser_pool is not None:
+            self.browser_pool.close()
 
     """ Functions for general steam searching, by game and for all games:"""
 
     def getAllSteamApps(self):
-        url = "https://api.steampowered.com/ISteamApps/GetAppList/v2/"
-        response = requests.get(url)
-        data = response.json()
+        data = self._getJSON("GetAppList", f"{self.api_base}{APP_LIST_PATH}")
         return data["applist"]["apps"]
 
     def searchSteamApps(self, game_title):
-        url = f"https://store.steampowered.com/api/storesearch/?term={game_title}&l=english&cc=us"
-        response = requests.get(url)
-        data = response.json()
-        return data["items"]
+        params = {"term": game_title, "l": "english", "cc": "us"}
+        data = self._getJSON(
+            "storesearch", f"{self.store_base}{STORE_SEARCH_PATH}", params=params
+        )
+        items = data["items"]
+        if items:
+            self.app_id_cache.set(self._normalizeTitle(game_title), items[0]["id"])
+        return items
+
+    def resolveAppID(self, game_title):
+        """Resolve a game title to an app id, or None. An exact name match in the local
+        app index wins; otherwise the best storesearch match is used. Answers are
+        memoized for app_id_ttl seconds so repeated lookups stay local. A missing or
+        blank title resolves to None without any lookup.
+        """
+        if not isinstance(game_title, str) or not game_title.strip():
+            return None
 
-    """ Functions to Gather data from Steam API About a Given Game: """
+        app_id = self.app_id_cache.get(self._normalizeTitle(game_title))
+        if app_id is not None:
+            return app_id
+
+        if self.app_index is not None:
+            matches = self.app_index.find_exact(game_title)
+            if matches:
+                self.app_id_cache.set(self._normalizeTitle(game_title), matches[0]["id"])
+                return matches[0]["id"]
 
-    def getGamePlayerCount(self, game_title):
         game = self.searchSteamApps(game_title)
         if not game:
-            return f"Game '{game_title}' not found"
-        app_id = game[0]["id"]
+            return None
+        return game[0]["id"]
+
+    """ Functions for the Local (Offline) Steam App Index: """
+
+    def loadAppIndex(self, path=APP_INDEX_DIR, max_age=24 * 60 * 60, refresh=True):
+        """Load the persisted app index, building it on first use and diff-applying
+        a fresh GetAppList payload once it is older than max_age seconds.
+        """
         try:
-            player_count_url = f"https://api.steampowered.com/ISteamUserStats/GetNumberOfCurrentPlayers/v1/?appid={app_id}"
-            player_count_response = requests.get(player_count_url)
-            player_count_data = player_count_response.json()
-
-            if (
-                "response" in player_count_data
-                and "player_count" in player_count_data["response"]
-            ):
-                player_count = player_count_data["response"]["player_count"]
-                return {
-                    "game_title": game_title,
-                    "app_id": app_id,
-                    "current_player_count": player_count,
-                }
-            else:
-                return f"Player count data unavailable for '{game_title}'"
+            self.app_index = SteamAppIndex.load(path)
+        except (OSError, ValueError):
+            if not refresh:
+                return None
+            self.app_index = SteamAppIndex.build(path, self.getAllSteamApps())
+            return self.app_index
+
+        if refresh and self.app_index.is_stale(max_age):
+            self.refreshAppIndex()
+        return self.app_index
+
+    def refreshAppIndex(self):
+        if self.app_index is None:
+            return self.loadAppIndex()
+        return self.app_index.refresh(self.getAllSteamApps())
+
+    def searchLocalApps(self, game_title, limit=10):
+        """Search game titles against the local app index without touching the network."""
+        if self.app_index is None:
+            return []
+        return self.app_index.search(game_title, limit=limit)
+
+    """ Functions to Gather data from Steam API About a Given Game: """
+
+    def getGamePlayerCount(self, game_title=None, app_id=None):
+        if app_id is None:
+            app_id = self.resolveAppID(game_title)
+            if not app_id:
+                return f"Game '{game_title}' not found"
+        try:
+            player_count_data = self._getJSON(
+                "GetNumberOfCurrentPlayers",
+                f"{self.api_base}{PLAYER_COUNT_PATH}",
+                params={"appid": app_id},
+            )
+            return format_player_count(player_count_data, game_title, app_id)
 
         except requests.exceptions.RequestException as e:
             return f"Error fetching player count for '{game_title}': {e}"
 
-    def getGameAchievementData(self, game_title):
-        game = self.searchSteamApps(game_title)
-        if not game:
-            return f"Game '{game_title}' not found"
-        app_id = game[0]["id"]
+    def getGameAchievementData(self, game_title=None, app_id=None):
+        if app_id is None:
+            app_id = self.resolveAppID(game_title)
+            if not app_id:
+                return f"Game '{game_title}' not found"
         try:
-            achievement_url = f"https://api.steampowered.com/ISteamUserStats/GetGlobalAchievementPercentagesForApp/v2/?gameid={app_id}"
-            achievement_response = requests.get(achievement_url)
-            achievement_data = achievement_response.json()
-
-            if "achievementpercentages" in achievement_data:
-                achievements = achievement_data["achievementpercentages"][
-                    "achievements"
-                ]
-                return {
-                    "game_title": game_title,
-                    "app_id": app_id,
-                    "achievements": achievements,
-                }
-            else:
-                return f"Achievement data unavailable for '{game_title}'"
+            achievement_data = self._getJSON(
+                "GetGlobalAchievementPercentagesForApp",
+                f"{self.api_base}{ACHIEVEMENT_PERCENTAGES_PATH}",
+                params={"gameid": app_id},
+            )
+            return format_achievement_percentages(achievement_data, game_title, app_id)
 
         except requests.exceptions.RequestException as e:
             return f"Error fetching achievement data for '{game_title}': {e}"
 
-    def getGameNews(self, game_title, count=5):
-        game = self.searchSteamApps(game_title)
-        if not game:
-            return f"Game '{game_title}' not found"
-        app_id = game[0]["id"]
-        if not app_id:
-            return f"Game '{game_title}' not found"
+    def getGameNews(self, game_title=None, count=5, app_id=None):
+        if app_id is None:
+            app_id = self.resolveAppID(game_title)
+            if not app_id:
+                return f"Game '{game_title}' not found"
         try:
-            news_url = f"https://api.steampowered.com/ISteamNews/GetNewsForApp/v2/?appid={app_id}&count={count}"
-            response = requests.get(news_url)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-
-            news_data = response.json()
-
-            # Check if news data is available
-            if "appnews" in news_data and "newsitems" in news_data["appnews"]:
-                news_items = news_data["appnews"]["newsitems"]
-
-                # Format the output with game title and news items
-                formatted_news = {
-                    "game_title": game_title,
-                    "app_id": app_id,
-                    "news": [
-                        {
-                            "title": item["title"],
-                            "contents": item["contents"],
-                            "url": item["url"],
-                            "date": item["date"],
-                        }
-                        for item in news_items
-                    ],
-                }
-                return formatted_news
-            else:
-                return f"No news found for game '{game_title}' with app_id '{app_id}'"
+            news_data = self._getJSON(
+                "GetNewsForApp",
+                f"{self.api_base}{NEWS_PATH}",
+                params={"appid": app_id, "count": count},
+                raise_for_status=True,
+            )
+            return format_news(news_data, game_title, app_id)
 
         except requests.exceptions.RequestException as e:
             return f"Error fetching news for game '{game_title}': {e}"
 
+    def getAppDetails(self, app_id):
+        """Storefront details (name, type, price, platforms, metacritic...) for one app."""
+        try:
+            details_data = self._getJSON(
+                "appdetails",
+                f"{self.store_base}{APP_DETAILS_PATH}",
+                params={"appids": app_id, "cc": "us", "l": "english"},
+            )
+            return format_app_details(details_data, app_id)
+
+        except requests.exceptions.RequestException as e:
+            return f"Error fetching app details for app_id '{app_id}': {e}"
+
     """ Functions Requiring Authentication and User Information: """
 
+    def _getUserStatsForGame(self, user_id, app_id):
+        return self._getJSON(
+            "GetUserStatsForGame",
+            f"{self.api_base}{USER_STATS_PATH}",
+            params={"appid": app_id, "key": self.steam_key, "steamid": user_id},
+        )
+
     def getUserAchievementStats(self, user_id, app_id, game_title):
         try:
-            stats_url = f"https://api.steampowered.com/ISteamUserStats/GetUserStatsForGame/v2/?appid={app_id}&key={self.steam_key}&steamid={user_id}"
-            stats_response = requests.get(stats_url)
-
             try:
-                stats_data = stats_response.json()
+                stats_data = self._getUserStatsForGame(user_id, app_id)
             except ValueError:
-                return (
-                    f"Error: Received non-JSON response from the API for '{game_title}'"
-                )
+                return non_json_error(game_title)
 
-            if (
-                "playerstats" in stats_data
-                and "achievements" in stats_data["playerstats"]
-            ):
-                achievements = stats_data["playerstats"]["achievements"]
-                return {
-                    "game_title": game_title,
-                    "app_id": app_id,
-                    "achievements": achievements,
-                }
-            else:
-                return f"Achievement data unavailable for '{game_title}'"
+            return format_user_achievements(stats_data, game_title, app_id)
 
         except requests.exceptions.RequestException as e:
             return f"Error fetching achievement data for '{game_title}': {e}"
 
     def getUserGameStats(self, user_id, app_id, game_title):
         try:
-            stats_url = f"https://api.steampowered.com/ISteamUserStats/GetUserStatsForGame/v2/?appid={app_id}&key={self.steam_key}&steamid={user_id}"
-            stats_response = requests.get(stats_url)
-
             # Attempt to parse JSON response
             try:
-                stats_data = stats_response.json()
+                stats_data = self._getUserStatsForGame(user_id, app_id)
             except ValueError:
-                return (
-                    f"Error: Received non-JSON response from the API for '{game_title}'"
-                )
+                return non_json_error(game_title)
 
-            player_stats = (
-                stats_data["playerstats"].get("stats", [])
-                if "playerstats" in stats_data
-                else []
-            )
+            return format_user_game_stats(stats_data, game_title, app_id)
 
-            # Assemble the result with game stats and playtime
+        except requests.exceptions.RequestException as e:
+            return f"Error fetching stats for '{game_title}': {e}"
+
+    def getUserStatsForApp(self, user_id, app_id, game_title=None):
+        """Fetch GetUserStatsForGame once and return both the stats and achievements views."""
+        try:
+            try:
+                stats_data = self._getUserStatsForGame(user_id, app_id)
+            except ValueError:
+                error = non_json_error(game_title)
+                return {"player_stats": error, "achievements": error}
             return {
-                "game_title": game_title,
-                "app_id": app_id,
-                "player_stats": player_stats,
+                "player_stats": format_user_game_stats(stats_data, game_title, app_id),
+                "achievements": format_user_achievements(stats_data, game_title, app_id),
             }
 
         except requests.exceptions.RequestException as e:
-            return f"Error fetching stats for '{game_title}': {e}"
+            error = f"Error fetching stats for '{game_title}': {e}"
+            return {"player_stats": error, "achievements": error}
 
     def getUserOwnedGames(self, user_id, include_playtime=True):
-        # Steam API endpoint for owned games
-        owned_games_url = (
-            "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
-        )
-
-        # Set up parameters
-        params = {
-            "key": self.steam_key,
-            "steamid": user_id,
-            "include_appinfo": 1,
-            "include_played_free_games": 1,
-            "include_free_sub": 1,
-            "include_playtime_forever": 1,
-        }
-
         try:
-            response = requests.get(owned_games_url, params=params)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-
-            games_data = response.json()
-
-            # Check if games data is available
-            if "response" in games_data and "games" in games_data["response"]:
-                games_list = games_data["response"]["games"]
-                return {
-                    "user_id": user_id,
-                    "owned_games": [
-                        {
-                            "app_id": game["appid"],
-                            "name": game.get("name", "Unknown Game Name"),
-                            "playtime_forever": game.get(
-                                "playtime_forever", 0
-                            ),  # in minutes
-                            "playtime_2weeks": game.get(
-                                "playtime_2weeks", 0
-                            ),  # last 2 weeks in minutes, if available
-                        }
-                        for game in games_list
-                    ],
-                }
-            else:
-                return f"No games found for user with SteamID64 '{user_id}'"
+            games_data = self._getJSON(
+                "GetOwnedGames",
+                f"{self.api_base}{OWNED_GAMES_PATH}",
+                params=owned_games_params(self.steam_key, user_id),
+                raise_for_status=True,
+            )
+            return format_owned_games(games_data, user_id)
 
         except requests.exceptions.RequestException as e:
             return f"Error fetching owned games for user '{user_id}': {e}"
 
-    def getSteamIDFromVanity(self, vanity_name, api_key):
+    def getSteamIDFromVanity(self, vanity_name, api_key=None):
+        """SteamID64 for a vanity name. api_key overrides the key the rate limiter would pick."""
+        params = {"key": self.steam_key, "vanityurl": vanity_name}
+        data = self._getJSON(
+            "ResolveVanityURL",
+            f"{self.api_base}{RESOLVE_VANITY_PATH}",
+            params=params,
+            api_key=api_key,
+        )
+        return format_vanity(data, vanity_name)
 
-        url = f"https://api.steampowered.com/ISteamUser/ResolveVanityURL/v1/"
-        params = {"key": api_key, "vanityurl": vanity_name}
-        response = requests.get(url, params=params)
-        data = response.json()
+    def getPlayerSummaries(self, steam_ids, workers=4):
+        """Profile summaries (personaname, profileurl, avatar...) for many SteamID64s,
+        fetched 100 per request. Returns {steamid: summary}; unknown ids are left out.
+        """
+        steam_ids = list(dict.fromkeys(str(steam_id) for steam_id in steam_ids))
+        chunks = [
+            steam_ids[start : start + PLAYER_SUMMARIES_BATCH]
+            for start in range(0, len(steam_ids), PLAYER_SUMMARIES_BATCH)
+        ]
 
-        # Check if the response was successful
-        if "response" in data and data["response"]["success"] == 1:
-            steamid64 = data["response"]["steamid"]
-            return steamid64
-        else:
-            return f"Could not resolve vanity URL '{vanity_name}'. Error: {data['response'].get('message', 'Unknown error')}"
+        def fetch(chunk):
+            try:
+                data = self._getJSON(
+                    "GetPlayerSummaries",
+                    f"{self.api_base}{PLAYER_SUMMARIES_PATH}",
+                    params={"key": self.steam_key, "steamids": ",".join(chunk)},
+                    raise_for_status=True,
+                )
+                return format_player_summaries(data)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.warning("Error fetching player summaries for %d users: %s", len(chunk), e)
+                return {}
+
+        summaries = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+            for chunk_summaries in executor.map(fetch, chunks):
+                summaries.update(chunk_summaries)
+        return summaries
 
     """ Functions Requiring Selenium/Novel Solutions:"""
 
-    def searchSteamDisplayNames(self, display_name):
-        """This function searches for Steam profiles based on display name using Selenium and a custom ChromeDriver. This is necessary because
-        the Steam API does not support searching by display name and uses javascript to hamper scraping ability.
+    def _browserPool(self):
+        """Create the shared headless Chrome pool on first use."""
+        from .browser_pool import BrowserPool
+
+        with self._browser_pool_lock:
+            if self.browser_pool is None:
+                self.browser_pool = BrowserPool(
+                    size=int(os.getenv("STEAM_BROWSER_POOL_SIZE", "2")),
+                    max_uses=int(os.getenv("STEAM_BROWSER_MAX_USES", "50")),
+                )
+            return self.browser_pool
+
+    def _communitySessionID(self):
+        """The community search endpoint wants a sessionid param matching the sessionid cookie."""
+        session_id = self.session.cookies.get("sessionid")
+        if session_id:
+            return session_id
+        try:
+            self._get("SearchCommunityAjax", f"{self.community_base}/")
+            session_id = self.session.cookies.get("sessionid")
+        except requests.exceptions.RequestException:
+            session_id = None
+        if not session_id:
+            # The value is only a CSRF token, so one we generate works as long as both sides match
+            session_id = secrets.token_hex(12)
+            self.session.cookies.set(
+                "sessionid", session_id, domain=self.community_base.split("://")[-1].split(":")[0]
+            )
+        return session_id
+
+    def searchSteamDisplayNamesAjax(self, display_name, max_pages=1):
+        """Search profiles by display name via the community search AJAX endpoint, without
+        a browser. Fetches up to max_pages pages of 20 results (None for every page).
+        Raises CommunitySearchError or a requests exception if the endpoint misbehaves.
         """
-        search_url = f"https://steamcommunity.com/search/users/#text={display_name}"
-
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")  # Bypass the sandbox for Chrome
-        options.add_argument(
-            "--disable-dev-shm-usage"
-        )  # Prevent crashes due to shared memory issues
-        options.add_argument(
-            "--disable-gpu"
-        )  # Disable GPU acceleration (optional but often helps)
-        options.add_argument("--remote-debugging-port=9222")  # Enable remote debugging
-        options.add_argument(
-            "--disable-software-rasterizer"
-        )  # Software rasterizer for headless environments
-        options.add_argument("--disable-extensions")  # Disable extensions for stability
-
-        current_os = platform.system()
-
-        # Initialize WebDriver with the ChromeDriver path in WSL
-
-        # if current_os == "Windows":
-        #     driver = webdriver.Chrome(
-        #         service=Service("/usr/bin/chromedriver"), options=options
-        #     )
-        # elif current_os == "Darwin":
-        #     driver = webdriver.Chrome(
-        #         service=Service("/opt/homebrew/bin/chromedriver"), options=options
-        #     )
-
-        driver = webdriver.Chrome(
-            service=Service("/usr/bin/chromedriver"), options=options
+        url = f"{self.community_base}{SEARCH_AJAX_PATH}"
+        session_id = self._communitySessionID()
+
+        results = []
+        page = 1
+        while max_pages is None or page <= max_pages:
+            data = self._getJSON(
+                "SearchCommunityAjax", url, params=search_params(display_name, session_id, page)
+            )
+            rows, total = parse_search_page(data)
+            results.extend(rows)
+            if not rows or page * RESULTS_PER_PAGE >= total:
+                break
+            page += 1
+        return results
+
+    def searchSteamDisplayNames(self, display_name, timeout=10, max_pages=1):
+        """Search for Steam profiles by display name. The lightweight AJAX search is tried
+        first; the Selenium path is only used when it fails.
+        """
+        try:
+            results = self.searchSteamDisplayNamesAjax(display_name, max_pages=max_pages)
+        except (requests.exceptions.RequestException, ValueError, CommunitySearchError):
+            return self.searchSteamDisplayNamesBrowser(display_name, timeout=timeout)
+
+        return (
+            results
+            if results
+            else f"No profiles found for display name '{display_name}'"
         )
 
-        driver.get(search_url)
+    def searchSteamDisplayNamesBrowser(self, display_name, timeout=10):
+        """This function searches for Steam profiles based on display name using Selenium and a pooled headless Chrome. This is necessary because
+        the Steam API does not support searching by display name and uses javascript to hamper scraping ability.
+        """
+        from bs4 import BeautifulSoup
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
 
-        time.sleep(5)
+        search_url = f"{self.community_base}/search/users/#text={display_name}"
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        with timed_upstream("SearchUsersBrowser"), self._browserPool().browser() as driver:
+            # Leave the previous search first; a hash-only navigation would not reload the page
+            driver.get("about:blank")
+            driver.get(search_url)
+
+            # Wait for result rows or the "no results" message instead of a fixed sleep
+            try:
+                WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                    lambda d: d.find_elements(
+                        By.CSS_SELECTOR, "div.search_row, .search_results_error"
+                    )
+                )
+            except TimeoutException:
+                pass
+
+            page_source = driver.page_source
+
+        soup = BeautifulSoup(page_source, "html.parser")
 
         # Extract profile details
         results = []
@@ -303,8 +539,6 @@ class APIHelper:
                     {"display_name": profile_name, "profile_url": profile_url}
                 )
 
-        driver.quit()
-
         return (
             results
             if results
@@ -314,14 +548,53 @@ class APIHelper:
     """ Functions Wrapping Other Functions for Ease of Use and Efficiency:"""
 
     def extractSteamID(self, steam_url):
-        potential_id = steam_url.split("id/")[1]
-        if self.isVanityURL(steam_url):
-            return self.getSteamIDFromVanity(potential_id, self.steam_key)
-        else:
-            return potential_id
+        kind, value = parse_profile_reference(steam_url)
+        if kind == "vanity":
+            return self.getSteamIDFromVanity(value)
+        if kind == "steamid":
+            return value
+        return f"Invalid Steam profile URL format: '{steam_url}'"
+
+    def resolveSteamIDs(self, references, workers=8):
+        """Map profile URLs, vanity names and SteamID64s to SteamID64s. Duplicates are
+        dropped and each distinct vanity is resolved once, concurrently; answers are kept
+        in the response cache (a week for ResolveVanityURL), so repeat runs skip Steam.
+        Returns {reference: steamid64, or an error string}.
+        """
+        parsed = {reference: parse_profile_reference(reference) for reference in references}
+        vanities = sorted({value for kind, value in parsed.values() if kind == "vanity"})
+
+        def resolve(vanity_name):
+            try:
+                return self.getSteamIDFromVanity(vanity_name)
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                return f"Error resolving vanity URL '{vanity_name}': {e}"
+
+        resolved = {}
+        if vanities:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(vanities)))) as executor:
+                resolved = dict(zip(vanities, executor.map(resolve, vanities)))
+
+        results = {}
+        for reference, (kind, value) in parsed.items():
+            if kind == "steamid":
+                results[reference] = value
+            elif kind == "vanity":
+                results[reference] = resolved[value]
+            else:
+                results[reference] = f"Invalid Steam profile reference: '{reference}'"
+        return results
 
     """ General Helper Functions: """
 
+    def cacheStats(self):
+        """Hit/miss/coalescing counters for the response cache."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    @staticmethod
+    def _normalizeTitle(game_title):
+        return " ".join(game_title.lower().split())
+
     def isVanityURL(sef, steam_url):
 
         # Pattern to check for a vanity URL
@@ -0,0 +1,228 @@
+"""
+Endpoint paths and response shaping shared by the sync and async Steam clients,
+so both return exactly the same dictionaries and error strings.
+"""
+
+import os
+import re
+
+# Overridable so the dashboard can be pointed at a local stub (see benchmarks/fake_steam.py)
+STEAM_API_BASE = os.getenv("STEAM_API_BASE", "https://api.steampowered.com")
+STEAM_STORE_BASE = os.getenv("STEAM_STORE_BASE", "https://store.steampowered.com")
+
+APP_LIST_PATH = "/ISteamApps/GetAppList/v2/"
+STORE_SEARCH_PATH = "/api/storesearch/"
+PLAYER_COUNT_PATH = "/ISteamUserStats/GetNumberOfCurrentPlayers/v1/"
+ACHIEVEMENT_PERCENTAGES_PATH = (
+    "/ISteamUserStats/GetGlobalAchievementPercentagesForApp/v2/"
+)
+NEWS_PATH = "/ISteamNews/GetNewsForApp/v2/"
+USER_STATS_PATH = "/ISteamUserStats/GetUserStatsForGame/v2/"
+OWNED_GAMES_PATH = "/IPlayerService/GetOwnedGames/v1/"
+RESOLVE_VANITY_PATH = "/ISteamUser/ResolveVanityURL/v1/"
+PLAYER_SUMMARIES_PATH = "/ISteamUser/GetPlayerSummaries/v2/"
+APP_DETAILS_PATH = "/api/appdetails/"
+
+
+# GetPlayerSummaries accepts at most this many comma-separated SteamIDs per call
+PLAYER_SUMMARIES_BATCH = 100
+
+STEAMID64_PATTERN = re.compile(r"^\d{17}$")
+VANITY_PATTERN = re.compile(r"^[\w-]{2,32}$")
+PROFILE_URL_PATTERN = re.compile(
+    r"^(?:https?://)?steamcommunity\.com/(id|profiles)/([^/?#]+)/?(?:[?#].*)?$", re.IGNORECASE
+)
+
+
+def parse_profile_reference(reference):
+    """
+    ("steamid", SteamID64) or ("vanity", name) for a profile URL, vanity name or
+    SteamID64; (None, reference) if it is none of those. Vanity names are
+    case-insensitive on Steam, so they're lowercased.
+    """
+    reference = str(reference).strip()
+    match = PROFILE_URL_PATTERN.match(reference)
+    if match:
+        kind, value = match.groups()
+        if kind.lower() == "id":
+            return "vanity", value.lower()
+        return ("steamid", value) if STEAMID64_PATTERN.match(value) else (None, reference)
+    if STEAMID64_PATTERN.match(reference):
+        return "steamid", reference
+    if VANITY_PATTERN.match(reference):
+        return "vanity", reference.lower()
+    return None, reference
+
+
+""" Cacheable Responses: """
+
+
+def _response(data):
+    return (data.get("response") or {}) if isinstance(data, dict) else {}
+
+
+# Steam reports many failures inside an HTTP 200 body, so a response is only cached
+# when its payload is a real answer for its endpoint
+VALID_RESPONSES = {
+    "GetAppList": lambda data: bool(data.get("applist", {}).get("apps")),
+    "storesearch": lambda data: "items" in data,
+    "GetNumberOfCurrentPlayers": lambda data: _response(data).get("result") == 1
+    and "player_count" in _response(data),
+    "GetGlobalAchievementPercentagesForApp": lambda data: "achievementpercentages" in data,
+    "GetNewsForApp": lambda data: bool(data.get("appnews", {}).get("newsitems")),
+    "appdetails": lambda data: any(
+        isinstance(entry, dict) and entry.get("success") for entry in data.values()
+    ),
+    "GetUserStatsForGame": lambda data: "playerstats" in data,
+    "GetOwnedGames": lambda data: "games" in _response(data),
+    "ResolveVanityURL": lambda data: _response(data).get("success") == 1,
+    "GetPlayerSummaries": lambda data: bool(_response(data).get("players")),
+    "SearchCommunityAjax": lambda data: data.get("success") == 1 and "html" in data,
+}
+
+
+def is_cacheable(endpoint, data):
+    """
+    Whether a parsed 200 response for endpoint is a successful answer worth caching.
+    """
+    if not isinstance(data, dict) or not data:
+        return False
+    valid = VALID_RESPONSES.get(endpoint)
+    return valid is None or bool(valid(data))
+
+
+def owned_games_params(steam_key, user_id):
+    return {
+        "key": steam_key,
+        "steamid": user_id,
+        "include_appinfo": 1,
+        "include_played_free_games": 1,
+        "include_free_sub": 1,
+        "include_playtime_forever": 1,
+    }
+
+
+def format_player_count(player_count_data, game_title, app_id):
+    if (
+        "response" in player_count_data
+        and "player_count" in player_count_data["response"]
+    ):
+        player_count = player_count_data["response"]["player_count"]
+        return {
+            "game_title": game_title,
+            "app_id": app_id,
+            "current_player_count": player_count,
+        }
+    else:
+        return f"Player count data unavailable for '{game_title}'"
+
+
+def format_achievement_percentages(achievement_data, game_title, app_id):
+    if "achievementpercentages" in achievement_data:
+        achievements = achievement_data["achievementpercentages"]["achievements"]
+        return {
+            "game_title": game_title,
+            "app_id": app_id,
+            "achievements": achievements,
+        }
+    else:
+        return f"Achievement data unavailable for '{game_title}'"
+
+
+def format_news(news_data, game_title, app_id):
+    # Check if news data is available
+    if "appnews" in news_data and "newsitems" in news_data["appnews"]:
+        news_items = news_data["appnews"]["newsitems"]
+
+        # Format the output with game title and news items
+        return {
+            "game_title": game_title,
+            "app_id": app_id,
+            "news": [
+                {
+                    "title": item["title"],
+                    "contents": item["contents"],
+                    "url": item["url"],
+                    "date": item["date"],
+                }
+                for item in news_items
+            ],
+        }
+    else:
+        return f"No news found for game '{game_title}' with app_id '{app_id}'"
+
+
+def format_user_achievements(stats_data, game_title, app_id):
+    if "playerstats" in stats_data and "achievements" in stats_data["playerstats"]:
+        achievements = stats_data["playerstats"]["achievements"]
+        return {
+            "game_title": game_title,
+            "app_id": app_id,
+            "achievements": achievements,
+        }
+    else:
+        return f"Achievement data unavailable for '{game_title}'"
+
+
+def format_user_game_stats(stats_data, game_title, app_id):
+    player_stats = (
+        stats_data["playerstats"].get("stats", [])
+        if "playerstats" in stats_data
+        else []
+    )
+
+    # Assemble the result with game stats and playtime
+    return {
+        "game_title": game_title,
+        "app_id": app_id,
+        "player_stats": player_stats,
+    }
+
+
+def format_owned_games(games_data, user_id):
+    # Check if games data is available
+    if "response" in games_data and "games" in games_data["response"]:
+        games_list = games_data["response"]["games"]
+        return {
+            "user_id": user_id,
+            "owned_games": [
+                {
+                    "app_id": game["appid"],
+                    "name": game.get("name", "Unknown Game Name"),
+                    "playtime_forever": game.get("playtime_forever", 0),  # in minutes
+                    "playtime_2weeks": game.get(
+                        "playtime_2weeks", 0
+                    ),  # last 2 weeks in minutes, if available
+                }
+                for game in games_list
+            ],
+        }
+    else:
+        return f"No games found for user with SteamID64 '{user_id}'"
+
+
+def format_vanity(data, vanity_name):
+    # Check if the response was successful
+    if "response" in data and data["response"]["success"] == 1:
+        return data["response"]["steamid"]
+    else:
+        return f"Could not resolve vanity URL '{vanity_name}'. Error: {data['response'].get('message', 'Unknown error')}"
+
+
+def format_player_summaries(summaries_data):
+    # Unknown SteamIDs are simply absent from the players list
+    players = (summaries_data.get("response") or {}).get("players", [])
+    return {player["steamid"]: player for player in players}
+
+
+def format_app_details(details_data, app_id):
+    # appdetails is keyed by the requested app id, as a string
+    entry = (details_data or {}).get(str(app_id)) or {}
+    if entry.get("success") and "data" in entry:
+        return entry["data"]
+    else:
+        return f"App details unavailable for app_id '{app_id}'"
+
+
+def non_json_error(game_title):
+    return f"Error: Received non-JSON response from the API for '{game_title}'"
@@ -0,0 +1,212 @@
+"""
+Command-line entry point for loading Steam data into the steamdatabase schema.
+
+    python ingest.py apps 440 570 730
+    python ingest.py apps --file app_ids.txt --workers 16
+    python ingest.py users 76561197960287930 --checkpoint data/users.jsonl
+    python ingest.py users https://steamcommunity.com/id/gabelogannewell --file cohort.txt
+    python ingest.py apps 440 --incremental
+    python ingest.py users --stale 5000 --min-age-hours 12
+    python ingest.py sample 440 570 730 --interval 300
+    python ingest.py aggregates
+    python ingest.py index --max-age-hours 24
+"""
+
+import argparse
+import json
+from datetime import timedelta
+
+from helpers.aggregates import AggregateRefresher
+from helpers.incremental_sync import IncrementalSync
+from helpers.ingestion import CHECKPOINT_PATH, IngestionError, IngestionPipeline
+from helpers.mysql_helper import MySQLHelper
+from helpers.player_count_sampler import PlayerCountSampler
+from helpers.rate_limiter import BULK
+from helpers.steam_api_helper import APP_INDEX_DIR, APIHelper
+
+
+def read_ids(args):
+    ids = list(args.ids)
+    if args.file:
+        with open(args.file) as f:
+            ids.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return ids
+
+
+def resolve_user_ids(api, references):
+    """
+    SteamID64s for profile URLs, vanity names and SteamID64s; unresolvable ones are reported.
+    """
+    steam_ids = []
+    for reference, steam_id in api.resolveSteamIDs(references).items():
+        if steam_id.isdigit():
+            steam_ids.append(steam_id)
+        else:
+            print(steam_id)
+    return list(dict.fromkeys(steam_ids))
+
+
+def connect_db():
+    db = MySQLHelper(pool_size=2)
+    db.connect()
+    if not db.is_connected:
+        raise SystemExit("Could not connect to MySQL; check the MYSQL_* settings in .env")
+    return db
+
+
+def build_pipeline(args):
+    incremental = args.incremental or args.stale
+    # Ingestion runs in the bulk lane so it never delays interactive dashboard requests.
+    # An incremental sync must see what Steam returns now, not a cached earlier payload.
+    api = APIHelper(pool_size=args.workers, priority=BULK, cache=not incremental)
+    db = connect_db()
+    if incremental:
+        pipeline = IncrementalSync(
+            api, db, workers=args.workers, batch_size=args.batch_size
+        )
+    else:
+        pipeline = IngestionPipeline(
+            api,
+            db,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            checkpoint_path=args.checkpoint,
+        )
+    refresher = None
+    if not args.skip_aggregates:
+        # Note what each committed batch touched; main() recomputes it once after the run
+        refresher = AggregateRefresher(db)
+        pipeline.on_flush(refresher.on_flush)
+    return api, db, pipeline, refresher
+
+
+def run_sampler(args, app_ids):
+    # Every sample must be a fresh read, not the helper's cached player count
+    api = APIHelper(pool_size=args.workers, priority=BULK, cache=False)
+    db = connect_db()
+    sampler = PlayerCountSampler(
+        api,
+        db,
+        app_ids,
+        interval=args.interval,
+        workers=args.workers,
+        retention={"raw": timedelta(days=args.raw_days)},
+    )
+    try:
+        sampler.run(rounds=args.rounds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+        db.close()
+
+
+def refresh_app_index(args):
+    """
+    Build the local app index, or diff-apply the current app list once it's older than max-age.
+    """
+    api = APIHelper(priority=BULK)
+    try:
+        index = api.loadAppIndex(path=args.path, max_age=args.max_age_hours * 60 * 60)
+        return {"path": args.path, "apps": len(index), "built_at": index.meta["built_at"]}
+    finally:
+        api.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load Steam data into MySQL.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (
+        ("apps", "Games, achievements and player counts for app ids"),
+        ("users", "Owned games, stats and achievements for SteamID64s"),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument(
+            "ids", nargs="*", help="App ids, or SteamID64s / vanity names / profile URLs"
+        )
+        sub.add_argument("--file", help="File with one id per line")
+        sub.add_argument("--workers", type=int, default=8)
+        sub.add_argument("--batch-size", type=int, default=1000)
+        sub.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+        sub.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only rewrite rows whose Steam data changed since the last sync",
+        )
+        sub.add_argument(
+            "--stale",
+            type=int,
+            metavar="N",
+            help="Incrementally refresh the N stored ids most in need of it",
+        )
+        sub.add_argument("--min-age-hours", type=int, default=24)
+        sub.add_argument(
+            "--skip-aggregates",
+            action="store_true",
+            help="Don't refresh the touched aggregates after the run (run 'aggregates' later)",
+        )
+
+    sub = subparsers.add_parser("sample", help="Poll player counts into the time-series tables")
+    sub.add_argument("ids", nargs="*", help="App ids to track")
+    sub.add_argument("--file", help="File with one app id per line")
+    sub.add_argument("--workers", type=int, default=16)
+    sub.add_argument("--interval", type=int, default=300, help="Seconds between samples")
+    sub.add_argument("--rounds", type=int, help="Stop after this many rounds")
+    sub.add_argument("--raw-days", type=int, default=7, help="Days of raw samples to keep")
+
+    sub = subparsers.add_parser("aggregates", help="Rebuild every materialized aggregate")
+
+    sub = subparsers.add_parser(
+        "index", help="Build or refresh the local app index used for title search"
+    )
+    sub.add_argument("--path", default=APP_INDEX_DIR)
+    sub.add_argument(
+        "--max-age-hours", type=float, default=24, help="Refresh only if older (0 to force)"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "index":
+        print(json.dumps(refresh_app_index(args), indent=2))
+        return
+
+    if args.command == "aggregates":
+        db = connect_db()
+        try:
+            print(json.dumps(AggregateRefresher(db).refresh_all(), indent=2))
+        finally:
+            db.close()
+        return
+
+    ids = read_ids(args)
+    if not ids and not getattr(args, "stale", None):
+        parser.error("No ids given")
+
+    if args.command == "sample":
+        run_sampler(args, ids)
+        return
+
+    api, db, pipeline, refresher = build_pipeline(args)
+    try:
+        if args.stale:
+            stale = pipeline.stale_apps if args.command == "apps" else pipeline.stale_users
+            ids.extend(stale(limit=args.stale, min_age_hours=args.min_age_hours))
+        if args.command == "apps":
+            stats = pipeline.ingest_apps(ids)
+        else:
+            stats = pipeline.ingest_users(resolve_user_ids(api, ids))
+    except IngestionError as e:
+        # Committed units are checkpointed, so rerunning the same command resumes
+        raise SystemExit(f"Ingestion failed: {e}")
+    finally:
+        # Also after a failed run: its committed batches still need their aggregates
+        aggregates = refresher.refresh_pending() if refresher else None
+        api.close()
+        db.close()
+    if aggregates:
+        stats["aggregates"] = aggregates
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
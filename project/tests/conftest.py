@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the app's modules the same way app.py and ingest.py do (helpers.*, benchmarks.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_steam import FakeSteamConfig, FakeSteamServer  # noqa: E402
+
+# Small payloads keep the suite fast; the benchmarks use the full-size defaults
+TEST_FAKE_STEAM = FakeSteamConfig(
+    apps=200,
+    achievements=20,
+    owned_games=30,
+    user_stats=5,
+    news_items=5,
+    news_bytes=50,
+    profiles=45,
+)
+
+
+@pytest.fixture(scope="session")
+def fake_steam():
+    """A fake Steam server (benchmarks/fake_steam.py) shared by the whole test session."""
+    with FakeSteamServer(TEST_FAKE_STEAM) as server:
+        yield server
@@ -0,0 +1,61 @@
+"""
+AggregateRefresher batches the keys ingestion touches and recomputes each once per run.
+"""
+
+from helpers.aggregates import (
+    ACHIEVEMENT_RARITY_SQL,
+    GAME_AGGREGATES_SQL,
+    USER_AGGREGATES_SQL,
+    AggregateRefresher,
+)
+
+
+class RecordingDB:
+    def __init__(self):
+        self.queries = []
+
+    def execute_query(self, query, params=None):
+        self.queries.append((query, params))
+        return []
+
+
+def refreshed_keys(db, sql):
+    prefix = sql.split("(")[0]
+    keys = []
+    for query, params in db.queries:
+        if query.startswith(prefix):
+            # Each IN list appears twice in the statement
+            keys.extend(params[: len(params) // 2])
+    return sorted(keys)
+
+
+def batch(user_id, app_ids):
+    return {
+        "UserOwnedGames": [{"user_id": user_id, "app_id": app_id} for app_id in app_ids],
+        "UserAchievementStatistics": [{"user_id": user_id, "app_id": app_ids[0]}],
+    }
+
+
+def test_flushes_only_note_keys_and_refresh_pending_recomputes_each_once():
+    db = RecordingDB()
+    refresher = AggregateRefresher(db)
+
+    # A popular game (10) shows up in every batch of a user crawl
+    for user_id in range(1, 51):
+        refresher.on_flush(batch(user_id, [10, 10 + user_id]), [])
+    assert db.queries == []
+
+    stats = refresher.refresh_pending()
+    assert stats == {"GameAggregates": 51, "UserAggregates": 50, "AchievementRarity": 1}
+    assert refreshed_keys(db, GAME_AGGREGATES_SQL) == list(range(10, 61))
+    assert refreshed_keys(db, USER_AGGREGATES_SQL) == list(range(1, 51))
+    assert refreshed_keys(db, ACHIEVEMENT_RARITY_SQL) == [10]
+
+    # Nothing is left pending for the next run
+    db.queries.clear()
+    assert refresher.refresh_pending() == {
+        "GameAggregates": 0,
+        "UserAggregates": 0,
+        "AchievementRarity": 0,
+    }
+    assert db.queries == []
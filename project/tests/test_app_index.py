@@ -0,0 +1,60 @@
+import os
+import threading
+
+from helpers.app_index import CURRENT_FILE, KEEP_GENERATIONS, SteamAppIndex
+
+
+def apps(first, last, suffix=""):
+    return [{"appid": app_id, "name": f"Game {app_id}{suffix}"} for app_id in range(first, last)]
+
+
+def test_build_and_lookup(tmp_path):
+    index = SteamAppIndex.build(
+        str(tmp_path), apps(1, 500) + [{"appid": 999, "name": "Portal 2"}]
+    )
+    assert len(index) == 500
+    assert index.find_exact("portal 2") == [{"id": 999, "name": "Portal 2"}]
+    assert index.search_prefix("Game 49", limit=3)[0]["id"] == 49
+    assert index.search_fuzzy("portl 2")[0]["id"] == 999
+
+
+def test_refresh_diff_applies_and_publishes_a_new_generation(tmp_path):
+    index = SteamAppIndex.build(str(tmp_path), apps(1, 100))
+    first_generation = index.generation
+
+    stats = index.refresh(
+        apps(2, 100) + [{"appid": 5, "name": "Renamed"}, {"appid": 200, "name": "New"}]
+    )
+    assert stats == {"added": 1, "removed": 1, "renamed": 1}
+    assert index.generation != first_generation
+    assert SteamAppIndex.load(str(tmp_path)).find_exact("renamed") == [{"id": 5, "name": "Renamed"}]
+
+    for _ in range(3):
+        index.refresh(apps(2, 100) + [{"appid": len(os.listdir(tmp_path)), "name": "More"}])
+    generations = [name for name in os.listdir(tmp_path) if name.startswith("gen-")]
+    assert len(generations) == KEEP_GENERATIONS
+    assert (tmp_path / CURRENT_FILE).read_text() in generations
+
+
+def test_readers_never_mix_generations(tmp_path):
+    index = SteamAppIndex.build(str(tmp_path), apps(1, 3000))
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                loaded = SteamAppIndex.load(str(tmp_path))
+                assert loaded.meta["count"] == len(loaded) == len(loaded.offsets) - 1
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    for size in range(2000, 3000, 100):
+        index.refresh(apps(1, size))
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert errors == []
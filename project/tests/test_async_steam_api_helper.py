@@ -0,0 +1,139 @@
+"""
+AsyncAPIHelper must return exactly what APIHelper returns for the same requests.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.bench_helpers import UNLIMITED
+from benchmarks.fake_steam import (
+    FIRST_APP_ID,
+    FIRST_STEAM_ID,
+    FakeSteamConfig,
+    FakeSteamServer,
+    app_name,
+)
+from helpers.async_steam_api_helper import AsyncAPIHelper
+from helpers.rate_limiter import RateLimiter
+from helpers.steam_api_helper import APIHelper
+
+STEAM_ID = str(FIRST_STEAM_ID + 7)
+APP_IDS = list(range(FIRST_APP_ID, FIRST_APP_ID + 12))
+
+
+def unlimited():
+    return RateLimiter(
+        family_limits={"webapi": UNLIMITED, "store": UNLIMITED, "community": UNLIMITED},
+        key_limit=UNLIMITED,
+    )
+
+
+def sync_helper(url):
+    return APIHelper(
+        api_base=url, store_base=url, community_base=url, rate_limiter=unlimited(), cache=False
+    )
+
+
+def run_async(url, calls, **kwargs):
+    async def main():
+        async with AsyncAPIHelper(
+            api_base=url, store_base=url, community_base=url, rate_limiter=unlimited(), **kwargs
+        ) as api:
+            return await calls(api)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "method, args",
+    [
+        ("searchSteamApps", (app_name(FIRST_APP_ID + 3),)),
+        ("resolveAppID", (app_name(FIRST_APP_ID + 3),)),
+        ("getGamePlayerCount", (None, FIRST_APP_ID)),
+        ("getGamePlayerCount", (app_name(FIRST_APP_ID + 5),)),
+        ("getGameAchievementData", (None, FIRST_APP_ID)),
+        ("getGameNews", (app_name(FIRST_APP_ID + 1),)),
+        ("getUserOwnedGames", (STEAM_ID,)),
+        ("getUserGameStats", (STEAM_ID, FIRST_APP_ID, "Title")),
+        ("getUserAchievementStats", (STEAM_ID, FIRST_APP_ID, "Title")),
+        ("getUserStatsForApp", (STEAM_ID, FIRST_APP_ID)),
+        ("getSteamIDFromVanity", ("somebody",)),
+        ("getPlayerSummaries", ([str(FIRST_STEAM_ID + i) for i in range(250)],)),
+        ("getAllSteamApps", ()),
+        ("getAppDetails", (FIRST_APP_ID + 2,)),
+        ("searchSteamDisplayNames", ("player",)),
+        ("searchSteamDisplayNamesAjax", ("player", None)),
+        ("extractSteamID", ("https://steamcommunity.com/id/somebody/",)),
+        ("extractSteamID", (f"https://steamcommunity.com/profiles/{STEAM_ID}",)),
+        ("extractSteamID", ("https://example.com/nobody",)),
+        (
+            "resolveSteamIDs",
+            (["somebody", "https://steamcommunity.com/id/Somebody", STEAM_ID, "not a profile!"],),
+        ),
+    ],
+)
+def test_async_matches_sync(fake_steam, method, args):
+    expected = getattr(sync_helper(fake_steam.url), method)(*args)
+    actual = run_async(fake_steam.url, lambda api: getattr(api, method)(*args))
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://steamcommunity.com/id/somebody/",
+        f"https://steamcommunity.com/profiles/{STEAM_ID}",
+        "https://example.com/nobody",
+    ],
+)
+def test_is_vanity_url_matches_sync(url):
+    expected = APIHelper(rate_limiter=unlimited(), cache=False).isVanityURL(url)
+    assert AsyncAPIHelper(rate_limiter=unlimited()).isVanityURL(url) == expected
+
+
+def test_failed_display_name_search_returns_an_error_instead_of_opening_a_browser():
+    with FakeSteamServer(FakeSteamConfig(error_rate=1.0, error_status=403)) as server:
+        result = run_async(server.url, lambda api: api.searchSteamDisplayNames("gaben"))
+    assert result.startswith("Error searching for display name 'gaben'")
+
+
+def test_unknown_game_matches_sync(fake_steam):
+    expected = sync_helper(fake_steam.url).getGameNews("no such title anywhere")
+    assert expected == "Game 'no such title anywhere' not found"
+    actual = run_async(fake_steam.url, lambda api: api.getGameNews("no such title anywhere"))
+    assert actual == expected
+
+
+def test_batch_helpers_match_per_call_sync_results(fake_steam):
+    helper = sync_helper(fake_steam.url)
+
+    async def calls(api):
+        return await asyncio.gather(
+            api.getUserStatsForApps(STEAM_ID, APP_IDS), api.getGamesData(APP_IDS[:3])
+        )
+
+    stats, games = run_async(fake_steam.url, calls)
+    assert stats == {app_id: helper.getUserStatsForApp(STEAM_ID, app_id) for app_id in APP_IDS}
+    assert games == {
+        app_id: {
+            "player_count": helper.getGamePlayerCount(app_id=app_id),
+            "achievements": helper.getGameAchievementData(app_id=app_id),
+            "news": helper.getGameNews(app_id=app_id),
+        }
+        for app_id in APP_IDS[:3]
+    }
+
+
+def test_fan_out_runs_concurrently():
+    latency = 0.1
+    with FakeSteamServer(FakeSteamConfig(apps=50, user_stats=2, latency=latency)) as server:
+        start = time.perf_counter()
+        stats = run_async(
+            server.url, lambda api: api.getUserStatsForApps(STEAM_ID, APP_IDS), max_concurrency=20
+        )
+        elapsed = time.perf_counter() - start
+    assert len(stats) == len(APP_IDS)
+    # Serially this would take len(APP_IDS) * latency
+    assert elapsed < len(APP_IDS) * latency / 2
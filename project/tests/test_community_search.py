@@ -0,0 +1,142 @@
+"""
+Parsing recorded SearchCommunityAjax responses, and falling back to the browser
+search when the AJAX endpoint doesn't give a usable answer.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+from helpers.community_search import (
+    CommunitySearchError,
+    parse_search_page,
+    parse_search_results,
+)
+from helpers.rate_limiter import RateLimiter
+from helpers.steam_api_helper import APIHelper
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "community_search")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def page(name):
+    return json.loads(fixture(name))
+
+
+@pytest.fixture(params=["lxml", "bs4"])
+def parser(request, monkeypatch):
+    if request.param == "bs4":
+        # parse_search_results falls back to BeautifulSoup when lxml can't be imported
+        monkeypatch.setitem(sys.modules, "lxml", None)
+    return request.param
+
+
+def test_parses_a_result_page(parser):
+    results, total = parse_search_page(page("page_1.json"))
+    assert total == 22
+    assert len(results) == 20
+    assert results[0] == {
+        "display_name": "Rabscuttle",
+        "profile_url": "https://steamcommunity.com/id/gabelogannewell",
+    }
+    assert results[1]["profile_url"] == "https://steamcommunity.com/profiles/76561197960287930"
+
+
+def test_decodes_entities_and_trims_names(parser):
+    results, _ = parse_search_page(page("page_2.json"))
+    assert results == [
+        {"display_name": "Gáb&en ★", "profile_url": "https://steamcommunity.com/id/ga-ben_"},
+        {
+            "display_name": "spaced   name",
+            "profile_url": "https://steamcommunity.com/profiles/76561198000000002",
+        },
+    ]
+
+
+def test_no_results_page_is_empty(parser):
+    assert parse_search_page(page("no_results.json")) == ([], 0)
+    assert parse_search_results("") == []
+
+
+@pytest.mark.parametrize("data", [{"success": 2}, {"success": 1}, [], None, "<html>"])
+def test_unusable_pages_raise(data):
+    with pytest.raises(CommunitySearchError):
+        parse_search_page(data)
+
+
+def json_response(body, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode("utf-8")
+    return response
+
+
+@pytest.fixture
+def helper(monkeypatch):
+    helper = APIHelper(
+        api_base="http://steam.invalid",
+        store_base="http://steam.invalid",
+        community_base="http://steam.invalid",
+        rate_limiter=RateLimiter(),
+        cache=False,
+    )
+    helper.session.cookies.set("sessionid", "recorded")
+    helper.pages = {}
+    helper.requested_pages = []
+    helper.browser_searches = []
+
+    def recorded_get(endpoint, url, params=None, api_key=None):
+        helper.requested_pages.append(params["page"])
+        return json_response(*helper.pages[params["page"]])
+
+    def browser_search(display_name, timeout=10):
+        helper.browser_searches.append(display_name)
+        return [{"display_name": display_name, "profile_url": "from-browser"}]
+
+    monkeypatch.setattr(helper, "_get", recorded_get)
+    monkeypatch.setattr(helper, "searchSteamDisplayNamesBrowser", browser_search)
+    return helper
+
+
+def test_ajax_search_follows_pages(helper):
+    helper.pages = {1: (fixture("page_1.json"),), 2: (fixture("page_2.json"),)}
+    results = helper.searchSteamDisplayNames("gaben", max_pages=None)
+    assert len(results) == 22
+    assert helper.requested_pages == [1, 2]
+    assert helper.browser_searches == []
+
+
+def test_ajax_search_stops_at_max_pages(helper):
+    helper.pages = {1: (fixture("page_1.json"),), 2: (fixture("page_2.json"),)}
+    assert len(helper.searchSteamDisplayNames("gaben", max_pages=1)) == 20
+    assert helper.requested_pages == [1]
+
+
+def test_no_results_does_not_open_a_browser(helper):
+    helper.pages = {1: (fixture("no_results.json"),)}
+    assert helper.searchSteamDisplayNames("qzqzqzqz") == (
+        "No profiles found for display name 'qzqzqzqz'"
+    )
+    assert helper.browser_searches == []
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        (fixture("failure.json"),),  # success != 1
+        (fixture("error_page.html"),),  # an HTML error page instead of JSON
+        (fixture("error_page.html"), 403),
+    ],
+)
+def test_unusable_ajax_answer_falls_back_to_the_browser(helper, reply):
+    helper.pages = {1: reply}
+    results = helper.searchSteamDisplayNames("gaben")
+    assert helper.browser_searches == ["gaben"]
+    assert results == [{"display_name": "gaben", "profile_url": "from-browser"}]
@@ -0,0 +1,127 @@
+"""
+APIHelper's pooled session against a local stub server that scripts its answers.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from helpers.http_helper import create_session
+from helpers.rate_limiter import RateLimiter
+from helpers.steam_api_helper import APIHelper
+
+
+class StubSteam:
+    """
+    Answers each GET with the next scripted (status, headers, delay) reply, then 200s.
+    """
+
+    def __init__(self):
+        self.replies = []
+        self.requests = 0
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.requests += 1
+                stub.client_ports.add(self.client_address[1])
+                status, headers, delay = stub.replies.pop(0) if stub.replies else (200, {}, 0)
+                time.sleep(delay)
+                body = json.dumps({"response": {"player_count": 7}}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubSteam()
+    yield server
+    server.close()
+
+
+def make_helper(url, **kwargs):
+    return APIHelper(
+        api_base=url,
+        store_base=url,
+        community_base=url,
+        rate_limiter=RateLimiter(),
+        cache=False,
+        **kwargs,
+    )
+
+
+def test_requests_reuse_one_keep_alive_connection(stub):
+    session = create_session()
+    for _ in range(5):
+        assert session.get(stub.url, timeout=5).status_code == 200
+    assert stub.requests == 5
+    assert len(stub.client_ports) == 1
+
+
+def test_5xx_is_retried_inside_the_session(stub):
+    stub.replies = [(503, {}, 0), (502, {}, 0)]
+    response = create_session(backoff_factor=0.01).get(stub.url, timeout=5)
+    assert response.status_code == 200
+    assert stub.requests == 3
+
+
+def test_retry_after_sleep_is_capped(stub):
+    stub.replies = [(503, {"Retry-After": "3600"}, 0)]
+    start = time.perf_counter()
+    response = create_session(max_retry_after=0.1).get(stub.url, timeout=5)
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 2
+
+
+def test_long_429_is_returned_and_pauses_the_limiter(stub):
+    stub.replies = [(429, {"Retry-After": "3600"}, 0)]
+    helper = make_helper(stub.url)
+    start = time.perf_counter()
+    response = helper._get("GetNumberOfCurrentPlayers", stub.url + "/players")
+    assert response.status_code == 429
+    assert stub.requests == 1
+    assert time.perf_counter() - start < 2
+    assert helper.rate_limiter.family_buckets["webapi"].paused_until > time.monotonic() + 3000
+
+
+def test_short_429_is_retried_through_the_limiter(stub):
+    stub.replies = [(429, {"Retry-After": "1"}, 0)]
+    helper = make_helper(stub.url)
+    start = time.perf_counter()
+    assert helper.getGamePlayerCount(app_id=10)["current_player_count"] == 7
+    assert stub.requests == 2
+    # The second attempt waited out the limiter's pause
+    assert time.perf_counter() - start >= 0.9
+
+
+def test_read_timeout_bounds_a_stuck_upstream(stub):
+    stub.replies = [(200, {}, 3)] * 4
+    helper = make_helper(stub.url, max_retries=0, timeouts={"default": (1, 0.2)})
+    start = time.perf_counter()
+    with pytest.raises(requests.exceptions.RequestException):
+        helper._get("GetNumberOfCurrentPlayers", stub.url + "/players")
+    assert time.perf_counter() - start < 2
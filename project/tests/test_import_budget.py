@@ -0,0 +1,23 @@
+"""
+Cold imports stay within budget and leave the scraping and dataframe stacks unloaded.
+
+Each target is imported in fresh interpreters (see benchmarks/import_budget.py).
+IMPORT_BUDGET_SCALE multiplies every budget on slow machines.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.import_budget import TARGETS, check
+
+SCALE = float(os.getenv("IMPORT_BUDGET_SCALE", "1.0"))
+
+
+@pytest.mark.parametrize(
+    "statement, budget, lazy_modules", TARGETS, ids=[target[0] for target in TARGETS]
+)
+def test_import_budget(statement, budget, lazy_modules):
+    result = check(statement, budget * SCALE, runs=3, lazy_modules=lazy_modules)
+    assert result["lazy_modules_loaded"] == []
+    assert result["min_ms"] <= result["budget_ms"], result["slowest_ms"]
@@ -0,0 +1,125 @@
+"""
+IngestionPipeline against the fake Steam server, with an in-memory stand-in for MySQLHelper.
+"""
+
+import threading
+
+import pytest
+
+from benchmarks.bench_helpers import UNLIMITED
+from benchmarks.fake_steam import FIRST_APP_ID, FIRST_STEAM_ID
+from helpers.incremental_sync import IncrementalSync
+from helpers.ingestion import NATURAL_KEYS, IngestionError, IngestionPipeline
+from helpers.rate_limiter import RateLimiter
+from helpers.steam_api_helper import APIHelper
+
+APP_IDS = list(range(FIRST_APP_ID, FIRST_APP_ID + 10))
+STEAM_IDS = [str(FIRST_STEAM_ID + i) for i in range(3)]
+
+
+class MemoryDB:
+    """The MySQLHelper methods the pipeline uses; upserts are keyed on NATURAL_KEYS."""
+
+    def __init__(self, keys=NATURAL_KEYS):
+        self.keys = keys
+        self.tables = {}
+        self.inserts = {}
+        self.lock = threading.Lock()
+
+    def execute_query(self, query, params=None):
+        return [
+            {"table_name": table, "index_name": "PRIMARY", "columns": ",".join(columns)}
+            for table, columns in self.keys.items()
+        ]
+
+    def upsert(self, table, rows, update_columns=None, columns=None, batch_size=1000):
+        with self.lock:
+            stored = self.tables.setdefault(table, {})
+            for row in rows:
+                key = tuple(row[c] for c in NATURAL_KEYS[table])
+                if key in stored and update_columns is not None:
+                    stored[key].update({c: row[c] for c in update_columns})
+                else:
+                    stored.setdefault(key, dict(row))
+        return len(rows)
+
+    def bulk_insert(self, table, rows, columns=None, batch_size=1000, ignore=False):
+        with self.lock:
+            self.inserts.setdefault(table, []).extend(rows)
+        return len(rows)
+
+
+@pytest.fixture
+def api(fake_steam):
+    helper = APIHelper(
+        api_base=fake_steam.url,
+        store_base=fake_steam.url,
+        community_base=fake_steam.url,
+        rate_limiter=RateLimiter(
+            family_limits={"webapi": UNLIMITED, "store": UNLIMITED, "community": UNLIMITED},
+            key_limit=UNLIMITED,
+        ),
+        cache=False,
+    )
+    yield helper
+    helper.close()
+
+
+def pipeline(api, db, tmp_path, **kwargs):
+    return IngestionPipeline(
+        api, db, workers=4, checkpoint_path=str(tmp_path / "checkpoint.jsonl"), **kwargs
+    )
+
+
+def test_ingest_apps_writes_every_app_and_resumes(api, tmp_path):
+    db = MemoryDB()
+    stats = pipeline(api, db, tmp_path).ingest_apps(APP_IDS)
+
+    assert stats["apps_fetched"] == len(APP_IDS)
+    assert sorted(key[0] for key in db.tables["Games"]) == APP_IDS
+    assert {key[0] for key in db.tables["Achievements"]} == set(APP_IDS)
+    assert len(db.inserts["PlayerCounts"]) == len(APP_IDS)
+
+    # A second run over the same checkpoint has nothing left to fetch
+    stats = pipeline(api, db, tmp_path).ingest_apps(APP_IDS)
+    assert stats["skipped"] == len(APP_IDS)
+    assert "apps_fetched" not in stats
+
+
+def test_ingest_users_fans_out_per_owned_game(api, tmp_path):
+    db = MemoryDB()
+    stats = pipeline(api, db, tmp_path).ingest_users(STEAM_IDS)
+
+    assert stats["users_fetched"] == len(STEAM_IDS)
+    assert {key[0] for key in db.tables["Users"]} == set(STEAM_IDS)
+    owned = db.tables["UserOwnedGames"]
+    assert len(owned) == stats["user_apps_fetched"]
+    # Every owned game has a Games row (real or stub) for the foreign key
+    assert {app_id for _, app_id in owned} <= {key[0] for key in db.tables["Games"]}
+
+
+def test_writer_failure_stops_the_run(api, tmp_path):
+    db = MemoryDB()
+    # A tiny queue that would block the fetchers forever if the writer's death went unnoticed
+    ingest = pipeline(api, db, tmp_path, queue_size=1, batch_size=1)
+
+    def fail(rows, units):
+        raise RuntimeError("disk full")
+
+    ingest.on_flush(fail)
+    with pytest.raises(IngestionError, match="disk full"):
+        ingest.ingest_apps(APP_IDS * 5)
+    # Nothing was committed, so nothing is checkpointed and a rerun redoes every app
+    assert not ingest.checkpoint.done
+
+
+def test_missing_natural_keys_are_refused(api, tmp_path):
+    keys = dict(NATURAL_KEYS, Achievements=("id",))
+    with pytest.raises(IngestionError, match=r"Achievements\(app_id, name\)"):
+        pipeline(api, MemoryDB(keys), tmp_path).ingest_apps(APP_IDS)
+
+
+def test_incremental_sync_rejects_a_cached_helper(api, monkeypatch):
+    monkeypatch.setattr(api, "cache", object())
+    with pytest.raises(ValueError, match="cache=False"):
+        IncrementalSync(api, MemoryDB())
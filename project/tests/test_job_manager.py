@@ -0,0 +1,150 @@
+"""
+Background jobs run on the server process's thread pool and keep per-process helpers warm.
+"""
+
+import threading
+import time
+
+import pytest
+
+from helpers.job_manager import JobManager
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    manager = JobManager(directory=str(tmp_path / "jobs"))
+    yield manager
+    manager.callback_manager.shutdown()
+    manager.cache.close()
+
+
+def job_fn(fn):
+    """The shape of the functions Dash registers: (result_key, progress_key, args, context)."""
+
+    def run(result_key, progress_key, args, context):
+        jobs, value = args
+        jobs.cache.set(result_key, fn(jobs, value))
+
+    return run
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_job_result_and_running_state(jobs):
+    manager = jobs.callback_manager
+    release = threading.Event()
+
+    def slow(jobs, value):
+        release.wait(5)
+        return value * 2
+
+    job = manager.call_job_fn("result-key", job_fn(slow), (jobs, 21), {})
+    assert manager.job_running(job)
+    assert manager.get_result("result-key", None) is manager.UNDEFINED
+
+    release.set()
+    wait_for(lambda: manager.result_ready("result-key"))
+    assert manager.get_result("result-key", job) == 42
+    wait_for(lambda: not manager.job_running(job))
+
+
+def test_cancelled_job_drops_its_result(jobs):
+    manager = jobs.callback_manager
+    started = threading.Event()
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow(jobs, value):
+        started.set()
+        release.wait(5)
+        finished.set()
+        return value
+
+    job = manager.call_job_fn("cancel-key", job_fn(slow), (jobs, "old"), {})
+    started.wait(5)
+    manager.terminate_job(job)
+    assert not manager.job_running(job)
+
+    release.set()
+    # Waits for the running job to finish
+    manager.shutdown()
+    assert finished.is_set()
+    assert not manager.result_ready("cancel-key")
+
+
+def test_job_cancelled_before_it_starts_is_skipped(jobs):
+    manager = jobs.callback_manager
+    manager.threads = 1
+    release = threading.Event()
+    ran = []
+
+    # The only job thread is busy, so the second job waits in the queue
+    manager.call_job_fn("busy", job_fn(lambda jobs, value: release.wait(5)), (jobs, None), {})
+    queued = job_fn(lambda jobs, value: ran.append(value))
+    job = manager.call_job_fn("queued", queued, (jobs, 1), {})
+    manager.terminate_job(job)
+
+    release.set()
+    manager.shutdown()
+    assert ran == []
+    assert not manager.result_ready("queued")
+
+
+def test_jobs_share_per_process_objects(jobs):
+    manager = jobs.callback_manager
+    built = []
+
+    def helper(jobs, value):
+        return id(jobs.per_process("helper", lambda: built.append(1) or object()))
+
+    keys = [f"key-{i}" for i in range(6)]
+    for key in keys:
+        manager.call_job_fn(key, job_fn(helper), (jobs, None), {})
+    for key in keys:
+        wait_for(lambda: manager.result_ready(key))
+
+    assert len({manager.get_result(key, None) for key in keys}) == 1
+    assert built == [1]
+
+
+def test_single_flight_releases_its_lock_on_error(jobs):
+    def fail():
+        raise RuntimeError("Steam is down")
+
+    with pytest.raises(RuntimeError):
+        jobs.single_flight("search", "portal", fail)
+    # A retry must not wait out the lock's expiry
+    started = time.monotonic()
+    assert jobs.single_flight("search", "portal", lambda: "ok") == "ok"
+    assert time.monotonic() - started < 1
+
+
+def test_close_waits_for_jobs_then_closes_objects_newest_first(jobs):
+    manager = jobs.callback_manager
+    closed = []
+
+    class Closeable:
+        def __init__(self, name):
+            self.name = name
+
+        def close(self):
+            closed.append(self.name)
+
+    def wrapper():
+        jobs.per_process("helper", lambda: Closeable("helper"))
+        return Closeable("wrapper")
+
+    def slow(jobs, value):
+        time.sleep(0.2)
+        return jobs.per_process("wrapper", wrapper).name
+
+    manager.call_job_fn("close-key", job_fn(slow), (jobs, None), {})
+    jobs.close()
+
+    assert manager.get_result("close-key", None) == "wrapper"
+    assert closed == ["wrapper", "helper"]
@@ -0,0 +1,97 @@
+"""
+PlayerCountSampler against the fake Steam server, with a database stand-in that records SQL.
+"""
+
+from datetime import datetime
+
+import pytest
+from mysql.connector.conversion import MySQLConverter
+from mysql.connector.cursor import RE_PY_PARAM, _ParamSubstitutor
+
+from benchmarks.bench_helpers import UNLIMITED
+from benchmarks.fake_steam import FIRST_APP_ID
+from helpers.player_count_sampler import ROLLUPS_TABLE, SAMPLES_TABLE, PlayerCountSampler
+from helpers.rate_limiter import RateLimiter
+from helpers.steam_api_helper import APIHelper
+
+APP_IDS = list(range(FIRST_APP_ID, FIRST_APP_ID + 5))
+
+
+def substituted(query, params):
+    """The statement mysql-connector sends for query and positional params."""
+    converter = MySQLConverter()
+    values = [converter.quote(converter.escape(converter.to_mysql(p))) for p in params]
+    substitute = _ParamSubstitutor(values)
+    statement = RE_PY_PARAM.sub(substitute, query.encode("utf-8")).decode("utf-8")
+    assert substitute.remaining == 0
+    return statement
+
+
+class RecordingDB:
+    def __init__(self):
+        self.queries = []
+        self.inserts = {}
+
+    def execute_query(self, query, params=None):
+        self.queries.append((query, params))
+        return []
+
+    def upsert(self, table, rows, update_columns=None, columns=None, batch_size=1000):
+        return len(rows)
+
+    def bulk_insert(self, table, rows, columns=None, batch_size=1000, ignore=False):
+        self.inserts.setdefault(table, []).extend(rows)
+        return len(rows)
+
+
+@pytest.fixture
+def api(fake_steam):
+    helper = APIHelper(
+        api_base=fake_steam.url,
+        rate_limiter=RateLimiter(family_limits={"webapi": UNLIMITED}, key_limit=UNLIMITED),
+        cache=False,
+    )
+    yield helper
+    helper.close()
+
+
+def test_rollup_statements_reach_mysql_without_stray_percent_signs(api):
+    db = RecordingDB()
+    PlayerCountSampler(api, db, APP_IDS).rollup(
+        datetime(2024, 1, 1, 12, 7), until=datetime(2024, 1, 1, 12, 8)
+    )
+
+    statements = [substituted(query, params) for query, params in db.queries]
+    assert len(statements) == 3
+    for statement in statements:
+        assert statement.startswith(f"INSERT INTO {ROLLUPS_TABLE}")
+        assert "%" not in statement
+
+    five_minutes, hourly, daily = statements
+    assert (
+        "sampled_at - INTERVAL (MOD(MINUTE(sampled_at), 5) * 60 + SECOND(sampled_at)) SECOND"
+        in five_minutes
+    )
+    assert "'5m', sampled_at - INTERVAL" in five_minutes
+    assert "sampled_at >= '2024-01-01 12:05:00' AND sampled_at < '2024-01-01 12:08:00'" in (
+        five_minutes
+    )
+    assert "WHERE bucket = '5m' AND bucket_start >= '2024-01-01 12:00:00'" in hourly
+    assert "DATE(bucket_start)" in daily and "WHERE bucket = '1h'" in daily
+
+
+def test_sample_once_stores_one_row_per_app(api):
+    db = RecordingDB()
+    sampled_at = datetime(2024, 1, 1, 12, 5)
+    written = PlayerCountSampler(api, db, APP_IDS).sample_once(sampled_at)
+
+    assert written == len(APP_IDS)
+    rows = db.inserts[SAMPLES_TABLE]
+    assert sorted(row["app_id"] for row in rows) == APP_IDS
+    assert {row["sampled_at"] for row in rows} == {sampled_at}
+
+
+def test_sampler_rejects_a_cached_helper(api, monkeypatch):
+    monkeypatch.setattr(api, "cache", object())
+    with pytest.raises(ValueError, match="cache=False"):
+        PlayerCountSampler(api, RecordingDB(), APP_IDS)
@@ -0,0 +1,222 @@
+"""
+EXPLAIN-based regression test for the indexes the hot queries rely on.
+
+Copies the schema of the configured database (the MYSQL_* settings in .env) into a
+scratch database, seeds it with enough synthetic rows that the optimizer costs plans
+realistically, and checks that each query uses the expected index (and, where marked,
+is answered from the index alone without a filesort). Skipped when MySQL isn't reachable.
+"""
+
+import pytest
+
+from helpers.mysql_helper import MySQLHelper
+
+SCRATCH_DATABASE = "steamdatabase_plancheck"
+TABLES = (
+    "Games",
+    "Achievements",
+    "Users",
+    "UserOwnedGames",
+    "UserGameStatistics",
+    "UserAchievementStatistics",
+    "PlayerCountRollups",
+    "SyncState",
+)
+USER_ID = 76561197960265728
+APP_ID = 1000
+
+# (description, query, params, table, expected key, must be covering and filesort-free)
+CHECKS = (
+    (
+        "a user's library",
+        "SELECT app_id, playtime_forever, playtime_2weeks FROM UserOwnedGames WHERE user_id = %s",
+        (USER_ID,),
+        "UserOwnedGames",
+        "PRIMARY",
+        False,
+    ),
+    (
+        "a user's stats for one game",
+        "SELECT stat_name, stat_value FROM UserGameStatistics WHERE user_id = %s AND app_id = %s",
+        (USER_ID, APP_ID),
+        "UserGameStatistics",
+        "PRIMARY",
+        False,
+    ),
+    (
+        "a user's achievements for one game",
+        "SELECT achievement_name, achieved FROM UserAchievementStatistics"
+        " WHERE user_id = %s AND app_id = %s",
+        (USER_ID, APP_ID),
+        "UserAchievementStatistics",
+        "PRIMARY",
+        False,
+    ),
+    (
+        "a game's global achievements",
+        "SELECT name, percent FROM Achievements WHERE app_id = %s",
+        (APP_ID,),
+        "Achievements",
+        "PRIMARY",
+        False,
+    ),
+    (
+        "a game's top players by playtime",
+        "SELECT user_id, playtime_forever FROM UserOwnedGames"
+        " WHERE app_id = %s ORDER BY playtime_forever DESC LIMIT 10",
+        (APP_ID,),
+        "UserOwnedGames",
+        "idx_userownedgames_app_playtime",
+        True,
+    ),
+    (
+        "a stat leaderboard for one game",
+        "SELECT user_id, stat_value FROM UserGameStatistics"
+        " WHERE app_id = %s AND stat_name = %s ORDER BY stat_value DESC LIMIT 10",
+        (APP_ID, "stat_0"),
+        "UserGameStatistics",
+        "idx_usergamestatistics_app_stat",
+        True,
+    ),
+    (
+        "achievement completion among stored users",
+        "SELECT achievement_name, AVG(achieved) FROM UserAchievementStatistics"
+        " WHERE app_id = %s GROUP BY achievement_name",
+        (APP_ID,),
+        "UserAchievementStatistics",
+        "idx_userachievementstatistics_app_achievement",
+        True,
+    ),
+    (
+        "a game by exact title",
+        "SELECT id FROM Games WHERE name = %s",
+        ("Game 1000",),
+        "Games",
+        "idx_games_name",
+        True,
+    ),
+    (
+        "player-count chart over a range",
+        "SELECT bucket_start, min_count, max_count, avg_count FROM PlayerCountRollups"
+        " WHERE app_id = %s AND bucket = %s AND bucket_start >= %s AND bucket_start < %s"
+        " ORDER BY bucket_start",
+        (APP_ID, "1h", "2024-01-01", "2024-02-01"),
+        "PlayerCountRollups",
+        "PRIMARY",
+        False,
+    ),
+    (
+        "least recently synced users",
+        "SELECT entity_id FROM SyncState WHERE entity_type = %s ORDER BY fetched_at LIMIT 100",
+        ("user_owned_games",),
+        "SyncState",
+        "idx_syncstate_fetched_at",
+        True,
+    ),
+)
+
+
+def _seed(cursor, users=200, games=2000, games_per_user=50, stats_per_game=10):
+    cursor.executemany(
+        "INSERT INTO Games (id, name) VALUES (%s, %s)",
+        [(app_id, f"Game {app_id}") for app_id in range(APP_ID, APP_ID + games)],
+    )
+    cursor.executemany(
+        "INSERT INTO Users (id) VALUES (%s)", [(USER_ID + u,) for u in range(users)]
+    )
+    cursor.executemany(
+        "INSERT INTO Achievements (app_id, name, percent) VALUES (%s, %s, %s)",
+        [
+            (app_id, f"ach_{a}", a * 7.5 % 100)
+            for app_id in range(APP_ID, APP_ID + games)
+            for a in range(stats_per_game)
+        ],
+    )
+    owned, stats, achievements = [], [], []
+    for u in range(users):
+        for g in range(games_per_user):
+            app_id = APP_ID + (u * 7 + g) % games
+            owned.append((USER_ID + u, app_id, (u * g) % 5000, g % 3 * 60))
+            if g < 5:
+                for s in range(stats_per_game):
+                    stats.append((USER_ID + u, app_id, f"stat_{s}", u * s))
+                    achievements.append((USER_ID + u, app_id, f"ach_{s}", (u + s) % 2))
+    cursor.executemany(
+        "INSERT INTO UserOwnedGames (user_id, app_id, playtime_forever, playtime_2weeks)"
+        " VALUES (%s, %s, %s, %s)",
+        owned,
+    )
+    cursor.executemany(
+        "INSERT INTO UserGameStatistics (user_id, app_id, stat_name, stat_value)"
+        " VALUES (%s, %s, %s, %s)",
+        stats,
+    )
+    cursor.executemany(
+        "INSERT INTO UserAchievementStatistics (user_id, app_id, achievement_name, achieved)"
+        " VALUES (%s, %s, %s, %s)",
+        achievements,
+    )
+    cursor.executemany(
+        "INSERT INTO PlayerCountRollups"
+        " (app_id, bucket, bucket_start, min_count, max_count, sum_count, samples)"
+        " VALUES (%s, '1h', '2024-01-01' + INTERVAL %s HOUR, 1, 2, 3, 2)",
+        [(app_id, h) for app_id in range(APP_ID, APP_ID + 20) for h in range(24 * 60)],
+    )
+    cursor.executemany(
+        "INSERT INTO SyncState (entity_type, entity_id, content_hash, fetched_at, changed_at)"
+        " VALUES ('user_owned_games', %s, REPEAT('0', 40),"
+        " '2024-01-01' + INTERVAL %s MINUTE, '2024-01-01')",
+        [(str(USER_ID + u), u) for u in range(users)],
+    )
+    for table in TABLES:
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+
+
+
+@pytest.fixture(scope="module")
+def plan_cursor():
+    db = MySQLHelper(pool_size=1)
+    db.connect()
+    if not db.is_connected:
+        pytest.skip("MySQL is not reachable; check the MYSQL_* settings in .env")
+    try:
+        with db.transaction() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT DATABASE() AS name")
+            source = cursor.fetchall()[0]["name"]
+            cursor.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DATABASE}")
+            cursor.execute(f"CREATE DATABASE {SCRATCH_DATABASE}")
+            try:
+                cursor.execute(f"USE {SCRATCH_DATABASE}")
+                for table in TABLES:
+                    cursor.execute(f"CREATE TABLE {table} LIKE {source}.{table}")
+                _seed(cursor)
+                yield cursor
+            finally:
+                cursor.execute(f"USE {source}")
+                cursor.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DATABASE}")
+                cursor.close()
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize(
+    "query, params, table, expected_key, covering",
+    [check[1:] for check in CHECKS],
+    ids=[check[0] for check in CHECKS],
+)
+def test_query_plan(plan_cursor, query, params, table, expected_key, covering):
+    plan_cursor.execute(f"EXPLAIN {query}", params)
+    plan = next((row for row in plan_cursor.fetchall() if row["table"] == table), {})
+    extra = plan.get("Extra") or ""
+
+    assert plan.get("key") == expected_key, f"plan: {plan}"
+    assert plan.get("type") != "ALL", f"full table scan: {plan}"
+    if covering:
+        # "Using index condition" is index condition pushdown, not a covering read
+        assert any(
+            part.startswith("Using index") and part != "Using index condition"
+            for part in extra.split("; ")
+        ), f"not answered from the index alone: {extra}"
+        assert "Using filesort" not in extra, f"needs a filesort: {extra}"
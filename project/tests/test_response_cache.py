@@ -0,0 +1,81 @@
+import json
+
+import pytest
+import requests
+
+from helpers.community_search import CommunitySearchError
+from helpers.rate_limiter import RateLimiter
+from helpers.response_cache import ResponseCache
+from helpers.steam_api_helper import APIHelper
+from helpers.steam_responses import is_cacheable
+
+
+def json_response(payload, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode("utf-8")
+    return response
+
+
+@pytest.fixture
+def helper(tmp_path, monkeypatch):
+    helper = APIHelper(
+        api_base="http://steam.invalid",
+        store_base="http://steam.invalid",
+        community_base="http://steam.invalid",
+        rate_limiter=RateLimiter(),
+        cache=ResponseCache(path=str(tmp_path / "responses.sqlite3")),
+    )
+    helper.replies = []
+    helper.upstream_calls = 0
+
+    def fake_get(endpoint, url, params=None, api_key=None):
+        helper.upstream_calls += 1
+        return json_response(helper.replies.pop(0))
+
+    monkeypatch.setattr(helper, "_get", fake_get)
+    return helper
+
+
+@pytest.mark.parametrize(
+    "endpoint, payload, cacheable",
+    [
+        ("ResolveVanityURL", {"response": {"steamid": "76561197960287930", "success": 1}}, True),
+        ("ResolveVanityURL", {"response": {"success": 42, "message": "No match"}}, False),
+        ("SearchCommunityAjax", {"success": 1, "html": "", "search_result_count": 0}, True),
+        ("SearchCommunityAjax", {"success": 2}, False),
+        ("GetPlayerSummaries", {"response": {"players": [{"steamid": "1"}]}}, True),
+        ("GetPlayerSummaries", {"response": {"players": []}}, False),
+        ("GetNewsForApp", {"appnews": {"appid": 440, "newsitems": [{"gid": "1"}]}}, True),
+        ("GetNewsForApp", {"appnews": {"appid": 440, "newsitems": []}}, False),
+        ("GetNumberOfCurrentPlayers", {"response": {"player_count": 5, "result": 1}}, True),
+        ("GetNumberOfCurrentPlayers", {"response": {"result": 42}}, False),
+        ("GetOwnedGames", {"response": {}}, False),
+        ("appdetails", {"440": {"success": False}}, False),
+        ("storesearch", {"total": 0, "items": []}, True),
+        ("default endpoint", {}, False),
+    ],
+)
+def test_is_cacheable(endpoint, payload, cacheable):
+    assert is_cacheable(endpoint, payload) is cacheable
+
+
+def test_failed_vanity_lookup_is_not_cached(helper):
+    helper.replies = [
+        {"response": {"success": 42, "message": "No match"}},
+        {"response": {"steamid": "76561197960287930", "success": 1}},
+    ]
+    assert helper.getSteamIDFromVanity("someone").startswith("Could not resolve")
+    assert helper.getSteamIDFromVanity("someone") == "76561197960287930"
+    # The success is cached, so a third lookup stays local
+    assert helper.getSteamIDFromVanity("someone") == "76561197960287930"
+    assert helper.upstream_calls == 2
+
+
+def test_failed_community_search_is_not_cached(helper):
+    helper.session.cookies.set("sessionid", "test")
+    helper.replies = [{"success": 2}, {"success": 1, "html": "", "search_result_count": 0}]
+    with pytest.raises(CommunitySearchError):
+        helper.searchSteamDisplayNamesAjax("gaben")
+    assert helper.searchSteamDisplayNamesAjax("gaben") == []
+    assert helper.upstream_calls == 2
@@ -0,0 +1,46 @@
+"""
+ServingLayer keeps retrying a database that wasn't reachable when the worker started.
+"""
+
+import time
+
+from helpers.serving_layer import ServingLayer
+
+
+class StartingDB:
+    """A MySQLHelper stand-in whose server accepts connections from the third attempt on."""
+
+    def __init__(self, ready_after=3):
+        self.attempts = 0
+        self.ready_after = ready_after
+        self.is_connected = False
+
+    def connect(self):
+        self.attempts += 1
+        self.is_connected = self.attempts >= self.ready_after
+
+
+def test_disconnected_db_is_retried_at_most_once_per_interval():
+    db = StartingDB()
+    serving = ServingLayer(api=None, db=db, reconnect_interval=0.05)
+
+    assert not serving._db_ready()
+    # Within the interval reads go straight to Steam without another attempt
+    assert not serving._db_ready()
+    assert db.attempts == 1
+
+    time.sleep(0.06)
+    assert not serving._db_ready()
+    time.sleep(0.06)
+    assert serving._db_ready()
+    assert db.attempts == 3
+    assert serving.stats["reconnect_failures"] == 2
+    assert serving.stats["reconnects"] == 1
+
+    # Once connected there are no further attempts
+    assert serving._db_ready()
+    assert db.attempts == 3
+
+
+def test_without_a_db_nothing_is_attempted():
+    assert not ServingLayer(api=None, db=None)._db_ready()
@@ -0,0 +1,66 @@
+import pytest
+
+from helpers.rate_limiter import RateLimiter
+from helpers.steam_api_helper import APIHelper
+
+# Nothing listens here; these cases must be answered without a request
+UNREACHABLE = "http://127.0.0.1:9"
+
+
+@pytest.fixture
+def helper():
+    return APIHelper(
+        api_base=UNREACHABLE,
+        store_base=UNREACHABLE,
+        community_base=UNREACHABLE,
+        rate_limiter=RateLimiter(),
+        cache=False,
+    )
+
+
+@pytest.mark.parametrize("title", [None, "", "   ", 42])
+def test_resolve_app_id_rejects_missing_titles(helper, title):
+    assert helper.resolveAppID(title) is None
+
+
+def test_game_methods_without_title_or_app_id_report_not_found(helper):
+    assert helper.getGameNews() == "Game 'None' not found"
+    assert helper.getGamePlayerCount() == "Game 'None' not found"
+    assert helper.getGameAchievementData() == "Game 'None' not found"
+
+
+def keyed_helper(url):
+    return APIHelper(
+        api_base=url,
+        store_base=url,
+        community_base=url,
+        rate_limiter=RateLimiter(api_keys=["limiter-key"]),
+        cache=False,
+    )
+
+
+def sent_keys(helper):
+    keys = []
+    get = helper.session.get
+
+    def recording_get(url, params=None, **kwargs):
+        keys.append((params or {}).get("key"))
+        return get(url, params=params, **kwargs)
+
+    helper.session.get = recording_get
+    return keys
+
+
+def test_vanity_lookup_uses_the_callers_api_key(fake_steam):
+    helper = keyed_helper(fake_steam.url)
+    keys = sent_keys(helper)
+
+    assert helper.getSteamIDFromVanity("gaben", api_key="caller-key").isdigit()
+    assert helper.getSteamIDFromVanity("gaben").isdigit()
+    assert keys == ["caller-key", "limiter-key"]
+
+
+def test_player_summary_errors_are_logged(helper, caplog):
+    with caplog.at_level("WARNING", logger="helpers.steam_api_helper"):
+        assert helper.getPlayerSummaries(["76561197960265728"]) == {}
+    assert "Error fetching player summaries for 1 users" in caplog.text
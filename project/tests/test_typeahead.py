@@ -0,0 +1,61 @@
+"""
+Title typeahead: storesearch until the local app index exists, which is built in the background.
+"""
+
+import functools
+import threading
+
+import pytest
+
+import app
+from benchmarks.bench_helpers import UNLIMITED
+from benchmarks.fake_steam import FIRST_APP_ID, app_name
+from helpers.job_manager import JobManager
+from helpers.rate_limiter import RateLimiter
+from helpers.steam_api_helper import APIHelper
+
+
+@pytest.fixture
+def helper(fake_steam, tmp_path, monkeypatch):
+    helper = APIHelper(
+        api_base=fake_steam.url,
+        store_base=fake_steam.url,
+        rate_limiter=RateLimiter(
+            family_limits={"webapi": UNLIMITED, "store": UNLIMITED, "community": UNLIMITED},
+            key_limit=UNLIMITED,
+        ),
+        cache=False,
+    )
+    helper.loadAppIndex = functools.partial(helper.loadAppIndex, path=str(tmp_path / "index"))
+    jobs = JobManager(directory=str(tmp_path / "jobs"))
+    monkeypatch.setattr(app, "jobs", jobs)
+    monkeypatch.setattr(app, "api", lambda: helper)
+    yield helper
+    jobs.callback_manager.shutdown()
+    jobs.cache.close()
+    helper.close()
+
+
+def test_suggestions_fall_back_to_storesearch_until_the_index_is_built(helper):
+    title = app_name(FIRST_APP_ID + 42)
+    calls = []
+    search = helper.searchSteamApps
+    helper.searchSteamApps = lambda term: calls.append(term) or search(term)
+
+    assert title in app.title_suggestions(title)
+    assert calls == [title]
+
+    # The first request queued the index build; once it lands, suggestions stay local
+    app.jobs.callback_manager.shutdown()
+    assert helper.app_index is not None
+    assert title in app.title_suggestions(title)
+    assert calls == [title]
+
+
+def test_refresh_runs_once_per_process_at_a_time(helper):
+    release = threading.Event()
+    assert app.jobs.run_exclusive("app-index", lambda: release.wait(5))
+    assert not app.jobs.run_exclusive("app-index", lambda: None)
+    release.set()
+    app.jobs.callback_manager.shutdown()
+    assert app.jobs.run_exclusive("app-index", lambda: None)
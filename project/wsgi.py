@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production serving.
+
+    cd project && gunicorn -c gunicorn.conf.py wsgi:server
+"""
+
+from app import app
+
+server = app.server